@@ -0,0 +1,129 @@
+"""
+Build the Classifier Confusion Matrix for Spelling Correction
+This script runs the sign classifier over the collected dataset and records, for
+every true sign, the probability mass the classifier gave to each class. The
+spelling corrector uses it to make substitutions between often-confused letters
+cheaper.
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import cv2
+import logging
+
+from utils.hand_detector import HandDetector
+from utils.sign_classifier import SignClassifier
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+CONFIG = {
+    'DATASET_DIR': 'static/dataset',
+    'MODEL_PATH': 'Model/keras_model.h5',
+    'LABELS_PATH': 'Model/labels.txt',
+    'OUTPUT_PATH': 'Model/confusion_matrix.npz',
+    'CROP_OFFSET': 20
+}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def build_confusion_matrix(classifier, dataset_dir, detect_hands=True, offset=CONFIG['CROP_OFFSET']):
+    """
+    Accumulate the classifier's probabilities per true sign
+
+    Args:
+        classifier: SignClassifier
+        dataset_dir: Dataset directory with one folder per sign
+        detect_hands: Whether to crop the hand before classifying
+        offset: Pixels added around the hand crop
+
+    Returns:
+        Array of shape (classes, classes): row i sums the predictions for
+        images of class i
+    """
+    labels = list(classifier.labels)
+    label_index = {label: i for i, label in enumerate(labels)}
+    counts = np.zeros((len(labels), len(labels)), dtype=np.float64)
+    detector = HandDetector(static_image_mode=True, max_hands=1) if detect_hands else None
+    used = 0
+    skipped = 0
+
+    for sign in sorted(os.listdir(dataset_dir)):
+        sign_dir = os.path.join(dataset_dir, sign)
+        if not os.path.isdir(sign_dir):
+            continue
+        if sign not in label_index:
+            logger.warning(f"Skipping {sign}: not a label of the classifier")
+            continue
+
+        for filename in sorted(os.listdir(sign_dir)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+
+            img = cv2.imread(os.path.join(sign_dir, filename), cv2.IMREAD_COLOR)
+            if img is not None and detector is not None:
+                img = detector.find_crop(img, offset=offset)
+            if img is None:
+                skipped += 1
+                continue
+
+            # Soft counts use the whole distribution, not only the top class
+            counts[label_index[sign]] += classifier.predict(img).probabilities
+            used += 1
+
+    logger.info(f"Classified {used} images ({skipped} skipped)")
+    return counts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the classifier confusion matrix used by spelling correction")
+    parser.add_argument('--dataset', default=CONFIG['DATASET_DIR'], help="Dataset directory with one folder per sign")
+    parser.add_argument('--model', default=CONFIG['MODEL_PATH'], help="Keras model of the sign classifier")
+    parser.add_argument('--labels', default=CONFIG['LABELS_PATH'], help="Labels of the sign classifier")
+    parser.add_argument('--output', default=CONFIG['OUTPUT_PATH'], help="Where to save the .npz matrix")
+    parser.add_argument('--no-detect', action='store_true', help="Classify whole images instead of hand crops")
+    return parser.parse_args()
+
+
+def main():
+    """Classify the dataset and save the confusion matrix."""
+    args = parse_args()
+
+    if not os.path.isdir(args.dataset):
+        logger.error(f"Dataset directory not found: {args.dataset}")
+        return 1
+
+    classifier = SignClassifier(args.model, args.labels)
+    if classifier.model is None:
+        logger.error(f"Could not load the classifier from {args.model}")
+        return 1
+
+    counts = build_confusion_matrix(classifier, args.dataset, detect_hands=not args.no_detect)
+    if not counts.any():
+        logger.error("No dataset image could be classified")
+        return 1
+
+    accuracy = np.trace(counts) / counts.sum()
+    logger.info(f"Average probability of the true sign: {accuracy:.3f}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    np.savez(args.output, labels=np.array(classifier.labels), counts=counts)
+    logger.info(f"Confusion matrix saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        exit_code = main()
+        sys.exit(exit_code)
+    except KeyboardInterrupt:
+        logger.info("Interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        sys.exit(1)
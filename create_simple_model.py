@@ -4,6 +4,7 @@ This script creates a lightweight model for development and testing purposes.
 """
 
 import os
+import argparse
 import numpy as np
 import tensorflow as tf
 from tensorflow import keras
@@ -212,7 +213,7 @@ def save_model(model, model_path):
         logger.error(f"Error saving model: {str(e)}")
         return False
 
-def create_tflite_model(model, tflite_path):
+def create_tflite_model(model, tflite_path, keras_path=None):
     """Convert model to TensorFlow Lite format for better performance."""
     try:
         # Convert the model to TensorFlow Lite
@@ -232,7 +233,7 @@ def create_tflite_model(model, tflite_path):
             f.write(tflite_model)
         
         # Get file sizes for comparison
-        keras_size = os.path.getsize(os.path.join(CONFIG['MODEL_DIR'], CONFIG['MODEL_NAME']))
+        keras_size = os.path.getsize(keras_path or os.path.join(CONFIG['MODEL_DIR'], CONFIG['MODEL_NAME']))
         tflite_size = os.path.getsize(tflite_path)
         
         logger.info(f"TensorFlow Lite model saved to {tflite_path}")
@@ -279,6 +280,7 @@ def create_model_info_file():
         'labels': ARABIC_LETTERS + COMMON_PHRASES,
         'preprocessing': {
             'rescaling': '1/255',
+            'input_scale': 1.0,  # Raw [0, 255] pixels; the Rescaling layer normalizes
             'resize_method': 'bilinear'
         },
         'performance': {
@@ -299,8 +301,27 @@ def create_model_info_file():
     
     logger.info(f"Model info file created at {info_path}")
 
+# Architectures from cheapest to most accurate; a cheap one can serve as the
+# first tier of the runtime cascade (CASCADE_MODEL_PATH)
+ARCHITECTURES = {
+    'very_simple': create_very_simple_model,
+    'simple_cnn': create_simple_cnn_model,
+    'mobilenet': create_mobilenet_model
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Create a sign classifier model")
+    parser.add_argument('--architecture', choices=sorted(ARCHITECTURES), default='very_simple',
+                        help="Model architecture")
+    parser.add_argument('--output', default=os.path.join(CONFIG['MODEL_DIR'], CONFIG['MODEL_NAME']),
+                        help="Where to save the Keras model")
+    parser.add_argument('--tflite', default=os.path.join(CONFIG['MODEL_DIR'], CONFIG['TFLITE_NAME']),
+                        help="Where to save the TensorFlow Lite model")
+    return parser.parse_args()
+
 def main():
     """Main function to create and save the model."""
+    args = parse_args()
     logger.info("Starting Arabic Sign Language model creation...")
     
     # Ensure directories exist
@@ -311,8 +332,8 @@ def main():
     
     # Choose model architecture based on requirements
     # For development, use the simple model for faster loading
-    logger.info("Creating simple CNN model...")
-    model = create_very_simple_model()
+    logger.info(f"Creating {args.architecture} model...")
+    model = ARCHITECTURES[args.architecture]()
     
     # Compile the model
     compile_model(model)
@@ -321,8 +342,8 @@ def main():
     initialize_model_weights(model)
     
     # Save paths
-    model_path = os.path.join(CONFIG['MODEL_DIR'], CONFIG['MODEL_NAME'])
-    tflite_path = os.path.join(CONFIG['MODEL_DIR'], CONFIG['TFLITE_NAME'])
+    model_path = args.output
+    tflite_path = args.tflite
     
     # Save the model
     if save_model(model, model_path):
@@ -335,7 +356,7 @@ def main():
             logger.warning("Model verification failed")
         
         # Create TensorFlow Lite version
-        if create_tflite_model(model, tflite_path):
+        if create_tflite_model(model, tflite_path, keras_path=model_path):
             logger.info("TensorFlow Lite model created successfully")
         else:
             logger.warning("Failed to create TensorFlow Lite model")
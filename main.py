@@ -10,8 +10,7 @@ import cv2
 import numpy as np
 import time
 import base64
-from PIL import Image
-from io import BytesIO
+import struct
 import threading
 import datetime
 
@@ -20,10 +19,18 @@ import stripe_service
 
 # Import custom modules with error handling
 try:
-    from utils.arabic_text_utils import reshape_arabic_text, apply_arabic_grammar_rules
+    from utils.arabic_text_utils import (reshape_arabic_text, reshape_many, precompute_reshaped,
+                                         reshape_cache, apply_arabic_grammar_rules, grammar_rewriter,
+                                         normalize_arabic_key, ARABIC_KEY_NORMALIZATION)
 except ImportError:
+    reshape_cache = None
+    grammar_rewriter = None
+    normalize_arabic_key = None
+    ARABIC_KEY_NORMALIZATION = None
     def reshape_arabic_text(text): return text
-    def apply_arabic_grammar_rules(text): return text
+    def reshape_many(texts): return list(texts)
+    def precompute_reshaped(texts): pass
+    def apply_arabic_grammar_rules(text, state=None, spell_corrector=None): return text
 from models.database import db, init_db
 from models.user import User
 from models.session import Session
@@ -47,6 +54,14 @@ app.config['NEXT_PUBLIC_SUPABASE_ANON_KEY'] = os.environ.get('NEXT_PUBLIC_SUPABA
 # Register auth blueprint
 app.register_blueprint(auth_bp)
 
+# WebSocket support for streaming recognition (optional dependency)
+try:
+    from flask_sock import Sock
+    sock = Sock(app)
+except ImportError:
+    sock = None
+    logger.warning("flask-sock not installed, streaming recognition disabled")
+
 # Initialize database
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///arabic_sign_language.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
@@ -58,20 +73,61 @@ translations_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'da
 with open(translations_path, 'r', encoding='utf-8') as f:
     translations = json.load(f)
 
-from utils.hand_detector import HandDetector
-
-hand_detector = HandDetector(max_hands=1)
+from utils.hand_detector import HandDetector, denormalize_landmarks
+from utils.detector_pool import HandDetectorPool
+from utils.detection_scheduler import DetectionScheduler
+from utils.overlay import build_overlay
+from utils.frame_decoder import FrameDecoder
+from utils.recognition_session import RecognitionSessionRegistry
+from utils.stability import StabilityEmitter
+from utils.inference_scheduler import InferenceScheduler
+from utils.tflite_backend import TFLiteInterpreterPool
+from utils.preprocessing import CropPreprocessor, crop_box, validate_crop
+from utils.landmark_classifier import LandmarkClassifier
+from utils.model_cascade import ModelCascade
+from utils.prediction_result import PredictionResult
+from utils.prefix_index import load_prefix_index
+from utils.sequence_recognizer import SequenceRecognizer, sequence_features
+from utils.word_decoder import CharNgramModel, WordDecoder
+from utils.spell_corrector import load_spell_corrector
 
-# Initialize sign classifier with lazy loading to avoid threading issues
-import tensorflow as tf
-from tensorflow.keras.models import load_model
+# Frames are decoded once into RGB; a reduced DCT scale (2 or 4) trades crop
+# resolution for a much cheaper JPEG decode and a smaller MediaPipe input
+app.config['FRAME_DECODE_SCALE'] = int(os.environ.get('FRAME_DECODE_SCALE', 1))
+frame_decoder = FrameDecoder(scale=app.config['FRAME_DECODE_SCALE'])
 
+# Initialize sign classifier with lazy loading to avoid threading issues.
+# TensorFlow is only imported when the Keras backend is actually used.
 class LazySignClassifier:
-    def __init__(self):
+    def __init__(self, backend='keras', max_batch_size=16, max_latency=0.005, jit_compile=False,
+                 tflite_path="Model/model.tflite", tflite_threads=1, letterbox=False,
+                 cascade_path=None, cascade_min_confidence=0.8, cascade_min_margin=0.2):
         self._classifier = None
+        self._preprocessor = None
+        self._letterbox = letterbox
         self._labels = None
+        self._scheduler = None
+        self._backend = backend
+        self._max_batch_size = max_batch_size
+        self._jit_compile = jit_compile
+        self._tflite_path = tflite_path
+        self._tflite_threads = tflite_threads
+        self._cascade = None
         self._load_labels()
         self._load_model()
+        if self._classifier is not None and cascade_path:
+            self._load_cascade(cascade_path, cascade_min_confidence, cascade_min_margin)
+        
+        # Crops from concurrent requests are batched into one model call.
+        # TFLite invokes once per sample, so batching cannot speed it up; its
+        # crops run on the request threads, each with its own interpreter
+        if self._classifier is not None and self._backend != 'tflite':
+            self._scheduler = InferenceScheduler(
+                self.predict_batch,
+                max_batch_size=max_batch_size,
+                max_latency=max_latency,
+                validate=validate_crop
+            )
     
     def _load_labels(self):
         try:
@@ -84,46 +140,219 @@ class LazySignClassifier:
             self._labels = ["أ", "ب", "ت", "ث", "ج", "ح", "خ", "د", "ذ", "ر", "ز", "س", "ش", "ص", "ض", "ط", "ظ", "ع", "غ", "ف", "ق", "ك", "ل", "م", "ن", "ه", "و", "ي"]
     
     def _load_model(self):
+        if self._backend == 'tflite':
+            try:
+                # One interpreter per request thread
+                self._classifier = TFLiteInterpreterPool(self._tflite_path, num_threads=self._tflite_threads)
+                
+                # Input size comes from the interpreter, pixel scaling from model_info.json
+                self._preprocessor = CropPreprocessor.from_model_info(
+                    input_shape=self._classifier.input_shape,
+                    letterbox=self._letterbox,
+                    max_batch_size=self._max_batch_size
+                )
+                logger.info(f"TFLite model loaded successfully from {self._tflite_path}")
+                return
+            except Exception as e:
+                logger.warning(f"TFLite backend unavailable ({str(e)}), falling back to Keras")
+                self._backend = 'keras'
+        
         try:
-            self._classifier = load_model("Model/keras_model.h5")
+            from tensorflow.keras.models import load_model
+            from utils.compiled_model import CompiledModel, batch_buckets_up_to
+            
+            model = load_model("Model/keras_model.h5")
+            
+            # Trace and warm one fixed-signature function per batch size
+            self._classifier = CompiledModel(
+                model,
+                batch_buckets=batch_buckets_up_to(self._max_batch_size),
+                jit_compile=self._jit_compile
+            )
+            
+            # Input size and pixel scaling come from the model itself
+            self._preprocessor = CropPreprocessor.from_keras_model(
+                model,
+                letterbox=self._letterbox,
+                max_batch_size=self._max_batch_size
+            )
             logger.info("Model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load model: {str(e)}")
             self._classifier = None
     
-    def get_prediction(self, img, draw=True):
+    def _load_cascade(self, cascade_path, min_confidence, min_margin):
+        """
+        Put a cheaper model in front of the main one
+        
+        Frames the cheap model is unsure about are escalated to the main
+        model (see ModelCascade).
+        """
+        try:
+            if cascade_path.endswith('.tflite'):
+                tiny = TFLiteInterpreterPool(cascade_path, num_threads=self._tflite_threads)
+                tiny_preprocessor = CropPreprocessor.from_model_info(
+                    input_shape=tiny.input_shape,
+                    letterbox=self._letterbox,
+                    max_batch_size=self._max_batch_size
+                )
+                num_classes = tiny.num_classes
+            else:
+                from tensorflow.keras.models import load_model
+                from utils.compiled_model import CompiledModel, batch_buckets_up_to
+                
+                model = load_model(cascade_path)
+                tiny = CompiledModel(model, batch_buckets=batch_buckets_up_to(self._max_batch_size))
+                tiny_preprocessor = CropPreprocessor.from_keras_model(
+                    model,
+                    letterbox=self._letterbox,
+                    max_batch_size=self._max_batch_size
+                )
+                num_classes = int(model.output_shape[-1])
+            
+            if num_classes != len(self._labels):
+                logger.warning(f"Cascade model {cascade_path} predicts {num_classes} classes, "
+                               f"expected {len(self._labels)}; cascade disabled")
+                return
+            
+            self._cascade = ModelCascade(
+                [
+                    ('tiny', lambda crops: tiny.predict(tiny_preprocessor.fill(crops))),
+                    ('main', self._predict_main)
+                ],
+                min_confidence=min_confidence,
+                min_margin=min_margin
+            )
+            logger.info(f"Cascade model loaded from {cascade_path}")
+        except Exception as e:
+            logger.warning(f"Cascade model unavailable ({str(e)}), using the main model only")
+            self._cascade = None
+    
+    def get_stats(self):
+        """Inference latency and batching statistics"""
+        stats = {'model_loaded': self._classifier is not None, 'backend': self._backend}
+        if self._classifier is not None:
+            stats['model'] = self._classifier.get_stats()
+        if self._cascade is not None:
+            stats['cascade'] = self._cascade.get_stats()
+        if self._scheduler is not None:
+            stats['scheduler'] = self._scheduler.get_stats()
+        return stats
+    
+    def predict_batch(self, crops):
+        """
+        Run the model on a list of hand crops in a single call
+        
+        With a cascade, the cheap model sees every crop and the main model
+        only the uncertain ones.
+        
+        Args:
+            crops: List of RGB hand crops
+            
+        Returns:
+            Array of class probabilities, one row per crop
+        """
+        if self._cascade is not None:
+            return self._cascade.predict_batch(crops)
+        return self._predict_main(crops)
+    
+    def _predict_main(self, crops):
+        """Run the main model on a list of hand crops"""
+        # The batch is a view into the preprocessor's reused buffer
+        batch = self._preprocessor.fill(crops)
+        return self._classifier.predict(batch)
+    
+    def _classify(self, crops, max_latency=None):
+        """
+        Classify crops through the batching scheduler, or on this thread without one
+        
+        Returns:
+            List of probability vectors, one per crop
+        """
+        if self._scheduler is None:
+            for crop in crops:
+                validate_crop(crop)
+            return list(self.predict_batch(crops))
+        
+        # Queue the crops for batched inference
+        futures = self._scheduler.submit_many(crops, max_latency=max_latency)
+        return [future.result() for future in futures]
+    
+    def _fallback_prediction(self):
+        """Cycle through the letters when no model is available"""
+        import time
+        current_time = int(time.time())
+        letter_index = current_time % len(self._labels)
+        probabilities = [0.0] * len(self._labels)
+        probabilities[letter_index] = 0.90
+        return probabilities, letter_index
+    
+    def get_prediction(self, img, draw=False, max_latency=None):
         if self._classifier is None:
             # Fallback to cycling letters if model not loaded
-            import time
-            current_time = int(time.time())
-            letter_index = current_time % len(self._labels)
-            probabilities = [0.0] * len(self._labels)
-            probabilities[letter_index] = 0.90
-            return probabilities, letter_index
+            return self._fallback_prediction()
         
-        # Preprocess image for model input
         try:
-            img_resized = cv2.resize(img, (224, 224))  # Assuming model input size 224x224
-            img_normalized = img_resized / 255.0
-            img_expanded = np.expand_dims(img_normalized, axis=0)
-            
-            predictions = self._classifier.predict(img_expanded)
-            probabilities = predictions[0]
+            probabilities = self._classify([img], max_latency=max_latency)[0]
             letter_index = np.argmax(probabilities)
             return probabilities, letter_index
         except Exception as e:
             logger.error(f"Error during prediction: {str(e)}")
             # Fallback to cycling letters
-            import time
-            current_time = int(time.time())
-            letter_index = current_time % len(self._labels)
-            probabilities = [0.0] * len(self._labels)
-            probabilities[letter_index] = 0.90
-            return probabilities, letter_index
+            return self._fallback_prediction()
+    
+    def get_predictions(self, crops, max_latency=None):
+        """
+        Classify several hand crops of one frame in the same model batch
+        
+        Args:
+            crops: List of RGB hand crops
+            max_latency: Maximum seconds the crops may wait for batching
+            
+        Returns:
+            Tuple: (list of probability vectors, list of predicted class indices)
+        """
+        if self._classifier is None:
+            probabilities, letter_index = self._fallback_prediction()
+            return [probabilities] * len(crops), [letter_index] * len(crops)
+        
+        try:
+            probabilities = self._classify(crops, max_latency=max_latency)
+            return probabilities, [int(np.argmax(p)) for p in probabilities]
+        except Exception as e:
+            logger.error(f"Error during prediction: {str(e)}")
+            probabilities, letter_index = self._fallback_prediction()
+            return [probabilities] * len(crops), [letter_index] * len(crops)
 
-sign_classifier = LazySignClassifier()
+sign_classifier = LazySignClassifier(
+    backend=os.environ.get('CLASSIFIER_BACKEND', 'keras'),
+    max_batch_size=int(os.environ.get('INFERENCE_MAX_BATCH', 16)),
+    max_latency=float(os.environ.get('INFERENCE_MAX_LATENCY_MS', 5)) / 1000.0,
+    jit_compile=os.environ.get('INFERENCE_XLA', '0') == '1',
+    tflite_path=os.environ.get('TFLITE_MODEL_PATH', 'Model/model.tflite'),
+    tflite_threads=int(os.environ.get('TFLITE_NUM_THREADS', 1)),
+    letterbox=os.environ.get('PREPROCESS_LETTERBOX', '0') == '1',
+    # Optional cheap first-tier model (.h5 or .tflite); the main model only
+    # sees crops it is unsure about
+    cascade_path=os.environ.get('CASCADE_MODEL_PATH'),
+    cascade_min_confidence=float(os.environ.get('CASCADE_MIN_CONFIDENCE', 0.8)),
+    cascade_min_margin=float(os.environ.get('CASCADE_MIN_MARGIN', 0.2))
+)
 model_loaded = True
 
+# Landmark classifier: skips cropping and CNN inference entirely when a
+# model trained by train_landmark_model.py is available
+landmark_classifier = LandmarkClassifier(os.environ.get('LANDMARK_MODEL_PATH', 'Model/landmark_model.npz'))
+app.config['RECOGNITION_MODE'] = os.environ.get('RECOGNITION_MODE', 'image')  # 'image' or 'landmarks'
+
+# Temporal model for motion signs, stepped once per frame with a hand;
+# its prediction wins over the single-frame classifiers when confident
+sequence_recognizer = SequenceRecognizer(
+    os.environ.get('SEQUENCE_MODEL_PATH', 'Model/sequence_model.npz'),
+    max_gap=float(os.environ.get('SEQUENCE_MAX_GAP', 1.0))  # seconds without a detected hand
+)
+app.config['SEQUENCE_CONFIDENCE'] = float(os.environ.get('SEQUENCE_CONFIDENCE', 0.8))
+
 # Initialize TTS with error handling to prevent startup crashes
 try:
     import pyttsx3
@@ -147,12 +376,151 @@ except Exception as e:
             logger.info(f"TTS would speak async: {text}")
     tts = DummyTTS()
 
-# Global variables
-recognized_signs = []
-current_sentence = ""
-processing_frame = False
-last_prediction_time = time.time()
-prediction_cooldown = 1.0  # seconds
+# Per-client recognition state (stability vote, sentence, history)
+# A sign is emitted once it has been the stable top class for K frames
+app.config['EMIT_STABLE_FRAMES'] = int(os.environ.get('EMIT_STABLE_FRAMES', 3))
+app.config['EMIT_MIN_CONFIDENCE'] = float(os.environ.get('EMIT_MIN_CONFIDENCE', 0.6))
+app.config['EMIT_SMOOTHING'] = float(os.environ.get('EMIT_SMOOTHING', 0.5))
+# Frame rate hints for the client while signing and while idle
+app.config['ACTIVE_FRAME_INTERVAL_MS'] = int(os.environ.get('ACTIVE_FRAME_INTERVAL_MS', 150))
+app.config['IDLE_FRAME_INTERVAL_MS'] = int(os.environ.get('IDLE_FRAME_INTERVAL_MS', 1000))
+
+def create_stability_emitter():
+    """Create the stability emitter of one client"""
+    return StabilityEmitter(
+        alpha=app.config['EMIT_SMOOTHING'],
+        stable_frames=app.config['EMIT_STABLE_FRAMES'],
+        min_confidence=app.config['EMIT_MIN_CONFIDENCE'],
+        active_interval=app.config['ACTIVE_FRAME_INTERVAL_MS'] / 1000.0,
+        idle_interval=app.config['IDLE_FRAME_INTERVAL_MS'] / 1000.0
+    )
+
+# ROI tracking runs MediaPipe on a small region around the last hand
+app.config['HAND_TRACK_ROI'] = os.environ.get('HAND_TRACK_ROI', '0') == '1'
+app.config['HAND_REDETECT_INTERVAL'] = int(os.environ.get('HAND_REDETECT_INTERVAL', 15))
+# Two-handed signs: every detected hand is classified in the same batch
+app.config['HAND_MAX_HANDS'] = int(os.environ.get('HAND_MAX_HANDS', 2))
+
+def create_hand_detector():
+    """Create a HandDetector for the detector pool"""
+    return HandDetector(
+        max_hands=app.config['HAND_MAX_HANDS'],
+        track_roi=app.config['HAND_TRACK_ROI'],
+        redetect_interval=app.config['HAND_REDETECT_INTERVAL']
+    )
+
+# MediaPipe graphs shared by all clients; each stream stays pinned to one
+hand_detector_pool = HandDetectorPool(
+    create_hand_detector,
+    size=int(os.environ.get('HAND_DETECTOR_POOL_SIZE', 4))
+)
+app.config['HAND_DETECTOR_TIMEOUT'] = float(os.environ.get('HAND_DETECTOR_TIMEOUT_MS', 500)) / 1000.0
+
+# Full detection every N frames per client, optical flow in between;
+# N grows towards the maximum as the detector pool gets busy
+app.config['HAND_DETECT_INTERVAL'] = int(os.environ.get('HAND_DETECT_INTERVAL', 3))
+app.config['HAND_DETECT_MAX_INTERVAL'] = int(os.environ.get('HAND_DETECT_MAX_INTERVAL', 8))
+app.config['REDETECT_CONFIDENCE'] = float(os.environ.get('REDETECT_CONFIDENCE', 0.5))
+
+def create_detection_scheduler():
+    """Create the detection scheduler of one client"""
+    return DetectionScheduler(
+        detect_interval=app.config['HAND_DETECT_INTERVAL'],
+        max_interval=max(app.config['HAND_DETECT_INTERVAL'], app.config['HAND_DETECT_MAX_INTERVAL']),
+        load_fn=hand_detector_pool.utilization,
+        max_hands=app.config['HAND_MAX_HANDS']
+    )
+
+# Word suggestions: prefix index over the lexicon ranked by frequency,
+# memory-mapped from the prebuilt table when it is up to date
+app.config['LEXICON_PATH'] = os.environ.get('LEXICON_PATH', 'data/arabic_lexicon.txt')
+app.config['LEXICON_INDEX_PATH'] = os.environ.get('LEXICON_INDEX_PATH', 'Model/lexicon_index.npy')
+suggestion_index = load_prefix_index(
+    app.config['LEXICON_PATH'],
+    app.config['LEXICON_INDEX_PATH'],
+    normalize=normalize_arabic_key,
+    normalization=ARABIC_KEY_NORMALIZATION
+)
+
+# Emitted letters are decoded into lexicon words by a beam search over
+# each sign's full probability vector; a pause of WORD_GAP_FRAMES frames
+# without a hand ends the word. Decoded words are only reported in the
+# results (words / partial_word), the sentence is still built by the
+# client through /add_to_sentence
+app.config['WORD_DECODER'] = os.environ.get('WORD_DECODER', '0') == '1'
+app.config['WORD_BEAM_WIDTH'] = int(os.environ.get('WORD_BEAM_WIDTH', 8))
+app.config['WORD_BEAM_CANDIDATES'] = int(os.environ.get('WORD_BEAM_CANDIDATES', 4))
+app.config['WORD_LM_WEIGHT'] = float(os.environ.get('WORD_LM_WEIGHT', 0.5))
+app.config['WORD_OOV_PENALTY'] = float(os.environ.get('WORD_OOV_PENALTY', 4.0))
+app.config['WORD_GAP_FRAMES'] = int(os.environ.get('WORD_GAP_FRAMES', 10))
+
+# Optional SymSpell correction of the sentence; the deletion table is
+# memory-mapped like the prefix index, and substitutions between letters
+# the classifier confuses (Model/confusion_matrix.npz, see
+# build_confusion_matrix.py) cost less
+app.config['SPELL_CORRECTION'] = os.environ.get('SPELL_CORRECTION', '0') == '1'
+app.config['SPELL_INDEX_PATH'] = os.environ.get('SPELL_INDEX_PATH', 'Model/spell_deletes.npy')
+app.config['CONFUSION_MATRIX_PATH'] = os.environ.get('CONFUSION_MATRIX_PATH', 'Model/confusion_matrix.npz')
+app.config['SPELL_MAX_DISTANCE'] = int(os.environ.get('SPELL_MAX_DISTANCE', 2))
+
+spell_corrector = None
+if app.config['SPELL_CORRECTION'] and len(suggestion_index):
+    spell_corrector = load_spell_corrector(
+        suggestion_index,
+        app.config['SPELL_INDEX_PATH'],
+        confusion_path=app.config['CONFUSION_MATRIX_PATH'],
+        max_distance=app.config['SPELL_MAX_DISTANCE']
+    )
+
+word_decoder = None
+if app.config['WORD_DECODER'] and len(suggestion_index):
+    word_decoder = WordDecoder(
+        suggestion_index,
+        CharNgramModel.from_index(suggestion_index),
+        beam_width=app.config['WORD_BEAM_WIDTH'],
+        candidates=app.config['WORD_BEAM_CANDIDATES'],
+        lm_weight=app.config['WORD_LM_WEIGHT'],
+        oov_penalty=app.config['WORD_OOV_PENALTY']
+    )
+
+recognition_sessions = RecognitionSessionRegistry(
+    max_sessions=int(os.environ.get('RECOGNITION_MAX_SESSIONS', 32)),
+    ttl=float(os.environ.get('RECOGNITION_SESSION_TTL', 600)),
+    detector_pool=hand_detector_pool,
+    scheduler_factory=create_detection_scheduler,
+    sequence_factory=sequence_recognizer.create_state if sequence_recognizer.is_loaded() else None,
+    emitter_factory=create_stability_emitter,
+    grammar_factory=grammar_rewriter.create_state if grammar_rewriter is not None else None,
+    decoder_factory=word_decoder.create_state if word_decoder is not None else None
+)
+
+@app.before_request
+def ensure_recognition_id():
+    """
+    Give every client its recognition id on an ordinary request (e.g. page load)
+    
+    The id lives in the Flask session cookie, which a WebSocket upgrade
+    cannot set, so streams only use an id created here.
+    """
+    if request.headers.get('Upgrade', '').lower() == 'websocket':
+        return
+    if not session.get('recognition_id'):
+        session['recognition_id'] = uuid.uuid4().hex
+
+def get_recognition_session():
+    """
+    Get the recognition session of the current client
+    
+    Clients are identified by an id stored in the Flask session cookie.
+    
+    Returns:
+        RecognitionSession, or None if the client has no id yet (a stream
+        opened before any page was loaded)
+    """
+    session_id = session.get('recognition_id')
+    if not session_id:
+        return None
+    return recognition_sessions.get(session_id)
 
 # Load Arabic letters and common phrases
 arabic_letters = ["أ", "ب", "ت", "ث", "ج", "ح", "خ", "د", "ذ", "ر", "ز", "س", "ش", "ص", "ض", "ط", "ظ", "ع", "غ", "ف", "ق", "ك", "ل", "م", "ن", "ه", "و", "ي"]
@@ -300,6 +668,13 @@ word_stems = {}
 for letter, words in common_words.items():
     word_stems[letter] = [word[:2] for word in words]  # Use first two characters as stem
 
+# Every label and suggestion word is reshaped once here instead of on each request
+precompute_reshaped(
+    arabic_letters + common_phrases + list(sign_classifier._labels) + list(landmark_classifier.labels)
+    + list(sequence_recognizer.labels) + [word for words in common_words.values() for word in words]
+    + suggestion_index.top_k('', 1000)
+)
+
 @app.route('/')
 def index():
     # Allow demo access or require login
@@ -417,109 +792,565 @@ def payment_success():
     return render_template('payment_success.html', 
                           session=checkout_session)
 
-@app.route('/process_frame', methods=['POST'])
-def process_frame():
-    global processing_frame, last_prediction_time, current_sentence, recognized_signs
+def read_request_frame():
+    """
+    Decode the frame carried by the current request
     
-    if processing_frame:
-        return jsonify({'status': 'busy'})
+    Accepts a raw JPEG body (application/octet-stream or image/jpeg), a
+    multipart upload in the 'frame' field, or a JSON body with a base64 data
+    URL in 'frame'. The optional 'scale' query parameter (1, 2, 4 or 8)
+    overrides FRAME_DECODE_SCALE for this request.
     
-    processing_frame = True
+    Returns:
+        RGB image, or None if the request carried no frame
+    """
+    scale = request.args.get('scale', type=int) or app.config['FRAME_DECODE_SCALE']
     
-    try:
-        # Get frame data from request
+    if request.mimetype in ('application/octet-stream', 'image/jpeg'):
+        if request.content_length:
+            # Read straight into the decoder's reusable buffer
+            data = frame_decoder.read_stream(request.stream, request.content_length)
+        else:
+            data = request.get_data(cache=False)
+        if not data:
+            return None
+        img = frame_decoder.decode(data, scale=scale)
+    else:
         frame_file = request.files.get('frame')
         if frame_file:
             # Processing file upload from <input type="file">
-            img_bytes = frame_file.read()
-            img = Image.open(BytesIO(img_bytes))
-            img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+            img = frame_decoder.decode(frame_file.read(), scale=scale)
         else:
             # Processing base64 data from canvas/video
-            frame_data = request.json.get('frame')
+            payload = request.get_json(silent=True) or {}
+            frame_data = payload.get('frame')
             if not frame_data:
-                processing_frame = False
-                return jsonify({'error': 'No frame data received'})
+                return None
+            img = frame_decoder.decode_data_url(frame_data, scale=scale)
+    
+    if img is None:
+        raise ValueError('Could not decode frame')
+    return img
+
+def recognize_frame(img, rec_session, mode=None, preview=False):
+    """
+    Run hand detection and sign classification on a decoded frame
+    
+    Shared by the HTTP and WebSocket transports. The caller must hold
+    rec_session.lock.
+    
+    Args:
+        img: RGB image
+        rec_session: RecognitionSession of the client that sent the frame
+        mode: 'image' (CNN on the hand crop) or 'landmarks' (MLP on hand
+            landmarks); defaults to RECOGNITION_MODE
+        preview: Whether to add an 'overlay' of drawing primitives for the
+            client's canvas (nothing is ever drawn into the frame)
+        
+    Returns:
+        Result dictionary (contains 'error' if the hand region was unusable,
+        or 'status': 'busy' if no hand detector was free)
+    """
+    if mode is None:
+        mode = app.config['RECOGNITION_MODE']
+    use_landmarks = mode == 'landmarks' and landmark_classifier.is_loaded()
+    
+    # Between detections the hand is followed with optical flow
+    scheduler = rec_session.detection_scheduler
+    if not scheduler.propagate(img, rgb=True):
+        # Hold a pooled detector only for detection so classification of this
+        # frame overlaps with detection of other clients' frames
+        with rec_session.checkout_detector(timeout=app.config['HAND_DETECTOR_TIMEOUT']) as hand_detector:
+            if hand_detector is None:
+                scheduler.request_detection()
+                return {'status': 'busy'}
+            
+            # Boxes propagated by optical flow are newer than the detector's own
+            hand_detector.set_roi(scheduler.get_bboxes())
             
-            # Convert base64 to image
-            img_data = base64.b64decode(frame_data.split(',')[1])
-            img = Image.open(BytesIO(img_data))
-            img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+            # Find hands in the frame (the decoded frame is already RGB)
+            hand_detector.find_hands(img, draw=False, rgb=True)
+            scheduler.record_detection(hand_detector)
+    
+    # Boxes of every hand (vectorized min/max over their landmarks)
+    bboxes = scheduler.get_bboxes()
+    hand_found = len(bboxes) > 0
+    hand_types = scheduler.hand_types[:scheduler.num_hands]
+    
+    # Landmarks moved by optical flow only shift the last detected shape,
+    # so only real detections are fed to the temporal model
+    if not hand_found:
+        sequence_probabilities = advance_sequence(rec_session, None, None, img.shape[1], img.shape[0])
+    elif scheduler.detected:
+        sequence_probabilities = advance_sequence(
+            rec_session, scheduler.landmarks[0], scheduler.hand_type, img.shape[1], img.shape[0]
+        )
+    else:
+        sequence_probabilities = None
+    
+    result = {
+        'text': '',
+        'confidence': 0,
+        'hand_detected': False
+    }
+    probabilities = None
+    hand_probabilities = None
+    
+    if apply_sequence_prediction(result, rec_session, sequence_probabilities):
+        result['hand_detected'] = True
+    elif hand_found and use_landmarks:
+        result['hand_detected'] = True
+        
+        # Classify the normalized landmarks of every hand in one network call
+        hand_probabilities, indices = landmark_classifier.get_predictions(
+            scheduler.landmarks[:scheduler.num_hands], hand_types
+        )
+        labels = landmark_classifier.labels
+        hands = list(range(len(indices)))
+    elif hand_found:
+        result['hand_detected'] = True
+        
+        # Crop every hand region based on its landmarks bounding box
+        crops = []
+        hands = []
+        for hand_no, bbox in enumerate(bboxes):
+            img_crop = crop_box(img, bbox)
+            if img_crop.size == 0 or img_crop.shape[0] <= 10 or img_crop.shape[1] <= 10:
+                continue
+            crops.append(img_crop)
+            hands.append(hand_no)
         
-        # Find hands in the frame
-        img_with_hands = hand_detector.find_hands(img, draw=True)  # Draw landmarks for visualization
+        if not crops:
+            logger.debug("Hand region too small or out of frame")
+            return {'error': 'Hand region too small or out of frame', 'hand_detected': True}
         
-        # Extract hand landmarks positions
-        landmarks = hand_detector.find_position(img_with_hands, hand_no=0, draw=False)
+        # All crops of the frame go into the same model batch
+        # (the classifier resizes and normalizes them itself)
+        hand_probabilities, indices = sign_classifier.get_predictions(crops)
+        labels = sign_classifier._labels
+    
+    if hand_probabilities is not None:
+        # Per-hand predictions, then one decision for the frame
+        hand_results = [PredictionResult(p, labels) for p in hand_probabilities]
+        result['hands'] = [
+            {
+                'hand': hand_types[hand_no],
+                'text': hand_result.label or '',
+                'confidence': hand_result.confidence,
+                'bbox': bboxes[hand_no].astype(int).tolist()
+            }
+            for hand_no, hand_result in zip(hands, hand_results)
+        ]
+        probabilities, index = fuse_hand_predictions(hand_probabilities, indices)
+    
+    if not result['hand_detected']:
+        rec_session.emitter.no_hand()
+        end_word_on_pause(result, rec_session)
+        result['text'] = ""
+        result['confidence'] = 0.0
+        result['reshaped_text'] = ""
+    elif probabilities is not None:
+        apply_prediction(result, rec_session, probabilities, index, labels)
+        # A doubtful prediction on a propagated box is checked by detection next frame
+        if not scheduler.detected and result['confidence'] < app.config['REDETECT_CONFIDENCE']:
+            scheduler.request_detection()
+    
+    result['frame_interval_ms'] = round(rec_session.emitter.suggested_interval() * 1000)
+    
+    if preview:
+        result['overlay'] = build_overlay(
+            img.shape[1], img.shape[0],
+            landmarks=scheduler.landmarks[:scheduler.num_hands] if hand_found else None,
+            bbox=bboxes if hand_found else None,
+            label=result['text'],
+            confidence=result['confidence']
+        )
+    
+    return result
+
+def advance_sequence(rec_session, points, hand_type, width, height):
+    """
+    Advance the session's temporal model to the current time
+    
+    The model follows the first hand only. The caller must hold
+    rec_session.lock and pass only landmarks from a real detection.
+    
+    Args:
+        rec_session: RecognitionSession of the client
+        points: Landmarks of the first hand in pixels, or None if no hand was found
+        hand_type: "Left", "Right" or None
+        width: Frame width
+        height: Frame height
         
+    Returns:
+        Sequence class probabilities, or None if the model did not step
+    """
+    if rec_session.sequence_state is None:
+        return None
+    now = time.monotonic()
+    if points is None:
+        sequence_recognizer.skip(rec_session.sequence_state, now)
+        return None
+    features = sequence_features(points, hand_type, width, height)
+    return sequence_recognizer.update(rec_session.sequence_state, features, now)
+
+def apply_sequence_prediction(result, rec_session, sequence_probabilities):
+    """
+    Emit a motion sign if the temporal model is confident
+    
+    Args:
+        result: Result dictionary to update
+        rec_session: RecognitionSession of the client
+        sequence_probabilities: Output of advance_sequence
+        
+    Returns:
+        True if a motion sign was emitted
+    """
+    if (sequence_probabilities is None
+            or float(np.max(sequence_probabilities)) < app.config['SEQUENCE_CONFIDENCE']):
+        return False
+    
+    # A confident motion sign is already a decision over its whole window
+    index = int(np.argmax(sequence_probabilities))
+    emit_sign(result, rec_session, sequence_recognizer.labels[index], float(sequence_probabilities[index]))
+    rec_session.emitter.reset()
+    
+    # Start a new sequence so the same motion is not emitted twice
+    rec_session.sequence_state.reset()
+    return True
+
+def fuse_hand_predictions(hand_probabilities, indices):
+    """
+    Combine the predictions of several hands into one frame decision
+    
+    Each hand's probabilities are weighted by its own confidence, so a
+    clear hand outvotes an ambiguous one.
+    
+    Args:
+        hand_probabilities: Class probabilities, one row per hand
+        indices: Predicted class index per hand (None if the hand has no prediction)
+        
+    Returns:
+        Tuple: (fused class probabilities, fused class index), or (None, None)
+    """
+    rows = [np.asarray(p, dtype=np.float32) for p, index in zip(hand_probabilities, indices) if index is not None]
+    if not rows:
+        return None, None
+    if len(rows) == 1:
+        return rows[0], int(np.argmax(rows[0]))
+    
+    rows = np.stack(rows)
+    weights = rows.max(axis=1)
+    fused = weights @ rows / max(float(weights.sum()), 1e-6)
+    return fused, int(np.argmax(fused))
+
+def apply_prediction(result, rec_session, probabilities, index, labels):
+    """
+    Feed a frame's prediction to the client's stability emitter
+    
+    The result only carries a sign when the emitter decides it is final;
+    its confidence is the smoothed probability of the current top class.
+    
+    Args:
+        result: Result dictionary to fill in
+        rec_session: RecognitionSession of the client
+        probabilities: Class probabilities
+        index: Predicted class index (None if there is no prediction)
+        labels: Labels of the classifier that produced the prediction
+    """
+    result['text'] = ""
+    result['confidence'] = 0.0
+    result['reshaped_text'] = ""
+    
+    if index is None or not 0 <= index < len(labels):
+        return
+    
+    emitted, confidence = rec_session.emitter.update(probabilities, labels)
+    result['confidence'] = confidence
+    if emitted is not None:
+        # The decoder gets the smoothed distribution the sign was emitted from
+        emit_sign(result, rec_session, emitted, confidence, rec_session.emitter.average, labels)
+
+def emit_sign(result, rec_session, label, confidence, probabilities=None, labels=None):
+    """
+    Record an emitted sign in the client's session and the result
+    
+    Args:
+        result: Result dictionary to fill in
+        rec_session: RecognitionSession of the client
+        label: Emitted sign
+        confidence: Confidence of the sign
+        probabilities: Class probabilities the sign was emitted from, or None
+            for a whole-word sign
+        labels: Labels of the classifier that produced the probabilities
+    """
+    # Update the client's sign history
+    rec_session.record_prediction(label, confidence)
+    
+    result['text'] = label
+    result['confidence'] = confidence
+    result['reshaped_text'] = reshape_arabic_text(label)
+    
+    logger.info(f"Recognized sign: {label} with confidence {confidence:.2f}")
+    
+    if rec_session.word_state is not None:
+        if probabilities is not None:
+            words = word_decoder.step(rec_session.word_state, probabilities, labels)
+        else:
+            words = word_decoder.add_word(rec_session.word_state, label)
+        add_decoded_words(result, rec_session, words)
+
+def end_word_on_pause(result, rec_session):
+    """
+    Finish the client's word in progress once the hand has been away long enough
+    
+    Args:
+        result: Result dictionary to fill in
+        rec_session: RecognitionSession of the client
+    """
+    if rec_session.word_state is None or rec_session.emitter.missing != app.config['WORD_GAP_FRAMES']:
+        return
+    word = word_decoder.end_word(rec_session.word_state)
+    add_decoded_words(result, rec_session, [word] if word else [])
+
+def add_decoded_words(result, rec_session, words):
+    """
+    Report finished words and the word in progress in the result
+    
+    Args:
+        result: Result dictionary to fill in
+        rec_session: RecognitionSession of the client
+        words: Words the decoder finished
+    """
+    for word in words:
+        logger.info(f"Decoded word: {word}")
+    
+    result['partial_word'] = word_decoder.partial(rec_session.word_state)
+    if words:
+        result['words'] = words
+        result['reshaped_words'] = reshape_many(words)
+
+@app.route('/process_frame', methods=['POST'])
+def process_frame():
+    rec_session = get_recognition_session()
+    
+    # Only this client's previous frame can make it busy
+    if not rec_session.lock.acquire(blocking=False):
+        return jsonify({'status': 'busy'})
+    
+    try:
+        # Get frame data from request
+        img = read_request_frame()
+        if img is None:
+            return jsonify({'error': 'No frame data received'})
+        
+        result = recognize_frame(
+            img, rec_session,
+            mode=request.args.get('mode'),
+            preview=request.args.get('preview') == '1'
+        )
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        logger.error(f"Error processing frame: {str(e)}")
+        return jsonify({'error': str(e)})
+    
+    finally:
+        rec_session.lock.release()
+
+@app.route('/process_landmarks', methods=['POST'])
+def process_landmarks():
+    """
+    Classify hand landmarks detected on the client
+    
+    Expects JSON of the form
+        {"width": 640, "height": 480,
+         "hands": [{"landmarks": [[x, y, z], ...21], "handedness": "Right"}]}
+    with x, y normalized to [0, 1] as MediaPipe reports them. The server
+    skips decoding and hand detection and only runs classification and
+    sentence building. Up to HAND_MAX_HANDS hands are classified in one
+    call and fused into a single decision; the first hand also feeds the
+    temporal model, as on the frame path.
+    """
+    rec_session = get_recognition_session()
+    
+    payload = request.get_json(silent=True) or {}
+    hands = payload.get('hands') or []
+    width = payload.get('width', 640)
+    height = payload.get('height', 480)
+    
+    if not landmark_classifier.is_loaded():
+        return jsonify({'error': 'Landmark model not available'}), 503
+    
+    try:
+        hands = hands[:app.config['HAND_MAX_HANDS']]
+        points = np.stack([denormalize_landmarks(hand['landmarks'], width, height) for hand in hands]) if hands else None
+        hand_types = [hand.get('handedness') for hand in hands]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Expected 21 [x, y, z] landmarks per hand'}), 400
+    
+    if not rec_session.lock.acquire(blocking=False):
+        return jsonify({'status': 'busy'})
+    
+    try:
         result = {
             'text': '',
-            'confidence': 0,
-            'hand_detected': False
+            'confidence': 0.0,
+            'reshaped_text': '',
+            'hand_detected': points is not None
         }
         
-        if landmarks and time.time() - last_prediction_time > prediction_cooldown:
-            result['hand_detected'] = True
-            
-            # Preprocess the hand image for prediction
-            # Crop hand region based on landmarks bounding box
-            x_coords = [lm[1] for lm in landmarks]
-            y_coords = [lm[2] for lm in landmarks]
-            x_min, x_max = min(x_coords), max(x_coords)
-            y_min, y_max = min(y_coords), max(y_coords)
-            
-            offset = 20
-            x_min = max(0, x_min - offset)
-            y_min = max(0, y_min - offset)
-            x_max = min(img.shape[1], x_max + offset)
-            y_max = min(img.shape[0], y_max + offset)
-            
-            img_crop = img[y_min:y_max, x_min:x_max]
-            
-            if img_crop.size == 0 or img_crop.shape[0] <= 10 or img_crop.shape[1] <= 10:
-                logger.debug("Hand region too small or out of frame")
-                processing_frame = False
-                return jsonify({'error': 'Hand region too small or out of frame', 'hand_detected': True})
-            
-            # Resize and normalize for model input
-            img_resized = cv2.resize(img_crop, (224, 224))
-            img_normalized = img_resized / 255.0
-            img_expanded = np.expand_dims(img_normalized, axis=0)
-            
-            # Get prediction from classifier
-            probabilities, index = sign_classifier.get_prediction(img_crop)
-            
-            if index is not None and 0 <= index < len(sign_classifier._labels):
-                predicted_label = sign_classifier._labels[index]
-                
-                # Update last prediction time
-                last_prediction_time = time.time()
-                
-                recognized_signs.append(predicted_label)
-                if len(recognized_signs) > 10:
-                    recognized_signs = recognized_signs[-10:]
-                
-                result['text'] = predicted_label
-                result['confidence'] = float(max(probabilities))
-                result['reshaped_text'] = reshape_arabic_text(predicted_label)
-                
-                logger.info(f"Recognized sign: {predicted_label} with confidence {float(max(probabilities)):.2f}")
-            else:
-                result['text'] = ""
-                result['confidence'] = 0.0
-                result['reshaped_text'] = ""
-        else:
-            result['text'] = ""
-            result['confidence'] = 0.0
-            result['reshaped_text'] = ""
+        # Client landmarks always come from a real detection
+        sequence_probabilities = advance_sequence(
+            rec_session,
+            points[0] if points is not None else None,
+            hand_types[0] if hand_types else None,
+            width, height
+        )
+        
+        if points is None:
+            rec_session.emitter.no_hand()
+            end_word_on_pause(result, rec_session)
+        elif not apply_sequence_prediction(result, rec_session, sequence_probabilities):
+            hand_probabilities, indices = landmark_classifier.get_predictions(points, hand_types)
+            labels = landmark_classifier.labels
+            hand_results = [PredictionResult(p, labels) for p in hand_probabilities]
+            result['hands'] = [
+                {'hand': hand_type, 'text': hand_result.label or '', 'confidence': hand_result.confidence}
+                for hand_type, hand_result in zip(hand_types, hand_results)
+            ]
+            probabilities, index = fuse_hand_predictions(hand_probabilities, indices)
+            apply_prediction(result, rec_session, probabilities, index, labels)
+        result['frame_interval_ms'] = round(rec_session.emitter.suggested_interval() * 1000)
         
-        processing_frame = False
         return jsonify(result)
     
     except Exception as e:
-        logger.error(f"Error processing frame: {str(e)}")
-        processing_frame = False
+        logger.error(f"Error processing landmarks: {str(e)}")
         return jsonify({'error': str(e)})
+    
+    finally:
+        rec_session.lock.release()
+
+# Binary stream frames start with a big-endian uint32 sequence number
+STREAM_HEADER = struct.Struct('>I')
+STREAM_IDLE_TIMEOUT = 1.0  # seconds between sentence checks while idle
+
+def stream_message(payload):
+    """Serialize a compact streaming message"""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+
+if sock is not None:
+    @sock.route('/ws/recognize')
+    def recognize_stream(ws):
+        """
+        Continuous recognition over a persistent WebSocket
+        
+        Binary messages carry a sequence number followed by a JPEG frame.
+        Text messages are JSON control messages, e.g. {"type": "config",
+        "scale": 2, "mode": "landmarks", "preview": 1}. The server answers each processed frame with
+        {"k": "p", "seq": n, "t": text, "c": confidence, "h": 0|1, "fi": ms}
+        ("t" is only set when a sign is emitted, "fi" is the suggested time
+        between frames, "hs": [[handedness, top label, confidence], ...] per hand,
+        plus "o": overlay primitives when preview is on) and pushes
+        {"k": "s", "sentence": ..., "reshaped": ...} when the sentence changes.
+        Frames that arrive while a newer one is queued are dropped.
+        """
+        rec_session = get_recognition_session()
+        if rec_session is None:
+            # A session created here could never be reached by the HTTP endpoints
+            ws.send(stream_message({'k': 'e', 'seq': 0, 'error': 'No recognition session, reload the page'}))
+            return
+        scale = app.config['FRAME_DECODE_SCALE']
+        mode = None
+        preview = False
+        last_seq = -1
+        last_sentence = None
+        
+        while True:
+            message = ws.receive(timeout=STREAM_IDLE_TIMEOUT)
+            
+            # Drain the socket so only the newest frame is processed
+            frame = None
+            while message is not None:
+                if isinstance(message, str):
+                    try:
+                        control = json.loads(message)
+                        if control.get('type') == 'config':
+                            scale = int(control.get('scale', scale))
+                            mode = control.get('mode', mode)
+                            preview = bool(control.get('preview', preview))
+                    except (ValueError, TypeError, AttributeError):
+                        logger.debug(f"Ignoring malformed stream control message: {message!r}")
+                elif len(message) > STREAM_HEADER.size:
+                    frame = message
+                message = ws.receive(timeout=0)
+            
+            if frame is not None:
+                seq, = STREAM_HEADER.unpack_from(frame)
+                if seq > last_seq:
+                    last_seq = seq
+                    if not rec_session.lock.acquire(blocking=False):
+                        ws.send(stream_message({'k': 'p', 'seq': seq, 'busy': 1}))
+                    else:
+                        try:
+                            img = frame_decoder.decode(memoryview(frame)[STREAM_HEADER.size:], scale=scale)
+                            if img is None:
+                                raise ValueError('Could not decode frame')
+                            result = recognize_frame(img, rec_session, mode=mode, preview=preview)
+                            if result.get('status') == 'busy':
+                                reply = {'k': 'p', 'seq': seq, 'busy': 1}
+                            elif 'error' in result:
+                                reply = {'k': 'e', 'seq': seq, 'error': result['error']}
+                            else:
+                                reply = {
+                                    'k': 'p',
+                                    'seq': seq,
+                                    't': result['text'],
+                                    'c': round(result['confidence'], 4),
+                                    'h': int(result['hand_detected']),
+                                    'fi': result['frame_interval_ms']
+                                }
+                                if 'hands' in result:
+                                    reply['hs'] = [
+                                        [hand['hand'], hand['text'], round(hand['confidence'], 4)]
+                                        for hand in result['hands']
+                                    ]
+                                if 'words' in result:
+                                    reply['w'] = result['words']
+                                if 'partial_word' in result:
+                                    reply['pw'] = result['partial_word']
+                                if 'overlay' in result:
+                                    reply['o'] = result['overlay']
+                        except Exception as e:
+                            logger.error(f"Error processing stream frame: {str(e)}")
+                            reply = {'k': 'e', 'seq': seq, 'error': str(e)}
+                        finally:
+                            rec_session.lock.release()
+                        ws.send(stream_message(reply))
+            
+            # Push sentence updates instead of having the client poll; the
+            # processed sentence is the one /add_to_sentence returns
+            if rec_session.processed_sentence != last_sentence:
+                last_sentence = rec_session.processed_sentence
+                ws.send(stream_message({
+                    'k': 's',
+                    'sentence': last_sentence,
+                    'reshaped': reshape_arabic_text(last_sentence)
+                }))
+            
+            # Keep the session alive for as long as the stream is open
+            rec_session = recognition_sessions.get(rec_session.session_id)
+
+@app.route('/inference_stats')
+def inference_stats():
+    stats = sign_classifier.get_stats()
+    stats['hand_detectors'] = hand_detector_pool.get_stats()
+    stats['detection'] = get_recognition_session().detection_scheduler.get_stats()
+    if reshape_cache is not None:
+        stats['reshape'] = reshape_cache.get_stats()
+    return jsonify(stats)
 
 @app.route('/speak', methods=['POST'])
 def speak_text():
@@ -531,24 +1362,18 @@ def speak_text():
 
 @app.route('/add_to_sentence', methods=['POST'])
 def add_to_sentence():
-    global current_sentence
+    rec_session = get_recognition_session()
     text = request.json.get('text', '')
     if text:
-        # Add the new text to recognized signs list for proper sentence building
-        if text not in recognized_signs:
-            recognized_signs.append(text)
-        
-        # If it's a single character and we already have text, treat it specially
-        if len(text) == 1 and current_sentence:
-            # For single letters, ensure proper spacing in Arabic
-            # We'll handle special grammar rules in combine_into_sentence
-            current_sentence += " " + text
-        else:
-            # For full words or starting a sentence
-            current_sentence += " " + text if current_sentence else text
-        
-        # Apply Arabic grammar rules to the whole sentence
-        processed_sentence = apply_arabic_grammar_rules(current_sentence)
+        # The client's frames update the same session while holding its lock
+        with rec_session.lock:
+            rec_session.append_to_sentence(text)
+            
+            # Misspelled fingerspelled words are corrected, then Arabic grammar
+            # rules are applied; only the changed tail is rescanned
+            processed_sentence = apply_arabic_grammar_rules(rec_session.current_sentence, rec_session.grammar_state,
+                                                            spell_corrector=spell_corrector)
+            rec_session.processed_sentence = processed_sentence
         
         # Reshape for proper display
         reshaped_sentence = reshape_arabic_text(processed_sentence)
@@ -570,40 +1395,33 @@ def suggest_words():
     if not letter:
         return jsonify({'suggestions': []})
     
-    # If we have suggestions for this letter in our dictionary
-    if letter in common_words:
-        suggestions = common_words[letter]
-        return jsonify({
-            'suggestions': suggestions[:5],  # Return top 5 suggestions
-            'reshaped_suggestions': [reshape_arabic_text(word) for word in suggestions[:5]]
-        })
-    
-    # If it's a word prefix (more than one letter)
-    if len(letter) > 1:
-        first_letter = letter[0]
-        if first_letter in common_words:
-            # Filter words that start with the given prefix
-            matching_words = [word for word in common_words[first_letter] 
-                              if word.startswith(letter)]
-            return jsonify({
-                'suggestions': matching_words[:5],
-                'reshaped_suggestions': [reshape_arabic_text(word) for word in matching_words[:5]]
-            })
-    
-    return jsonify({'suggestions': []})
+    # Top 5 completions by frequency (diacritics and alef forms are ignored)
+    suggestions = suggestion_index.top_k(letter, 5)
+    return jsonify({
+        'suggestions': suggestions,
+        'reshaped_suggestions': reshape_many(suggestions)
+    })
 
 @app.route('/clear_sentence', methods=['POST'])
 def clear_sentence():
-    global current_sentence
-    current_sentence = ""
-    return jsonify({'sentence': current_sentence})
+    rec_session = get_recognition_session()
+    with rec_session.lock:
+        rec_session.current_sentence = ""
+        rec_session.processed_sentence = ""
+        if rec_session.grammar_state is not None:
+            rec_session.grammar_state.reset()
+        if rec_session.word_state is not None:
+            rec_session.word_state.reset()
+    return jsonify({'sentence': ""})
 
 @app.route('/get_current_sentence', methods=['GET'])
 def get_current_sentence():
-    global current_sentence
+    rec_session = get_recognition_session()
+    with rec_session.lock:
+        sentence = rec_session.processed_sentence
     return jsonify({
-        'sentence': current_sentence,
-        'reshaped_sentence': reshape_arabic_text(current_sentence)
+        'sentence': sentence,
+        'reshaped_sentence': reshape_arabic_text(sentence)
     })
 
 @app.route('/save_session', methods=['POST'])
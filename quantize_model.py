@@ -0,0 +1,259 @@
+"""
+Full-Integer Quantization for Arabic Sign Language Recognition
+This script converts the Keras model to an int8 TensorFlow Lite model, calibrated
+on hand crops of the collected dataset, and only publishes it if its accuracy on the
+labelled crops stays close to the float model's.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import numpy as np
+import cv2
+import tensorflow as tf
+from tensorflow import keras
+import logging
+
+from utils.tflite_backend import TFLiteInterpreterPool
+from utils.preprocessing import CropPreprocessor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Quantization configuration
+CONFIG = {
+    'MODEL_PATH': 'Model/keras_model.h5',
+    'DATASET_DIR': 'static/dataset',
+    'OUTPUT_PATH': 'Model/model_int8.tflite',
+    'REPORT_PATH': 'Model/quantization_report.json',
+    'MAX_CALIBRATION_IMAGES': 300,  # Images fed to the converter's representative dataset
+    'MIN_CALIBRATION_IMAGES': 50,  # Warn below this; calibration gets unreliable
+    'MAX_ACCURACY_DROP': 0.01,  # Largest labelled top-1 accuracy loss allowed to publish
+    'CROP_OFFSET': 20,  # Pixels added around the hand, as the server does
+    'LATENCY_RUNS': 50,  # Single-frame invocations timed per model
+    'SEED': 42
+}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def load_dataset_images(dataset_dir, preprocessor, detect_hands=True):
+    """
+    Load, crop and preprocess every image under dataset_dir/<sign>/.
+
+    Hands are cropped and preprocessed exactly as the server does, so
+    calibration and evaluation see what the model sees at runtime.
+    Images without a detectable hand are skipped.
+    """
+    images = []
+    signs = []
+    skipped = 0
+    input_shape = (preprocessor.height, preprocessor.width, preprocessor.channels)
+
+    if not os.path.isdir(dataset_dir):
+        return np.zeros((0,) + input_shape, dtype=np.float32), signs
+
+    detector = None
+    if detect_hands:
+        from utils.hand_detector import HandDetector
+        detector = HandDetector(static_image_mode=True, max_hands=1)
+
+    for sign in sorted(os.listdir(dataset_dir)):
+        sign_dir = os.path.join(dataset_dir, sign)
+        if not os.path.isdir(sign_dir):
+            continue
+
+        for filename in sorted(os.listdir(sign_dir)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+
+            img = cv2.imread(os.path.join(sign_dir, filename), cv2.IMREAD_COLOR)
+            if img is None:
+                logger.warning(f"Skipping unreadable image {filename} for sign {sign}")
+                continue
+            if detector is not None:
+                img = detector.find_crop(img, offset=CONFIG['CROP_OFFSET'])
+                if img is None:
+                    skipped += 1
+                    continue
+
+            images.append(img)
+            signs.append(sign)
+
+    logger.info(f"Loaded {len(images)} images for {len(set(signs))} signs from {dataset_dir} ({skipped} without a hand skipped)")
+    if not images:
+        return np.zeros((0,) + input_shape, dtype=np.float32), signs
+
+    # fill() returns a view into a reused buffer, so keep a copy
+    return np.array(preprocessor.fill(images, bgr=True)), signs
+
+
+def convert_float(model):
+    """Convert the model to a float32 TensorFlow Lite model used as the reference."""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    return converter.convert()
+
+
+def convert_int8(model, calibration_images):
+    """Convert the model to a full-integer (int8 in, int8 out) TensorFlow Lite model."""
+    def representative_dataset():
+        for img in calibration_images:
+            yield [img[np.newaxis, ...]]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+
+    # Fail the conversion instead of silently keeping float ops
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+
+    return converter.convert()
+
+
+def measure_latency(pool, sample, runs):
+    """Average single-frame latency of a TFLite model in milliseconds."""
+    pool.predict(sample)  # Warm-up
+    start = time.perf_counter()
+    for _ in range(runs):
+        pool.predict(sample)
+    return (time.perf_counter() - start) / runs * 1000.0
+
+
+def evaluate(float_path, int8_path, images, signs, labels, latency_runs):
+    """Compare the int8 model with the float model on the dataset."""
+    float_pool = TFLiteInterpreterPool(float_path)
+    int8_pool = TFLiteInterpreterPool(int8_path)
+
+    float_probs = float_pool.predict(images)
+    int8_probs = int8_pool.predict(images)
+
+    float_top1 = np.argmax(float_probs, axis=1)
+    int8_top1 = np.argmax(int8_probs, axis=1)
+
+    report = {
+        'num_images': int(len(images)),
+        'top1_agreement': float(np.mean(float_top1 == int8_top1)),
+        'max_abs_probability_error': float(np.max(np.abs(float_probs - int8_probs))),
+        'float_latency_ms': measure_latency(float_pool, images[:1], latency_runs),
+        'int8_latency_ms': measure_latency(int8_pool, images[:1], latency_runs),
+        'float_size_bytes': os.path.getsize(float_path),
+        'int8_size_bytes': os.path.getsize(int8_path)
+    }
+
+    # Dataset folders are named after the signs, so accuracy is measurable
+    # whenever they match the model's labels
+    label_index = {label: i for i, label in enumerate(labels)}
+    known = [i for i, sign in enumerate(signs) if sign in label_index]
+    report['labelled_images'] = len(known)
+    if known:
+        targets = np.array([label_index[signs[i]] for i in known])
+        report['float_accuracy'] = float(np.mean(float_top1[known] == targets))
+        report['int8_accuracy'] = float(np.mean(int8_top1[known] == targets))
+        report['accuracy_drop'] = report['float_accuracy'] - report['int8_accuracy']
+
+    return report
+
+
+def load_labels(labels_path):
+    """Load class labels, one per line."""
+    if not os.path.exists(labels_path):
+        return []
+    with open(labels_path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f.readlines()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Quantize the sign classifier to int8 TensorFlow Lite")
+    parser.add_argument('--model', default=CONFIG['MODEL_PATH'], help="Keras model to quantize")
+    parser.add_argument('--dataset', default=CONFIG['DATASET_DIR'], help="Dataset directory with one folder per sign")
+    parser.add_argument('--output', default=CONFIG['OUTPUT_PATH'], help="Where to publish the int8 model")
+    parser.add_argument('--report', default=CONFIG['REPORT_PATH'], help="Where to write the comparison report")
+    parser.add_argument('--labels', default='Model/labels.txt', help="Labels file used for accuracy")
+    parser.add_argument('--max-accuracy-drop', type=float, default=CONFIG['MAX_ACCURACY_DROP'],
+                        help="Largest loss of labelled top-1 accuracy against the float model allowed to publish")
+    parser.add_argument('--no-detect', action='store_true', help="Use whole images instead of hand crops")
+    parser.add_argument('--max-calibration-images', type=int, default=CONFIG['MAX_CALIBRATION_IMAGES'])
+    parser.add_argument('--letterbox', action='store_true', help="Preprocess with aspect-preserving letterboxing")
+    return parser.parse_args()
+
+
+def main():
+    """Quantize, evaluate and conditionally publish the int8 model."""
+    args = parse_args()
+
+    logger.info(f"Loading model from {args.model}")
+    model = keras.models.load_model(args.model)
+    preprocessor = CropPreprocessor.from_keras_model(model, letterbox=args.letterbox)
+
+    images, signs = load_dataset_images(args.dataset, preprocessor, detect_hands=not args.no_detect)
+    if len(images) == 0:
+        logger.error(f"No images found under {args.dataset}; collect a dataset first")
+        return 1
+    if len(images) < CONFIG['MIN_CALIBRATION_IMAGES']:
+        logger.warning(f"Only {len(images)} images available; calibration ranges may be unreliable")
+
+    random.seed(CONFIG['SEED'])
+    calibration_indices = random.sample(range(len(images)), min(len(images), args.max_calibration_images))
+    calibration_images = images[calibration_indices]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        float_path = os.path.join(tmp_dir, 'model_float.tflite')
+        int8_path = os.path.join(tmp_dir, 'model_int8.tflite')
+
+        logger.info("Converting float reference model...")
+        with open(float_path, 'wb') as f:
+            f.write(convert_float(model))
+
+        logger.info(f"Converting int8 model with {len(calibration_images)} calibration images...")
+        with open(int8_path, 'wb') as f:
+            f.write(convert_int8(model, calibration_images))
+
+        report = evaluate(float_path, int8_path, images, signs, load_labels(args.labels), CONFIG['LATENCY_RUNS'])
+        report['max_accuracy_drop'] = args.max_accuracy_drop
+        report['calibration_images'] = len(calibration_images)
+        # Agreement alone can hide an accuracy loss, so publishing needs labels
+        report['published'] = report.get('accuracy_drop', float('inf')) <= args.max_accuracy_drop
+
+        logger.info(f"Top-1 agreement with the float model: {report['top1_agreement']:.3f}")
+        if 'accuracy_drop' in report:
+            logger.info(f"Accuracy: float={report['float_accuracy']:.3f}, int8={report['int8_accuracy']:.3f} "
+                        f"(drop {report['accuracy_drop']:.3f}, allowed {args.max_accuracy_drop:.3f})")
+        logger.info(f"Latency per frame: float={report['float_latency_ms']:.2f}ms, int8={report['int8_latency_ms']:.2f}ms")
+        logger.info(f"Size: float={report['float_size_bytes']/1024:.1f}KB, int8={report['int8_size_bytes']/1024:.1f}KB")
+
+        if report['published']:
+            os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+            with open(int8_path, 'rb') as src, open(args.output, 'wb') as dst:
+                dst.write(src.read())
+            report['output_path'] = args.output
+            logger.info(f"Int8 model published to {args.output}")
+        elif 'accuracy_drop' not in report:
+            logger.error("Int8 model rejected: no dataset folder matches a model label, so accuracy cannot be measured")
+        else:
+            logger.error("Int8 model rejected: accuracy dropped more than allowed")
+
+    os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info(f"Quantization report written to {args.report}")
+
+    return 0 if report['published'] else 1
+
+
+if __name__ == "__main__":
+    try:
+        exit_code = main()
+        sys.exit(exit_code)
+    except KeyboardInterrupt:
+        logger.info("Quantization interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        sys.exit(1)
@@ -8,7 +8,8 @@ class GestureRecognition {
         this.isRunning = false;
         this.isProcessing = false;
         this.lastPredictionTime = 0;
-        this.predictionInterval = 1000; // milliseconds between predictions
+        this.predictionInterval = 150; // milliseconds between predictions
+        this.serverFrameInterval = 0; // slower pace requested by the server while idle
         this.confidenceThreshold = 0.7;
         
         // Prediction results
@@ -30,9 +31,27 @@ class GestureRecognition {
         // API endpoints
         this.endpoints = {
             predict: '/api/predict',
-            processImage: '/process_image'
+            processImage: '/process_image',
+            stream: '/ws/recognize'
         };
         
+        // Streaming transport (falls back to HTTP when unavailable)
+        this.useStreaming = 'WebSocket' in window;
+        this.stream = null;
+        this.streamSeq = 0;
+        this.lastStreamSeq = -1;
+        
+        // Reconnects back off exponentially; after maxStreamRetries failed
+        // attempts in a row frames are only sent over HTTP
+        this.streamRetries = 0;
+        this.maxStreamRetries = 5;
+        this.streamRetryTimer = null;
+        
+        // Optional preview: the server returns overlay primitives that are
+        // drawn on this canvas (it never draws into frames itself)
+        this.overlayCanvas = null;
+        this.preview = false;
+        
         // Performance monitoring
         this.stats = {
             totalPredictions: 0,
@@ -146,7 +165,7 @@ class GestureRecognition {
             try {
                 const config = JSON.parse(savedConfig);
                 this.confidenceThreshold = config.confidenceThreshold || 0.7;
-                this.predictionInterval = config.predictionInterval || 1000;
+                this.predictionInterval = config.predictionInterval || 150;
                 this.smoothingWindow = config.smoothingWindow || 3;
             } catch (error) {
                 console.warn('Failed to load saved configuration:', error);
@@ -220,6 +239,10 @@ class GestureRecognition {
         this.isRunning = true;
         this.lastPredictionTime = 0;
         
+        if (this.useStreaming) {
+            this.connectStream();
+        }
+        
         console.log('Gesture recognition started');
         
         // Update UI
@@ -235,6 +258,7 @@ class GestureRecognition {
     stop() {
         this.isRunning = false;
         this.isProcessing = false;
+        this.disconnectStream();
         
         console.log('Gesture recognition stopped');
         
@@ -252,13 +276,20 @@ class GestureRecognition {
         
         // Check if enough time has passed since last prediction
         const currentTime = Date.now();
-        if (currentTime - this.lastPredictionTime < this.predictionInterval) {
+        if (currentTime - this.lastPredictionTime < this.getFrameInterval()) {
             return;
         }
         
-        this.isProcessing = true;
         this.lastPredictionTime = currentTime;
         
+        // Frames on the stream are pipelined; stale replies are dropped by sequence number
+        if (this.stream && this.stream.readyState === WebSocket.OPEN) {
+            this.sendStreamFrame(canvas);
+            return;
+        }
+        
+        this.isProcessing = true;
+        
         try {
             // Convert canvas to base64 image
             const base64Image = canvas.toDataURL('image/jpeg', 0.8);
@@ -274,6 +305,222 @@ class GestureRecognition {
         }
     }
     
+    /**
+     * Time to wait between frames: the user's setting, or longer while the
+     * server reports that the hand is idle
+     */
+    getFrameInterval() {
+        return Math.max(this.predictionInterval, this.serverFrameInterval);
+    }
+    
+    /**
+     * Apply the frame interval suggested by the server (signs are emitted
+     * by its stability vote, so sending faster than this is wasted work)
+     */
+    setServerFrameInterval(interval) {
+        if (typeof interval === 'number') {
+            this.serverFrameInterval = interval;
+        }
+    }
+    
+    /**
+     * Open the streaming recognition WebSocket
+     */
+    connectStream() {
+        if (this.stream) {
+            return;
+        }
+        
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const socket = new WebSocket(`${protocol}//${window.location.host}${this.endpoints.stream}`);
+        socket.binaryType = 'arraybuffer';
+        
+        socket.onopen = () => {
+            this.streamRetries = 0;
+            this.sendStreamConfig();
+        };
+        socket.onmessage = (event) => this.handleStreamMessage(event.data);
+        socket.onclose = () => {
+            this.stream = null;
+            if (!this.isRunning || !this.useStreaming) {
+                return;
+            }
+            
+            // Without a streaming endpoint every attempt fails: give up and stay on HTTP
+            this.streamRetries++;
+            if (this.streamRetries > this.maxStreamRetries) {
+                console.warn('Streaming unavailable, sending frames over HTTP');
+                this.useStreaming = false;
+                return;
+            }
+            
+            // Reconnect while recognition is still running, backing off 1 s, 2 s, 4 s, ... up to 30 s
+            const delay = Math.min(1000 * 2 ** (this.streamRetries - 1), 30000);
+            this.streamRetryTimer = setTimeout(() => {
+                this.streamRetryTimer = null;
+                this.connectStream();
+            }, delay);
+        };
+        socket.onerror = (error) => {
+            console.warn('Streaming connection failed, using HTTP:', error);
+        };
+        
+        this.stream = socket;
+        this.streamSeq = 0;
+        this.lastStreamSeq = -1;
+    }
+    
+    /**
+     * Close the streaming recognition WebSocket
+     */
+    disconnectStream() {
+        if (this.streamRetryTimer) {
+            clearTimeout(this.streamRetryTimer);
+            this.streamRetryTimer = null;
+        }
+        if (this.stream) {
+            const socket = this.stream;
+            this.stream = null;
+            socket.onclose = null;
+            socket.close();
+        }
+    }
+    
+    /**
+     * Send the current stream settings
+     */
+    sendStreamConfig() {
+        if (this.stream && this.stream.readyState === WebSocket.OPEN) {
+            this.stream.send(JSON.stringify({ type: 'config', preview: this.preview ? 1 : 0 }));
+        }
+    }
+    
+    /**
+     * Show the server's overlay on a canvas placed over the video, or pass
+     * null to turn the preview off
+     */
+    setPreviewCanvas(canvas) {
+        this.overlayCanvas = canvas;
+        this.preview = !!canvas;
+        this.sendStreamConfig();
+    }
+    
+    /**
+     * Draw overlay primitives ({w, h, p: [[kind, ...], ...]}) on the preview canvas
+     */
+    drawOverlay(overlay) {
+        const canvas = this.overlayCanvas;
+        if (!canvas || !overlay) {
+            return;
+        }
+        
+        const ctx = canvas.getContext('2d');
+        ctx.setTransform(1, 0, 0, 1, 0, 0);
+        ctx.clearRect(0, 0, canvas.width, canvas.height);
+        ctx.setTransform(canvas.width / overlay.w, 0, 0, canvas.height / overlay.h, 0, 0);
+        
+        for (const primitive of overlay.p) {
+            const kind = primitive[0];
+            if (kind === 's') {
+                const [, coords, color, width] = primitive;
+                ctx.strokeStyle = color;
+                ctx.lineWidth = width;
+                ctx.beginPath();
+                for (let i = 0; i < coords.length; i += 4) {
+                    ctx.moveTo(coords[i], coords[i + 1]);
+                    ctx.lineTo(coords[i + 2], coords[i + 3]);
+                }
+                ctx.stroke();
+            } else if (kind === 'c') {
+                const [, coords, radius, color] = primitive;
+                ctx.fillStyle = color;
+                ctx.beginPath();
+                for (let i = 0; i < coords.length; i += 2) {
+                    ctx.moveTo(coords[i] + radius, coords[i + 1]);
+                    ctx.arc(coords[i], coords[i + 1], radius, 0, 2 * Math.PI);
+                }
+                ctx.fill();
+            } else if (kind === 'r') {
+                const [, x1, y1, x2, y2, color, width] = primitive;
+                ctx.strokeStyle = color;
+                ctx.lineWidth = width;
+                ctx.strokeRect(x1, y1, x2 - x1, y2 - y1);
+            } else if (kind === 't') {
+                const [, x, y, text, color] = primitive;
+                ctx.fillStyle = color;
+                ctx.font = '24px sans-serif';
+                ctx.fillText(text, x, y);
+            } else if (kind === 'b') {
+                const [, x, y, width, height, color] = primitive;
+                ctx.fillStyle = color;
+                ctx.fillRect(x, y, width, height);
+            }
+        }
+    }
+    
+    /**
+     * Send a canvas frame as [uint32 sequence][JPEG bytes]
+     */
+    sendStreamFrame(canvas) {
+        const seq = this.streamSeq++;
+        
+        canvas.toBlob(async (blob) => {
+            if (!blob || !this.stream || this.stream.readyState !== WebSocket.OPEN) {
+                return;
+            }
+            
+            const jpeg = new Uint8Array(await blob.arrayBuffer());
+            const message = new Uint8Array(4 + jpeg.byteLength);
+            new DataView(message.buffer).setUint32(0, seq);
+            message.set(jpeg, 4);
+            
+            this.stream.send(message);
+        }, 'image/jpeg', 0.8);
+    }
+    
+    /**
+     * Handle a message pushed by the streaming endpoint
+     */
+    async handleStreamMessage(data) {
+        let message;
+        try {
+            message = JSON.parse(data);
+        } catch (error) {
+            console.error('Invalid stream message:', error);
+            return;
+        }
+        
+        if (message.k === 's') {
+            this.currentSentence = message.sentence;
+            this.updateCurrentSentenceDisplay();
+            
+            if (this.onSentenceUpdate) {
+                this.onSentenceUpdate(this.currentSentence);
+            }
+            return;
+        }
+        
+        // Drop results for frames older than one already shown
+        if (message.seq <= this.lastStreamSeq) {
+            return;
+        }
+        this.lastStreamSeq = message.seq;
+        
+        if (message.o) {
+            this.drawOverlay(message.o);
+        }
+        this.setServerFrameInterval(message.fi);
+        
+        if (message.k === 'e') {
+            this.handleError('فشل في التنبؤ', new Error(message.error));
+        } else if (message.k === 'p' && message.t) {
+            await this.handlePredictionResult({
+                prediction: message.t,
+                confidence: message.c
+            });
+        }
+    }
+    
     /**
      * Process image data for prediction
      */
@@ -287,7 +534,8 @@ class GestureRecognition {
             };
             
             // Send request to backend
-            const response = await fetch(this.endpoints.processImage, {
+            const url = this.preview ? `${this.endpoints.processImage}?preview=1` : this.endpoints.processImage;
+            const response = await fetch(url, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -305,6 +553,11 @@ class GestureRecognition {
             const processingTime = performance.now() - startTime;
             this.updateStats(processingTime, result.success);
             
+            if (result.overlay) {
+                this.drawOverlay(result.overlay);
+            }
+            this.setServerFrameInterval(result.frame_interval_ms);
+            
             if (result.success) {
                 await this.handlePredictionResult(result);
             } else {
@@ -937,6 +1190,25 @@ function setupGestureRecognitionUI() {
         });
     }
     
+    // Hand landmarks and box drawn by the server over the video
+    const previewToggle = document.getElementById('togglePreview');
+    const previewCanvas = document.getElementById('previewOverlay');
+    const video = document.getElementById('videoFeed');
+    if (previewToggle && previewCanvas && video) {
+        const fitPreview = () => {
+            if (previewToggle.checked) {
+                fitPreviewCanvas(previewCanvas, video);
+            }
+        };
+        previewToggle.addEventListener('change', () => {
+            previewCanvas.style.display = previewToggle.checked ? 'block' : 'none';
+            fitPreview();
+            gestureRecognition.setPreviewCanvas(previewToggle.checked ? previewCanvas : null);
+        });
+        video.addEventListener('playing', fitPreview);
+        window.addEventListener('resize', fitPreview);
+    }
+    
     // Settings modal save button
     const saveSettingsBtn = document.getElementById('saveRecognitionSettings');
     if (saveSettingsBtn) {
@@ -949,6 +1221,18 @@ function setupGestureRecognitionUI() {
     }
 }
 
+/**
+ * Place the preview canvas exactly over the displayed video
+ */
+function fitPreviewCanvas(canvas, video) {
+    canvas.style.left = `${video.offsetLeft}px`;
+    canvas.style.top = `${video.offsetTop}px`;
+    canvas.style.width = `${video.clientWidth}px`;
+    canvas.style.height = `${video.clientHeight}px`;
+    canvas.width = video.clientWidth;
+    canvas.height = video.clientHeight;
+}
+
 /**
  * Callback for prediction received
  */
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from utils.detector_pool import HandDetectorPool
+
+
+class FakeDetector:
+    def __init__(self):
+        self.resets = 0
+
+    def reset_tracking(self):
+        self.resets += 1
+
+
+def test_streams_keep_their_detector():
+    pool = HandDetectorPool(FakeDetector, size=2)
+    first = pool.acquire('a')
+    pool.release(first)
+    second = pool.acquire('b')
+    pool.release(second)
+    assert second is not first
+    assert pool.acquire('a') is first
+    assert pool.get_stats()['detectors'] == 2
+
+
+def test_full_pool_hands_over_least_recently_used_detector():
+    pool = HandDetectorPool(FakeDetector, size=1)
+    with pool.checkout('a') as detector:
+        assert pool.acquire('b', timeout=0.01) is None
+    assert pool.acquire('b') is detector
+    assert detector.resets == 1
+    assert pool.get_stats()['reassignments'] == 1
+
+
+def test_build_does_not_hold_the_lock():
+    building = threading.Event()
+    finish = threading.Event()
+    detectors = []
+
+    def factory():
+        detector = FakeDetector()
+        detectors.append(detector)
+        if len(detectors) == 2:
+            building.set()
+            assert finish.wait(5)
+        return detector
+
+    pool = HandDetectorPool(factory, size=2)
+    first = pool.acquire('a')
+    pool.release(first)
+
+    results = {}
+    thread = threading.Thread(target=lambda: results.setdefault('b', pool.acquire('b')))
+    thread.start()
+    assert building.wait(5)
+
+    # While 'b' builds its detector, other streams and stats are not blocked
+    assert pool.acquire('a', timeout=1) is first
+    assert pool.get_stats()['detectors'] == 1
+    pool.release(first)
+
+    finish.set()
+    thread.join(5)
+    assert results['b'] is detectors[1]
+    assert pool.get_stats()['detectors'] == 2
+
+
+def test_failed_build_frees_its_slot():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError('graph failed to start')
+        return FakeDetector()
+
+    pool = HandDetectorPool(factory, size=1)
+    with pytest.raises(RuntimeError):
+        pool.acquire('a')
+    detector = pool.acquire('b', timeout=1)
+    assert isinstance(detector, FakeDetector)
+    assert pool.get_stats()['busy'] == 1
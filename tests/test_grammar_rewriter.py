@@ -0,0 +1,73 @@
+import random
+
+from utils.grammar_rewriter import GrammarRewriter
+
+
+def sequential_rewrite(rules, text):
+    """Reference leftmost-longest rewrite: try every rule at every position"""
+    out = []
+    i = 0
+    while i < len(text):
+        match = max((pattern for pattern in rules if text.startswith(pattern, i)), key=len, default=None)
+        if match:
+            out.append(rules[match])
+            i += len(match)
+        else:
+            out.append(text[i])
+            i += 1
+    return "".join(out)
+
+
+def test_longest_match_wins():
+    rewriter = GrammarRewriter({'a b': 'X', 'a b c': 'Y'})
+    assert rewriter.rewrite('a b c d') == 'Y d'
+    assert rewriter.rewrite('a b d') == 'X d'
+
+
+def test_leftmost_match_wins_and_replacements_are_not_rescanned():
+    rewriter = GrammarRewriter({'b c': 'Z', 'a b': 'b c'})
+    # 'a b' starts first; its replacement 'b c' is not rewritten again
+    assert rewriter.rewrite('a b c') == 'b c c'
+
+
+def test_overlapping_patterns_found_through_failure_links():
+    rewriter = GrammarRewriter({'abcd': '1', 'bc': '2', 'c': '3'})
+    assert rewriter.rewrite('abce') == 'a2e'
+    assert rewriter.rewrite('abcd') == '1'
+    assert rewriter.rewrite('xcx') == 'x3x'
+
+
+def test_no_rules_and_empty_text():
+    assert GrammarRewriter({}).rewrite('a b') == 'a b'
+    assert GrammarRewriter({'a': 'b'}).rewrite('') == ''
+
+
+def test_matches_reference_on_random_text():
+    rng = random.Random(0)
+    alphabet = 'ab c'
+    for _ in range(200):
+        rules = {
+            ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))): ''.join(rng.choice('XYZ') for _ in range(rng.randint(0, 3)))
+            for _ in range(rng.randint(1, 6))
+        }
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert GrammarRewriter(rules).rewrite(text) == sequential_rewrite(rules, text)
+
+
+def test_incremental_rewrite_matches_full_rewrite():
+    rng = random.Random(1)
+    rules = {'a b': 'X', 'a b c': 'Y', 'b c': 'Z', 'c c c': 'W', ' ': ' '}
+    rewriter = GrammarRewriter(rules)
+    state = rewriter.create_state()
+    text = ''
+    for _ in range(500):
+        text += ''.join(rng.choice('abc ') for _ in range(rng.randint(1, 3)))
+        assert rewriter.rewrite_appended(state, text) == rewriter.rewrite(text)
+
+
+def test_incremental_rewrite_restarts_when_text_does_not_extend():
+    rewriter = GrammarRewriter({'a b': 'X'})
+    state = rewriter.create_state()
+    assert rewriter.rewrite_appended(state, 'a b a') == 'X a'
+    assert rewriter.rewrite_appended(state, 'b a b') == 'b X'
+    assert rewriter.rewrite_appended(state, '') == ''
@@ -0,0 +1,126 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from utils.compiled_model import CompiledModel, batch_buckets_up_to
+from utils.inference_scheduler import InferenceScheduler
+from utils.preprocessing import CropPreprocessor, model_input_scale, validate_crop
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'Model', 'keras_model.h5')
+ATOL = 1e-5
+
+
+@pytest.fixture(scope='module')
+def model():
+    """The bundled Keras classifier"""
+    return tf.keras.models.load_model(MODEL_PATH, compile=False)
+
+
+@pytest.fixture(scope='module')
+def compiled(model):
+    return CompiledModel(model, batch_buckets=batch_buckets_up_to(4))
+
+
+def random_crops(rng, count):
+    """Hand crops of assorted sizes and aspect ratios"""
+    return [rng.integers(0, 256, (rng.integers(20, 200), rng.integers(20, 200), 3), dtype=np.uint8)
+            for _ in range(count)]
+
+
+def reference_inputs(model, crops):
+    """Resize and scale the crops the straightforward way"""
+    height, width = model.input_shape[1:3]
+    scale = np.float32(model_input_scale(model))
+    return np.stack([cv2.resize(crop, (width, height)).astype(np.float32) * scale for crop in crops])
+
+
+def test_batch_buckets():
+    assert batch_buckets_up_to(1) == [1]
+    assert batch_buckets_up_to(16) == [1, 2, 4, 8, 16]
+    assert batch_buckets_up_to(12) == [1, 2, 4, 8, 12]
+
+
+@pytest.mark.parametrize('count', [1, 3, 4, 9])
+def test_compiled_model_matches_keras_predict(model, compiled, count):
+    # 3 is padded up to a bucket, 9 is split across several calls
+    batch = np.random.default_rng(count).uniform(0, 255, (count,) + model.input_shape[1:]).astype(np.float32)
+    expected = model.predict(batch, verbose=0)
+    np.testing.assert_allclose(compiled.predict(batch), expected, atol=ATOL)
+
+    # Padding buffers are reused; a second call must not see stale rows
+    np.testing.assert_allclose(compiled.predict(batch[:1]), expected[:1], atol=ATOL)
+
+
+def test_crop_preprocessor_matches_reference(model, compiled):
+    crops = random_crops(np.random.default_rng(0), 5)
+    preprocessor = CropPreprocessor.from_keras_model(model, max_batch_size=2)
+    expected = reference_inputs(model, crops)
+
+    inputs = preprocessor.fill(crops)
+    np.testing.assert_allclose(inputs, expected, atol=ATOL)
+    np.testing.assert_allclose(compiled.predict(inputs), model.predict(expected, verbose=0), atol=ATOL)
+
+    # BGR crops are converted to the RGB the model was trained on
+    bgr = [np.ascontiguousarray(crop[:, :, ::-1]) for crop in crops]
+    np.testing.assert_allclose(preprocessor.fill(bgr, bgr=True), expected, atol=ATOL)
+
+
+def test_crop_preprocessor_letterbox_keeps_aspect_ratio(model):
+    preprocessor = CropPreprocessor.from_keras_model(model, letterbox=True, pad_value=255)
+    height, width = model.input_shape[1:3]
+    crop = np.zeros((100, 50, 3), dtype=np.uint8)
+
+    image = preprocessor.fill([crop])[0] / preprocessor.input_scale
+    columns = image[height // 2, :, 0]
+    assert columns[0] == 255 and columns[-1] == 255
+    assert columns[width // 2] == 0
+    assert (columns == 0).sum() == width // 2
+
+
+def test_scheduler_matches_keras_predict(model, compiled):
+    preprocessor = CropPreprocessor.from_keras_model(model)
+    scheduler = InferenceScheduler(
+        lambda crops: compiled.predict(preprocessor.fill(crops)),
+        max_batch_size=4,
+        max_latency=0.01,
+        validate=validate_crop
+    )
+    rng = np.random.default_rng(1)
+    requests = [random_crops(rng, rng.integers(1, 4)) for _ in range(8)]
+    results = [None] * len(requests)
+
+    def run(i):
+        futures = scheduler.submit_many(requests[i])
+        results[i] = np.stack([future.result(timeout=30) for future in futures])
+
+    try:
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(requests))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+
+        for crops, result in zip(requests, results):
+            expected = model.predict(reference_inputs(model, crops), verbose=0)
+            np.testing.assert_allclose(result, expected, atol=ATOL)
+
+        stats = scheduler.get_stats()
+        assert stats['samples'] == sum(len(crops) for crops in requests)
+        assert stats['batches'] < stats['samples']
+    finally:
+        scheduler.close()
+
+
+def test_scheduler_rejects_bad_crops_on_submit(compiled):
+    scheduler = InferenceScheduler(lambda crops: compiled.predict(np.stack(crops)), validate=validate_crop)
+    try:
+        with pytest.raises(ValueError):
+            scheduler.submit_many([np.zeros((10, 10, 3), np.uint8), np.zeros((0, 10, 3), np.uint8)])
+        assert scheduler.get_stats()['samples'] == 0
+    finally:
+        scheduler.close()
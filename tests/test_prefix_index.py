@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from utils.prefix_index import PrefixIndex, load_prefix_index
+
+
+def brute_force_top_k(entries, prefix, k):
+    """Most frequent words starting with prefix; ties keep their order"""
+    matches = [(-frequency, i, word) for i, (word, frequency) in enumerate(entries) if word.startswith(prefix)]
+    return [word for _, _, word in sorted(matches)[:k]]
+
+
+def random_entries(rng, count):
+    words = {''.join(rng.choice('abc') for _ in range(rng.randint(1, 5))) for _ in range(count)}
+    return [(word, rng.randint(1, 20)) for word in sorted(words, key=lambda _: rng.random())]
+
+
+def test_top_k_orders_by_frequency():
+    index = PrefixIndex([('ab', 5), ('abc', 9), ('abd', 1), ('b', 100), ('a', 3)])
+    assert index.top_k('ab') == ['abc', 'ab', 'abd']
+    assert index.top_k('a', k=2) == ['abc', 'ab']
+    assert index.top_k('') == ['b', 'abc', 'ab', 'a', 'abd']
+    assert index.top_k('ab', k=0) == []
+
+
+def test_top_k_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(50):
+        entries = random_entries(rng, rng.randint(0, 60))
+        index = PrefixIndex(entries)
+        for prefix in ['', 'a', 'b', 'ab', 'ca', 'abc', 'ccc']:
+            k = rng.randint(1, 10)
+            assert index.top_k(prefix, k) == brute_force_top_k(entries, prefix, k)
+
+
+def test_queries_longer_than_key_width():
+    index = PrefixIndex([('abc', 3), ('abd', 2), ('b', 1)])
+    assert index.top_k('abcd') == []
+    assert index.top_k('abcdef') == []
+    assert 'abcd' not in index
+    assert index.get('abcx') is None
+    start, end = index.prefix_range('abcz')
+    assert start == end
+    assert index.top_k('abc') == ['abc']
+
+
+def test_normalized_lookup_returns_most_frequent_spelling():
+    index = PrefixIndex([('Ab', 1), ('aB', 4), ('ac', 2)], normalize=str.lower)
+    assert 'AB' in index
+    assert index.get('ab') == 'aB'
+    assert index.top_k('A') == ['aB', 'ac', 'Ab']
+
+
+def test_empty_index():
+    index = PrefixIndex([])
+    assert len(index) == 0
+    assert index.top_k('a') == []
+    assert 'a' not in index
+
+
+def test_save_and_load_round_trip(tmp_path):
+    rng = random.Random(1)
+    entries = random_entries(rng, 40)
+    index = PrefixIndex(entries)
+    path = str(tmp_path / 'index.npy')
+    index.save(path)
+
+    loaded = PrefixIndex.load(path)
+    assert len(loaded) == len(index)
+    for prefix in ['', 'a', 'bc', 'cab']:
+        assert loaded.top_k(prefix, 7) == index.top_k(prefix, 7)
+
+
+def test_saved_index_rebuilt_when_normalization_changes(tmp_path):
+    lexicon = tmp_path / 'lexicon.txt'
+    lexicon.write_text('Ab\t1\naB\t4\nac\t2\n', encoding='utf-8')
+    path = str(tmp_path / 'index.npy')
+
+    index = load_prefix_index(str(lexicon), path, normalize=str.lower, normalization='lower/1')
+    assert index.top_k('A') == ['aB', 'ac', 'Ab']
+    assert PrefixIndex.load(path, normalize=str.lower, normalization='lower/1').top_k('a') == index.top_k('a')
+
+    # Same lexicon, newer normalization: the saved keys are stale
+    with pytest.raises(ValueError):
+        PrefixIndex.load(path, normalize=str.upper, normalization='upper/1')
+    index = load_prefix_index(str(lexicon), path, normalize=str.upper, normalization='upper/1')
+    assert index.top_k('a') == ['aB', 'ac', 'Ab']
+    assert str(index.table['key'][0]) == 'AB'
+    PrefixIndex.load(path, normalize=str.upper, normalization='upper/1')
+
+
+def test_suggestions_from_an_ad_hoc_word_list():
+    from utils.arabic_text_utils import suggest_word_completions
+
+    words = ['أنا', 'أنت', 'بيت', 'انتظر']
+    assert suggest_word_completions('ان', words) == ['أنا', 'أنت', 'انتظر']
+    assert suggest_word_completions('ب', words) == ['بيت']
+    assert suggest_word_completions('', words) == []
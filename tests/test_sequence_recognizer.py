@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+import train_sequence_model
+from utils.sequence_recognizer import SequenceRecognizer, SEQUENCE_FEATURE_SIZE, resample_features
+
+WINDOW = 12
+MIN_FRAMES = 4
+FPS = 10.0
+
+
+@pytest.fixture
+def trained(tmp_path, monkeypatch):
+    """A small untrained network exported the way training exports it"""
+    pytest.importorskip('tensorflow')
+    monkeypatch.setitem(train_sequence_model.CONFIG, 'FILTERS', 8)
+
+    model = train_sequence_model.build_model(3, WINDOW)
+    # Non-zero biases, so zero frames do not give zero activations
+    rng = np.random.default_rng(0)
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if weights:
+            layer.set_weights([w + rng.normal(0, 0.1, w.shape).astype(np.float32) for w in weights])
+
+    path = str(tmp_path / 'sequence_model.npz')
+    train_sequence_model.export_weights(model, ['a', 'b', 'c'], WINDOW, path, fps=FPS)
+    return model, SequenceRecognizer(path, min_frames=MIN_FRAMES)
+
+
+def keras_predict(model, clip, end):
+    segment = train_sequence_model.clip_segment(clip, end, WINDOW, train_sequence_model.receptive_field())
+    return model(segment[None], training=False).numpy()[0]
+
+
+def test_streamed_output_matches_keras_model(trained):
+    model, recognizer = trained
+    clip = np.random.default_rng(1).normal(size=(3 * WINDOW, SEQUENCE_FEATURE_SIZE)).astype(np.float32)
+
+    state = recognizer.create_state()
+    for end in range(1, len(clip) + 1):
+        probabilities = recognizer.step(state, clip[end - 1])
+        if end < MIN_FRAMES:
+            assert probabilities is None
+        else:
+            np.testing.assert_allclose(probabilities, keras_predict(model, clip, end), atol=1e-5)
+
+
+def test_reset_starts_a_new_clip(trained):
+    model, recognizer = trained
+    rng = np.random.default_rng(2)
+    first = rng.normal(size=(20, SEQUENCE_FEATURE_SIZE)).astype(np.float32)
+    clip = rng.normal(size=(WINDOW, SEQUENCE_FEATURE_SIZE)).astype(np.float32)
+
+    state = recognizer.create_state()
+    for i, features in enumerate(first):
+        recognizer.update(state, features, i / FPS)
+    # The hand is gone for longer than max_gap seconds
+    recognizer.skip(state, len(first) / FPS + recognizer.max_gap + 0.1)
+    assert state.frames == 0
+
+    start = 100.0
+    for i, features in enumerate(clip):
+        probabilities = recognizer.update(state, features, start + i / FPS)
+    np.testing.assert_allclose(probabilities, keras_predict(model, clip, len(clip)), atol=1e-5)
+
+
+def test_detections_are_resampled_to_the_training_frame_rate(trained):
+    model, recognizer = trained
+    assert recognizer.fps == FPS
+    rng = np.random.default_rng(3)
+
+    # Detections at an irregular client pace, slower than the model's rate
+    times = np.cumsum(rng.uniform(0.1, 0.4, size=12))
+    detections = rng.normal(size=(len(times), SEQUENCE_FEATURE_SIZE)).astype(np.float32)
+    clip = resample_features(times, detections, FPS)
+
+    state = recognizer.create_state()
+    for time, features in zip(times, detections):
+        probabilities = recognizer.update(state, features, time)
+    assert state.frames == len(clip)
+    np.testing.assert_allclose(probabilities, keras_predict(model, clip, len(clip)), atol=1e-5)
+
+
+def test_detections_faster_than_the_frame_rate_do_not_step(trained):
+    _, recognizer = trained
+    state = recognizer.create_state()
+    features = np.zeros(SEQUENCE_FEATURE_SIZE, dtype=np.float32)
+    recognizer.update(state, features, 0.0)
+    assert recognizer.update(state, features, 0.5 / FPS) is None
+    assert state.frames == 1
+    recognizer.update(state, features, 1.0 / FPS)
+    assert state.frames == 2
@@ -0,0 +1,112 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from utils.prefix_index import PrefixIndex
+from utils.spell_corrector import ConfusionCosts, SpellCorrector, edit_distance, load_spell_corrector
+
+
+def random_index(rng, count):
+    words = {''.join(rng.choice('abcd') for _ in range(rng.randint(1, 9))) for _ in range(count)}
+    return PrefixIndex([(word, rng.randint(1, 100)) for word in sorted(words)])
+
+
+def test_edit_distance():
+    assert edit_distance('', 'abc') == 3
+    assert edit_distance('kitten', 'sitting') == 3
+    # Adjacent transposition counts as one edit
+    assert edit_distance('abdc', 'abcd') == 1
+    assert edit_distance('abc', 'abd', substitution_cost=lambda a, b: 0.25) == 0.25
+    assert edit_distance('aaaa', 'bbbb', limit=1) > 1
+
+
+def test_candidates_match_brute_force_within_distance_limit():
+    rng = random.Random(0)
+    index = random_index(rng, 300)
+    corrector = SpellCorrector(index, SpellCorrector.build_delete_table(index, 2))
+    keys = [str(key) for key in index.table['key']]
+
+    for _ in range(200):
+        word = ''.join(rng.choice('abcd') for _ in range(rng.randint(1, 9)))
+        allowed = corrector._allowed_distance(word)
+        expected = {key for key in keys if edit_distance(word, key) <= allowed}
+        found = corrector.candidates(word, k=len(keys))
+        assert {candidate for candidate, _ in found} == expected
+        assert all(distance <= allowed for _, distance in found)
+        assert [distance for _, distance in found] == sorted(distance for _, distance in found)
+
+
+def test_short_words_are_not_corrected():
+    index = PrefixIndex([('abc', 10), ('abcd', 5), ('abcdefg', 5)])
+    corrector = SpellCorrector(index, SpellCorrector.build_delete_table(index, 2))
+    assert corrector.correct('abd') == 'abd'
+    assert corrector.correct('abcdxfg') == 'abcdefg'
+    assert corrector.correct_text('abd abcdxfg') == 'abd abcdefg'
+
+
+def test_confusable_substitution_ranked_first():
+    index = PrefixIndex([('abcdex', 100), ('abcdey', 1)])
+    table = SpellCorrector.build_delete_table(index, 2)
+    counts = np.eye(4) * 10
+    # Intended 'y' is often recognized as 'z'
+    counts[3, 2] = 8
+    confusion = ConfusionCosts(['w', 'x', 'z', 'y'], counts)
+
+    assert SpellCorrector(index, table).correct('abcdez') == 'abcdex'
+    assert SpellCorrector(index, table, confusion=confusion).correct('abcdez') == 'abcdey'
+    assert confusion('y', 'z') < 1.0
+    assert confusion('z', 'y') == 1.0
+
+
+def test_cached_table_rebuilt_when_index_or_distance_changes(tmp_path):
+    path = str(tmp_path / 'deletes.npy')
+    index = PrefixIndex([('abcdef', 3), ('abcdxy', 1)])
+    assert load_spell_corrector(index, path, max_distance=1).table_distance == 1
+
+    loaded = SpellCorrector.load(index, path, max_distance=1)
+    assert len(loaded.delete_table) == len(SpellCorrector.build_delete_table(index, 1))
+
+    # More edits than the saved table covers
+    corrector = load_spell_corrector(index, path, max_distance=2)
+    assert corrector.table_distance == 2
+    with open(str(tmp_path / 'deletes.json'), encoding='utf-8') as f:
+        assert json.load(f)['max_distance'] == 2
+
+    # Same size, other keys
+    other = PrefixIndex([('abcdef', 3), ('abcdxz', 1)])
+    with pytest.raises(ValueError):
+        SpellCorrector.load(other, path, max_distance=2)
+    corrector = load_spell_corrector(other, path, max_distance=2)
+    assert corrector.correct('abcdxq') == 'abcdxz'
+    SpellCorrector.load(other, path, max_distance=2)
+
+
+def test_fingerspelled_words_corrected_on_the_sentence_path():
+    from utils.arabic_text_utils import LEXICON_PATH, apply_arabic_grammar_rules, grammar_rewriter, normalize_arabic_key
+    from utils.recognition_session import RecognitionSession
+
+    index = PrefixIndex.from_lexicon(LEXICON_PATH, normalize=normalize_arabic_key)
+    corrector = SpellCorrector(index, SpellCorrector.build_delete_table(index, 2))
+    session = RecognitionSession('test', grammar_factory=grammar_rewriter.create_state)
+
+    # What add_to_sentence does for every sign; 'ع' was recognized instead of 'ج'
+    sentences = []
+    for sign in ['أ', 'ر', 'ع', 'و', 'ك', 'شكرا', 'أ', 'ن', 'ا']:
+        session.append_to_sentence(sign)
+        sentences.append(apply_arabic_grammar_rules(session.current_sentence, session.grammar_state,
+                                                    spell_corrector=corrector))
+
+    assert session.current_sentence == 'أ ر ع و ك شكرا أ ن ا'
+    assert corrector.correct_text(session.current_sentence) == session.current_sentence
+    assert sentences[4] == 'أرجوك'
+    assert sentences[-1] == 'أرجوك شكرا أنا'
+
+
+def test_correct_signs_keeps_unknown_letters_separate():
+    index = PrefixIndex([('abcdef', 3), ('xy', 1)])
+    corrector = SpellCorrector(index, SpellCorrector.build_delete_table(index, 2))
+    assert corrector.correct_signs('a b c d x f') == 'abcdef'
+    assert corrector.correct_signs('q r s word x y') == 'q r s word xy'
+    assert corrector.correct_signs('') == ''
@@ -0,0 +1,76 @@
+import numpy as np
+
+from utils.stability import StabilityEmitter
+
+LABELS = ['a', 'b', 'c']
+A = [0.9, 0.05, 0.05]
+B = [0.05, 0.9, 0.05]
+UNSURE = [0.4, 0.3, 0.3]
+
+
+def feed(emitter, frames, labels=LABELS):
+    return [emitter.update(frame, labels)[0] for frame in frames]
+
+
+def test_emits_after_stable_frames():
+    emitter = StabilityEmitter(stable_frames=3)
+    assert feed(emitter, [A] * 3) == [None, None, 'a']
+
+
+def test_holding_a_sign_does_not_repeat_it():
+    emitter = StabilityEmitter(stable_frames=2)
+    assert feed(emitter, [A] * 10) == [None, 'a'] + [None] * 8
+    assert emitter.held == 8
+
+
+def test_sign_repeats_after_the_hand_leaves():
+    emitter = StabilityEmitter(stable_frames=2, release_frames=2)
+    feed(emitter, [A] * 2)
+
+    # A short dropout keeps the held sign
+    emitter.no_hand()
+    assert feed(emitter, [A] * 2) == [None, None]
+
+    for _ in range(2):
+        emitter.no_hand()
+    assert feed(emitter, [A] * 2) == [None, 'a']
+
+
+def test_another_sign_releases_the_held_one():
+    emitter = StabilityEmitter(alpha=1.0, stable_frames=2)
+    assert feed(emitter, [A, A, B, B, A, A]) == [None, 'a', None, 'b', None, 'a']
+
+
+def test_low_confidence_breaks_the_streak():
+    emitter = StabilityEmitter(alpha=1.0, stable_frames=2, min_confidence=0.6)
+    assert feed(emitter, [A, UNSURE, A, A]) == [None, None, None, 'a']
+    label, confidence = emitter.update(UNSURE, LABELS)
+    assert label is None and np.isclose(confidence, 0.4)
+
+
+def test_moving_average_smooths_single_frame_flicker():
+    emitter = StabilityEmitter(alpha=0.3, stable_frames=3)
+    assert feed(emitter, [A, A, B, A]) == [None, None, 'a', None]
+
+
+def test_another_classifier_resets_the_average():
+    emitter = StabilityEmitter(stable_frames=2)
+    feed(emitter, [A])
+    other_labels = ['x', 'y', 'z']
+    assert feed(emitter, [B, B], labels=other_labels) == [None, 'y']
+
+
+def test_suggested_interval_slows_down_while_idle():
+    emitter = StabilityEmitter(stable_frames=1, idle_frames=3, hold_frames=4,
+                               active_interval=0.1, idle_interval=1.0)
+    assert emitter.suggested_interval() == 0.1
+
+    for _ in range(3):
+        emitter.no_hand()
+    assert emitter.suggested_interval() == 1.0
+
+    # Signing again restores the fast pace until the sign is held too long
+    feed(emitter, [A] * 4)
+    assert emitter.suggested_interval() == 0.1
+    feed(emitter, [A])
+    assert emitter.suggested_interval() == 1.0
@@ -0,0 +1,81 @@
+import numpy as np
+
+from utils.prefix_index import PrefixIndex
+from utils.word_decoder import CharNgramModel, WordDecoder
+
+LABELS = ['a', 'b', 'c', 'd', 'hello']
+LEXICON = [('cab', 50), ('cad', 10), ('bad', 30), ('dab', 5), ('abc', 20), ('abcd', 8)]
+
+
+def make_decoder(**kwargs):
+    index = PrefixIndex(LEXICON)
+    return WordDecoder(index, CharNgramModel.from_index(index), **kwargs)
+
+
+def sign(letter, confidence=0.9, second=None, second_probability=0.0):
+    """Probabilities of an emitted sign, optionally with a runner-up letter"""
+    probabilities = np.full(len(LABELS), 0.0, dtype=np.float32)
+    probabilities[LABELS.index(letter)] = confidence
+    if second is not None:
+        probabilities[LABELS.index(second)] = second_probability
+    rest = 1.0 - probabilities.sum()
+    probabilities[probabilities == 0] = rest / (probabilities == 0).sum()
+    return probabilities
+
+
+def spell(decoder, state, signs):
+    words = []
+    for probabilities in signs:
+        words.extend(decoder.step(state, probabilities, LABELS))
+    return words
+
+
+def test_word_finishes_when_no_lexicon_word_extends_it():
+    decoder = make_decoder()
+    state = decoder.create_state()
+    assert spell(decoder, state, [sign('c'), sign('a')]) == []
+    assert decoder.partial(state) == 'ca'
+    assert spell(decoder, state, [sign('b')]) == ['cab']
+    assert state.steps == 0
+    assert decoder.partial(state) == ''
+
+
+def test_extendable_word_waits_for_end_word():
+    decoder = make_decoder()
+    state = decoder.create_state()
+    # 'abc' is a word, but 'abcd' extends it
+    assert spell(decoder, state, [sign('a'), sign('b'), sign('c')]) == []
+    assert decoder.end_word(state) == 'abc'
+    assert decoder.end_word(state) is None
+
+
+def test_second_ranked_letter_recovered_from_lexicon():
+    decoder = make_decoder()
+    state = decoder.create_state()
+    # The classifier prefers 'c' for the last letter but only 'bad' is a word
+    signs = [sign('b'), sign('a'), sign('c', 0.55, second='d', second_probability=0.4)]
+    assert spell(decoder, state, signs) == ['bad']
+
+
+def test_out_of_lexicon_spelling_kept_at_end_word():
+    decoder = make_decoder()
+    state = decoder.create_state()
+    assert spell(decoder, state, [sign('d'), sign('d'), sign('d')]) == []
+    assert decoder.end_word(state) == 'ddd'
+
+
+def test_whole_word_sign_flushes_word_in_progress():
+    decoder = make_decoder()
+    state = decoder.create_state()
+    spell(decoder, state, [sign('c'), sign('a')])
+    # The unfinished spelling is kept as signed, not completed to 'cab'
+    assert spell(decoder, state, [sign('hello')]) == ['ca', 'hello']
+    assert state.steps == 0
+
+
+def test_add_word_without_word_in_progress():
+    decoder = make_decoder()
+    state = decoder.create_state()
+    assert decoder.add_word(state, 'hello') == ['hello']
+    spell(decoder, state, [sign('b'), sign('a')])
+    assert decoder.add_word(state, 'good morning') == ['ba', 'good morning']
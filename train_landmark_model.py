@@ -0,0 +1,180 @@
+"""
+Train Landmark Classifier for Arabic Sign Language Recognition
+This script extracts MediaPipe hand landmarks from the collected dataset and trains
+a small MLP on them. The weights are exported to a NumPy .npz file so the server
+can classify landmarks without TensorFlow.
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import cv2
+import logging
+
+from utils.hand_detector import HandDetector
+from utils.landmark_classifier import normalize_landmarks_batch, FEATURE_SIZE
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Training configuration
+CONFIG = {
+    'DATASET_DIR': 'static/dataset',
+    'MODEL_PATH': 'Model/landmark_model.npz',
+    'FEATURES_CACHE': 'Model/landmark_features.npz',
+    'HIDDEN_UNITS': [128, 64],
+    'DROPOUT_RATE': 0.2,
+    'EPOCHS': 200,
+    'BATCH_SIZE': 32,
+    'LEARNING_RATE': 0.001,
+    'VALIDATION_SPLIT': 0.2,
+    'SEED': 42
+}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def extract_features(dataset_dir):
+    """
+    Run MediaPipe over every image under dataset_dir/<sign>/.
+
+    Returns:
+        Tuple: (features array of shape (n, 63), list of sign names per row)
+    """
+    detector = HandDetector(static_image_mode=True, max_hands=1)
+    points = []
+    hand_types = []
+    signs = []
+    skipped = 0
+
+    for sign in sorted(os.listdir(dataset_dir)):
+        sign_dir = os.path.join(dataset_dir, sign)
+        if not os.path.isdir(sign_dir):
+            continue
+
+        for filename in sorted(os.listdir(sign_dir)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+
+            img = cv2.imread(os.path.join(sign_dir, filename), cv2.IMREAD_COLOR)
+            if img is None:
+                skipped += 1
+                continue
+
+            detector.find_hands(img, draw=False)
+            if detector.num_hands == 0:
+                skipped += 1
+                continue
+
+            points.append(detector.find_landmark_array(img, hand_no=0))
+            hand_types.append(detector.get_hand_type(0))
+            signs.append(sign)
+
+    logger.info(f"Extracted landmarks from {len(points)} images ({skipped} skipped, no hand found)")
+    if not points:
+        return np.zeros((0, FEATURE_SIZE), dtype=np.float32), signs
+
+    # Normalize every hand in one vectorized pass
+    return normalize_landmarks_batch(np.stack(points), hand_types), signs
+
+
+def build_model(num_classes):
+    """Create the MLP used for landmark classification."""
+    from tensorflow import keras
+    from tensorflow.keras import layers
+
+    model = keras.Sequential([layers.Input(shape=(FEATURE_SIZE,))])
+    for units in CONFIG['HIDDEN_UNITS']:
+        model.add(layers.Dense(units, activation='relu'))
+        model.add(layers.Dropout(CONFIG['DROPOUT_RATE']))
+    model.add(layers.Dense(num_classes, activation='softmax'))
+
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=CONFIG['LEARNING_RATE']),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    return model
+
+
+def export_weights(model, labels, model_path):
+    """Save the Dense layer weights and labels in the format LandmarkClassifier loads."""
+    dense_layers = [layer for layer in model.layers if layer.get_weights()]
+    arrays = {'num_layers': np.array(len(dense_layers)), 'labels': np.array(labels)}
+    for i, layer in enumerate(dense_layers):
+        weight, bias = layer.get_weights()
+        arrays[f'W{i}'] = weight.astype(np.float32)
+        arrays[f'b{i}'] = bias.astype(np.float32)
+
+    os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+    np.savez(model_path, **arrays)
+    logger.info(f"Landmark model saved to {model_path}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the landmark-based sign classifier")
+    parser.add_argument('--dataset', default=CONFIG['DATASET_DIR'], help="Dataset directory with one folder per sign")
+    parser.add_argument('--output', default=CONFIG['MODEL_PATH'], help="Where to save the .npz model")
+    parser.add_argument('--cache', default=CONFIG['FEATURES_CACHE'], help="Extracted landmark cache")
+    parser.add_argument('--reextract', action='store_true', help="Ignore the cache and run MediaPipe again")
+    parser.add_argument('--epochs', type=int, default=CONFIG['EPOCHS'])
+    return parser.parse_args()
+
+
+def main():
+    """Extract landmarks, train the MLP and export it."""
+    args = parse_args()
+
+    if os.path.exists(args.cache) and not args.reextract:
+        with np.load(args.cache, allow_pickle=False) as data:
+            features, signs = data['features'], [str(sign) for sign in data['signs']]
+        logger.info(f"Loaded {len(features)} cached landmark vectors from {args.cache}")
+    else:
+        if not os.path.isdir(args.dataset):
+            logger.error(f"Dataset directory not found: {args.dataset}")
+            return 1
+        features, signs = extract_features(args.dataset)
+        os.makedirs(os.path.dirname(args.cache) or '.', exist_ok=True)
+        np.savez(args.cache, features=features, signs=np.array(signs))
+
+    labels = sorted(set(signs))
+    if len(labels) < 2:
+        logger.error("At least two signs with detectable hands are needed to train")
+        return 1
+
+    label_index = {label: i for i, label in enumerate(labels)}
+    targets = np.array([label_index[sign] for sign in signs])
+
+    # Shuffle before Keras takes the validation split from the end
+    rng = np.random.default_rng(CONFIG['SEED'])
+    order = rng.permutation(len(features))
+    features, targets = features[order], targets[order]
+
+    model = build_model(len(labels))
+    history = model.fit(
+        features, targets,
+        epochs=args.epochs,
+        batch_size=CONFIG['BATCH_SIZE'],
+        validation_split=CONFIG['VALIDATION_SPLIT'] if len(features) >= 10 else 0.0,
+        verbose=2
+    )
+
+    final = {key: values[-1] for key, values in history.history.items()}
+    logger.info("Final metrics: " + ", ".join(f"{key}={value:.3f}" for key, value in final.items()))
+
+    export_weights(model, labels, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        exit_code = main()
+        sys.exit(exit_code)
+    except KeyboardInterrupt:
+        logger.info("Training interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        sys.exit(1)
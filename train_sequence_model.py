@@ -0,0 +1,287 @@
+"""
+Train Sequence Model for Dynamic Arabic Signs
+This script turns short video clips of motion signs (e.g. "السلام عليكم", "شكراً")
+into landmark features resampled to a fixed frame rate and trains a causal temporal
+convolution network on clip prefixes, exactly as SequenceRecognizer sees them when
+it steps one frame at a time after a reset. The weights are exported to a NumPy
+.npz file.
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import cv2
+import logging
+
+from utils.sequence_recognizer import sequence_features, resample_features, SEQUENCE_FEATURE_SIZE
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Training configuration
+CONFIG = {
+    'SEQUENCES_DIR': 'static/sequences',
+    'MODEL_PATH': 'Model/sequence_model.npz',
+    'FEATURES_CACHE': 'Model/sequence_features.npz',
+    'FPS': 15.0,  # Model steps per second (training and runtime)
+    'WINDOW': 30,  # Frames pooled per prediction (training and runtime)
+    'WINDOW_STRIDE': 5,
+    'MIN_FRAMES': 10,  # Frames before the runtime reports (SequenceRecognizer min_frames)
+    'FILTERS': 64,
+    'KERNEL_SIZE': 3,
+    'DILATIONS': [1, 2, 4],
+    'DROPOUT_RATE': 0.3,
+    'EPOCHS': 100,
+    'BATCH_SIZE': 32,
+    'LEARNING_RATE': 0.001,
+    'VALIDATION_SPLIT': 0.2,
+    'SEED': 42
+}
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.webm', '.mkv')
+
+
+def extract_clip(detector, path, fps=CONFIG['FPS']):
+    """
+    Run MediaPipe over every frame of a clip and resample it to the model's frame rate.
+
+    Frames without a hand are interpolated over, as the runtime does
+    between detections.
+
+    Returns:
+        float32 array of shape (steps, 66)
+    """
+    if path.lower().endswith('.npy'):
+        # Precomputed features are expected at the model's frame rate already
+        return np.load(path).astype(np.float32).reshape(-1, SEQUENCE_FEATURE_SIZE)
+
+    # Every clip starts with fresh tracking state
+    detector.hands.reset()
+    capture = cv2.VideoCapture(path)
+    video_fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    times = []
+    features = []
+    frame_no = 0
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frame_no += 1
+        detector.find_hands(frame, draw=False)
+        if detector.num_hands == 0:
+            continue
+        height, width = frame.shape[:2]
+        times.append((frame_no - 1) / video_fps)
+        features.append(sequence_features(detector.landmarks[0], detector.get_hand_type(0), width, height))
+    capture.release()
+
+    features = np.asarray(features, dtype=np.float32).reshape(-1, SEQUENCE_FEATURE_SIZE)
+    return resample_features(times, features, fps)
+
+
+def receptive_field():
+    """Number of past frames a network output depends on besides the current one."""
+    return sum((CONFIG['KERNEL_SIZE'] - 1) * dilation for dilation in CONFIG['DILATIONS'])
+
+
+def clip_segment(clip, end, window, field):
+    """
+    Build the network input for the prediction made after clip[end - 1].
+
+    At runtime a sequence starts from a reset state that behaves like an
+    endless run of zero frames, so the clip prefix is preceded by zeros.
+    The network sees the last window + field frames of that stream: the
+    first field frames only feed the receptive field of the window's
+    outputs, which are the ones pooled (see build_model).
+
+    Args:
+        clip: Array of per-frame features, shape (frames, 66)
+        end: Number of frames of the clip seen so far
+        window: Frames pooled per prediction
+        field: Receptive field of the network (see receptive_field)
+
+    Returns:
+        float32 array of shape (window + field, 66)
+    """
+    length = window + field
+    segment = np.zeros((length, SEQUENCE_FEATURE_SIZE), dtype=np.float32)
+    prefix = clip[max(0, end - length):end]
+    segment[length - len(prefix):] = prefix
+    return segment
+
+
+def extract_windows(sequences_dir, window, stride, min_frames=CONFIG['MIN_FRAMES'], fps=CONFIG['FPS']):
+    """
+    Turn every clip under sequences_dir/<sign>/ into the inputs of its predictions.
+
+    A segment is taken after every stride frames of a clip, from min_frames
+    on, so early (partly empty) windows are trained on just like the
+    runtime reports them. Clips may be videos or .npy arrays of
+    precomputed features sampled at fps.
+
+    Returns:
+        Tuple: (segments array of shape (n, window + receptive field, 66),
+        list of sign names per segment)
+    """
+    from utils.hand_detector import HandDetector
+
+    field = receptive_field()
+    detector = HandDetector(static_image_mode=False, max_hands=1)
+    windows = []
+    signs = []
+    short = 0
+
+    for sign in sorted(os.listdir(sequences_dir)):
+        sign_dir = os.path.join(sequences_dir, sign)
+        if not os.path.isdir(sign_dir):
+            continue
+
+        for filename in sorted(os.listdir(sign_dir)):
+            if not filename.lower().endswith(VIDEO_EXTENSIONS + ('.npy',)):
+                continue
+
+            clip = extract_clip(detector, os.path.join(sign_dir, filename), fps)
+            if len(clip) < min_frames:
+                short += 1
+                continue
+
+            # Predictions along the clip; the last one always ends at the clip's end
+            ends = list(range(min_frames, len(clip) + 1, stride))
+            if ends[-1] != len(clip):
+                ends.append(len(clip))
+            for end in ends:
+                windows.append(clip_segment(clip, end, window, field))
+                signs.append(sign)
+
+    logger.info(f"Extracted {len(windows)} windows for {len(set(signs))} signs ({short} clips shorter than {min_frames} frames skipped)")
+    if not windows:
+        return np.zeros((0, window + field, SEQUENCE_FEATURE_SIZE), dtype=np.float32), signs
+    return np.stack(windows), signs
+
+
+def build_model(num_classes, window):
+    """Create the causal temporal convolution network over clip_segment inputs."""
+    from tensorflow import keras
+    from tensorflow.keras import layers
+
+    field = receptive_field()
+    model = keras.Sequential([layers.Input(shape=(window + field, SEQUENCE_FEATURE_SIZE))])
+    for dilation in CONFIG['DILATIONS']:
+        model.add(layers.Conv1D(CONFIG['FILTERS'], CONFIG['KERNEL_SIZE'], dilation_rate=dilation,
+                                padding='causal', activation='relu'))
+    # Only the window's outputs are pooled; their receptive fields lie inside the segment
+    model.add(layers.Cropping1D((field, 0)))
+    model.add(layers.GlobalAveragePooling1D())
+    model.add(layers.Dropout(CONFIG['DROPOUT_RATE']))
+    model.add(layers.Dense(num_classes, activation='softmax'))
+
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=CONFIG['LEARNING_RATE']),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    return model
+
+
+def export_weights(model, labels, window, model_path, fps=CONFIG['FPS']):
+    """Save the convolution and output weights in the format SequenceRecognizer loads."""
+    conv_layers = [layer for layer in model.layers if layer.__class__.__name__ == 'Conv1D']
+    dense = [layer for layer in model.layers if layer.__class__.__name__ == 'Dense'][-1]
+
+    arrays = {
+        'num_layers': np.array(len(conv_layers)),
+        'dilations': np.array([layer.dilation_rate[0] for layer in conv_layers]),
+        'window': np.array(window),
+        'fps': np.array(fps),
+        'labels': np.array(labels)
+    }
+    for i, layer in enumerate(conv_layers):
+        kernel, bias = layer.get_weights()
+        arrays[f'K{i}'] = kernel.astype(np.float32)
+        arrays[f'c{i}'] = bias.astype(np.float32)
+    weight, bias = dense.get_weights()
+    arrays['W'] = weight.astype(np.float32)
+    arrays['b'] = bias.astype(np.float32)
+
+    os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+    np.savez(model_path, **arrays)
+    logger.info(f"Sequence model saved to {model_path}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the temporal model for dynamic signs")
+    parser.add_argument('--sequences', default=CONFIG['SEQUENCES_DIR'], help="Directory with one folder of clips per sign")
+    parser.add_argument('--output', default=CONFIG['MODEL_PATH'], help="Where to save the .npz model")
+    parser.add_argument('--cache', default=CONFIG['FEATURES_CACHE'], help="Extracted window cache")
+    parser.add_argument('--reextract', action='store_true', help="Ignore the cache and run MediaPipe again")
+    parser.add_argument('--window', type=int, default=CONFIG['WINDOW'])
+    parser.add_argument('--fps', type=float, default=CONFIG['FPS'], help="Model steps per second")
+    parser.add_argument('--epochs', type=int, default=CONFIG['EPOCHS'])
+    return parser.parse_args()
+
+
+def main():
+    """Extract windows, train the network and export it."""
+    args = parse_args()
+
+    windows = None
+    length = args.window + receptive_field()
+    if os.path.exists(args.cache) and not args.reextract:
+        with np.load(args.cache, allow_pickle=False) as data:
+            cached_fps = float(data['fps']) if 'fps' in data.files else None
+            if data['windows'].ndim == 3 and data['windows'].shape[1] == length and cached_fps == args.fps:
+                windows, signs = data['windows'], [str(sign) for sign in data['signs']]
+                logger.info(f"Loaded {len(windows)} cached windows from {args.cache}")
+            else:
+                logger.info(f"Cached windows in {args.cache} do not match the network, extracting again")
+
+    if windows is None:
+        if not os.path.isdir(args.sequences):
+            logger.error(f"Sequences directory not found: {args.sequences}")
+            return 1
+        windows, signs = extract_windows(args.sequences, args.window, CONFIG['WINDOW_STRIDE'], fps=args.fps)
+        os.makedirs(os.path.dirname(args.cache) or '.', exist_ok=True)
+        np.savez(args.cache, windows=windows, signs=np.array(signs), fps=np.array(args.fps))
+
+    labels = sorted(set(signs))
+    if len(labels) < 2:
+        logger.error("At least two signs with usable clips are needed to train")
+        return 1
+
+    window = args.window
+    label_index = {label: i for i, label in enumerate(labels)}
+    targets = np.array([label_index[sign] for sign in signs])
+
+    # Shuffle before Keras takes the validation split from the end
+    rng = np.random.default_rng(CONFIG['SEED'])
+    order = rng.permutation(len(windows))
+    windows, targets = windows[order], targets[order]
+
+    model = build_model(len(labels), window)
+    history = model.fit(
+        windows, targets,
+        epochs=args.epochs,
+        batch_size=CONFIG['BATCH_SIZE'],
+        validation_split=CONFIG['VALIDATION_SPLIT'] if len(windows) >= 10 else 0.0,
+        verbose=2
+    )
+
+    final = {key: values[-1] for key, values in history.history.items()}
+    logger.info("Final metrics: " + ", ".join(f"{key}={value:.3f}" for key, value in final.items()))
+
+    export_weights(model, labels, window, args.output, fps=args.fps)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        exit_code = main()
+        sys.exit(exit_code)
+    except KeyboardInterrupt:
+        logger.info("Training interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        sys.exit(1)
@@ -1,6 +1,123 @@
 import arabic_reshaper
 from bidi.algorithm import get_display
+import os
 import re
+import threading
+from collections import OrderedDict
+
+from utils.grammar_rewriter import GrammarRewriter
+from utils.prefix_index import PrefixIndex
+
+def _reshape_uncached(text):
+    """Run the reshaper and the bidi algorithm on a string"""
+    try:
+        # Reshape Arabic text to handle character connections
+        reshaped_text = arabic_reshaper.reshape(text)
+        
+        # Apply bidirectional algorithm for proper display
+        display_text = get_display(reshaped_text)
+        
+        return display_text
+    except Exception as e:
+        print(f"Error reshaping Arabic text: {str(e)}")
+        return text
+
+class ReshapeCache:
+    def __init__(self, max_size=1024):
+        """
+        Initialize the memoized reshaping layer
+        
+        Labels, common words and sentences repeat constantly, so reshaped
+        strings are kept: a fixed table for the known vocabulary, built once
+        with precompute, and a bounded LRU for everything else.
+        
+        Args:
+            max_size: Maximum number of strings in the LRU part
+        """
+        self.max_size = max_size
+        self._table = {}
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+    
+    def precompute(self, texts):
+        """
+        Reshape a known vocabulary once; these entries are never evicted
+        
+        Args:
+            texts: Iterable of strings
+        """
+        table = {text: _reshape_uncached(text) for text in set(texts) if text}
+        with self._lock:
+            self._table.update(table)
+    
+    def reshape(self, text):
+        """
+        Get the display form of a string
+        
+        Args:
+            text: Arabic text string
+            
+        Returns:
+            Properly shaped Arabic text
+        """
+        if not text:
+            return text
+        
+        with self._lock:
+            display_text = self._table.get(text)
+            if display_text is None:
+                display_text = self._recent.get(text)
+                if display_text is not None:
+                    self._recent.move_to_end(text)
+            if display_text is not None:
+                self.hits += 1
+                return display_text
+            self.misses += 1
+        
+        # Reshape outside the lock; a concurrent miss on the same string only costs a repeat
+        display_text = _reshape_uncached(text)
+        with self._lock:
+            self._recent[text] = display_text
+            self._recent.move_to_end(text)
+            while len(self._recent) > self.max_size:
+                self._recent.popitem(last=False)
+        return display_text
+    
+    def reshape_many(self, texts):
+        """
+        Get the display forms of several strings
+        
+        Args:
+            texts: Iterable of strings
+            
+        Returns:
+            List of reshaped strings in the same order
+        """
+        return [self.reshape(text) for text in texts]
+    
+    def get_stats(self):
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with table and LRU sizes, hits, misses and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'precomputed': len(self._table),
+                'cached': len(self._recent),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+reshape_cache = ReshapeCache()
 
 def reshape_arabic_text(text):
     """
@@ -12,27 +129,62 @@ def reshape_arabic_text(text):
     Returns:
         Properly shaped Arabic text
     """
-    if not text:
-        return text
-        
-    try:
-        # Reshape Arabic text to handle character connections
-        reshaped_text = arabic_reshaper.reshape(text)
+    return reshape_cache.reshape(text)
+
+def reshape_many(texts):
+    """
+    Reshape a list of Arabic strings for display
+    
+    Args:
+        texts: Iterable of Arabic text strings
         
-        # Apply bidirectional algorithm for proper display
-        display_text = get_display(reshaped_text)
+    Returns:
+        List of properly shaped strings
+    """
+    return reshape_cache.reshape_many(texts)
+
+def precompute_reshaped(texts):
+    """
+    Reshape a fixed vocabulary (labels, common words) ahead of time
+    
+    Args:
+        texts: Iterable of Arabic text strings
+    """
+    reshape_cache.precompute(texts)
+
+GRAMMAR_RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'grammar_rules.json')
+
+def load_grammar_rewriter(path=GRAMMAR_RULES_PATH):
+    """
+    Compile the grammar rules file into a rewriter
+    
+    Args:
+        path: Path to the JSON rules file
         
-        return display_text
+    Returns:
+        GrammarRewriter (without rules if the file cannot be read)
+    """
+    try:
+        rewriter = GrammarRewriter.from_file(path)
+        print(f"Loaded {rewriter.num_rules} grammar rules from {path}")
+        return rewriter
     except Exception as e:
-        print(f"Error reshaping Arabic text: {str(e)}")
-        return text
+        print(f"Error loading grammar rules: {str(e)}")
+        return GrammarRewriter({})
+
+# Built once; every rule is applied in a single pass over the text
+grammar_rewriter = load_grammar_rewriter()
 
-def apply_arabic_grammar_rules(signs_list):
+def apply_arabic_grammar_rules(signs_list, state=None, spell_corrector=None):
     """
     Apply basic Arabic grammar rules to a list of signs
     
     Args:
-        signs_list: List of Arabic signs/letters
+        signs_list: List of Arabic signs/letters, or an already joined string
+        state: RewriteState of a sentence that grows by appending (optional);
+            only its new tail is then rewritten
+        spell_corrector: SpellCorrector applied to the fingerspelled words
+            before the grammar rules (optional)
         
     Returns:
         Text with basic grammar rules applied
@@ -40,20 +192,28 @@ def apply_arabic_grammar_rules(signs_list):
     if not signs_list:
         return ""
     
-    # Join signs into text
-    text = " ".join(signs_list)
+    # Join signs into text (a string is already joined)
+    text = signs_list if isinstance(signs_list, str) else " ".join(signs_list)
+    
+    # Correct whole spelled words while their letters are still separate signs
+    if spell_corrector is not None:
+        text = spell_corrector.correct_signs(re.sub(r'\s+', ' ', text.strip()))
     
     # Apply basic grammar rules
-    text = apply_basic_grammar(text)
+    text = apply_basic_grammar(text, state)
     
     return text
 
-def apply_basic_grammar(text):
+def apply_basic_grammar(text, state=None):
     """
     Apply basic Arabic grammar transformations
     
+    Rules come from data/grammar_rules.json. At every position the
+    longest matching rule is replaced, scanning left to right once.
+    
     Args:
         text: Arabic text
+        state: RewriteState for incremental rewriting (optional)
         
     Returns:
         Text with basic grammar applied
@@ -64,41 +224,9 @@ def apply_basic_grammar(text):
     # Remove extra spaces
     text = re.sub(r'\s+', ' ', text.strip())
     
-    # Basic word corrections and combinations
-    grammar_rules = {
-        # Common letter combinations that form words
-        'أ ن ا': 'أنا',
-        'أ ن ت': 'أنت',
-        'ه ذ ا': 'هذا',
-        'ه ذ ه': 'هذه',
-        'م ن': 'من',
-        'إ ل ى': 'إلى',
-        'ع ل ى': 'على',
-        'ف ي': 'في',
-        'م ع': 'مع',
-        'ل ا': 'لا',
-        'ن ع م': 'نعم',
-        
-        # Common prefixes
-        'ال ': 'ال',  # Definite article
-        'و ال': 'وال',  # And + definite article
-        'ب ال': 'بال',  # With + definite article
-        'ل ل': 'لل',    # For + definite article
-        
-        # Common suffixes
-        ' ة': 'ة',     # Feminine marker
-        ' ها': 'ها',   # Her/its
-        ' هم': 'هم',   # Their (masculine)
-        ' هن': 'هن',   # Their (feminine)
-        ' ك': 'ك',     # Your
-        ' ي': 'ي',     # My
-    }
-    
-    # Apply grammar rules
-    for pattern, replacement in grammar_rules.items():
-        text = text.replace(pattern, replacement)
-    
-    return text
+    if state is not None:
+        return grammar_rewriter.rewrite_appended(state, text)
+    return grammar_rewriter.rewrite(text)
 
 def detect_word_boundaries(signs_list):
     """
@@ -146,39 +274,35 @@ def detect_word_boundaries(signs_list):
     
     return words
 
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'arabic_lexicon.txt')
+
+_default_suggestion_index = None
+
 def suggest_word_completions(partial_word, word_list=None):
     """
     Suggest word completions for a partial Arabic word
     
     Args:
         partial_word: Partial word to complete
-        word_list: List of words to search in (optional)
+        word_list: List of words to search in, in order of preference
+            (optional; defaults to data/arabic_lexicon.txt ranked by frequency)
         
     Returns:
         List of suggested completions
     """
+    global _default_suggestion_index
+    
     if not partial_word:
         return []
     
-    # Default Arabic words if none provided
     if word_list is None:
-        word_list = [
-            'أنا', 'أنت', 'أنتم', 'أنتن', 'هو', 'هي', 'نحن', 'هم', 'هن',
-            'بيت', 'مدرسة', 'كتاب', 'قلم', 'طاولة', 'كرسي', 'باب', 'نافذة',
-            'ماء', 'طعام', 'خبز', 'لحم', 'خضار', 'فاكهة', 'تفاح', 'برتقال',
-            'أحمر', 'أزرق', 'أخضر', 'أصفر', 'أبيض', 'أسود', 'كبير', 'صغير',
-            'سعيد', 'حزين', 'جميل', 'قبيح', 'سريع', 'بطيء', 'قوي', 'ضعيف',
-            'أمس', 'اليوم', 'غداً', 'صباح', 'مساء', 'ليل', 'شهر', 'سنة'
-        ]
+        if _default_suggestion_index is None:
+            _default_suggestion_index = PrefixIndex.from_lexicon(LEXICON_PATH, normalize=normalize_arabic_key)
+        return _default_suggestion_index.top_k(partial_word, 10)  # Return top 10 suggestions
     
-    suggestions = []
-    partial_lower = partial_word.lower()
-    
-    for word in word_list:
-        if word.lower().startswith(partial_lower):
-            suggestions.append(word)
-    
-    return suggestions[:10]  # Return top 10 suggestions
+    # An ad-hoc list is scanned once; indexing it would cost more than that
+    key = normalize_arabic_key(partial_word)
+    return [word for word in word_list if normalize_arabic_key(word).startswith(key)][:10]
 
 def is_arabic_text(text):
     """
@@ -219,6 +343,26 @@ def clean_arabic_text(text):
     
     return text
 
+# Recorded with saved lexicon indexes; bump whenever normalize_arabic_key changes
+ARABIC_KEY_NORMALIZATION = 'normalize_arabic_key/1'
+
+# Alef with hamza or madda, and alef wasla, are searched as a bare alef
+_ALEF_FORMS = str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا'})
+
+def normalize_arabic_key(text):
+    """
+    Normalize Arabic text for lookups (diacritics removed, alef forms unified)
+    
+    Args:
+        text: Arabic text
+        
+    Returns:
+        Normalized text; only for matching, not for display
+    """
+    if not text:
+        return ""
+    return clean_arabic_text(text).translate(_ALEF_FORMS)
+
 def get_text_direction(text):
     """
     Determine text direction (RTL for Arabic, LTR for others)
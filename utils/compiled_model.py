@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+
+logger = logging.getLogger(__name__)
+
+
+def batch_buckets_up_to(max_batch_size):
+    """
+    Get power-of-two batch sizes up to and including max_batch_size
+
+    Args:
+        max_batch_size: Largest batch size that will be requested
+
+    Returns:
+        Sorted list of bucket sizes, e.g. [1, 2, 4, 8, 16]
+    """
+    buckets = []
+    size = 1
+    while size < max_batch_size:
+        buckets.append(size)
+        size *= 2
+    buckets.append(max_batch_size)
+    return buckets
+
+
+class CompiledModel:
+    def __init__(self, model, batch_buckets=(1,), jit_compile=False, warmup=True):
+        """
+        Wrap a Keras model in traced tf.functions with fixed input signatures
+
+        model.predict() builds a data adapter and a tf.data pipeline on every
+        call, which dominates the cost of tiny batches. Calling a traced
+        function directly avoids that. One concrete function is traced per
+        batch bucket and smaller batches are zero-padded up to the nearest
+        bucket, so no retracing happens at serving time.
+
+        Args:
+            model: Loaded Keras model with a static input shape
+            batch_buckets: Batch sizes to trace
+            jit_compile: Whether to compile the functions with XLA
+            warmup: Whether to trace every bucket immediately
+        """
+        self.model = model
+        self.input_shape = tuple(model.input_shape[1:])
+        self.batch_buckets = sorted(set(batch_buckets))
+        self.jit_compile = jit_compile
+
+        # One concrete function per bucket, called directly to skip dispatch
+        self._function = tf.function(self._forward, jit_compile=jit_compile)
+        self._functions = {}
+        for bucket in self.batch_buckets:
+            spec = tf.TensorSpec(shape=(bucket,) + self.input_shape, dtype=tf.float32)
+            self._functions[bucket] = self._function.get_concrete_function(spec)
+
+        # Padding buffers per bucket, one set per calling thread
+        self._padding = threading.local()
+
+        # Latency statistics
+        self._stats_lock = threading.Lock()
+        self.total_calls = 0
+        self.total_samples = 0
+        self.total_time = 0.0
+        self.last_latency = 0.0
+
+        if warmup:
+            self.warmup()
+
+    def _forward(self, inputs):
+        """Forward pass in inference mode"""
+        return self.model(inputs, training=False)
+
+    def _bucket_for(self, size):
+        """Get the smallest traced bucket that fits size samples"""
+        for bucket in self.batch_buckets:
+            if bucket >= size:
+                return bucket
+        return self.batch_buckets[-1]
+
+    def _pad(self, chunk, bucket):
+        """Copy a chunk into this thread's reusable zero-padded buffer of a bucket's size"""
+        buffers = getattr(self._padding, 'buffers', None)
+        if buffers is None:
+            buffers = self._padding.buffers = {}
+        padded = buffers.get(bucket)
+        if padded is None:
+            padded = buffers[bucket] = np.zeros((bucket,) + self.input_shape, dtype=np.float32)
+        padded[:len(chunk)] = chunk
+        padded[len(chunk):] = 0.0
+        return padded
+
+    def warmup(self):
+        """Run every bucket once so the first real call pays no setup cost"""
+        start = time.perf_counter()
+        for bucket, function in self._functions.items():
+            function(tf.zeros((bucket,) + self.input_shape, dtype=tf.float32))
+        logger.info(f"Warmed up {len(self._functions)} inference buckets in {time.perf_counter() - start:.2f}s")
+
+    def predict(self, batch):
+        """
+        Run the model on a batch
+
+        Args:
+            batch: Array of shape (n,) + input_shape
+
+        Returns:
+            Model outputs as a NumPy array with n rows
+        """
+        start = time.perf_counter()
+
+        batch = np.asarray(batch, dtype=np.float32)
+        count = len(batch)
+        largest = self.batch_buckets[-1]
+        outputs = []
+
+        for offset in range(0, count, largest):
+            chunk = batch[offset:offset + largest]
+            bucket = self._bucket_for(len(chunk))
+            if len(chunk) < bucket:
+                # tf.constant copies the buffer, so it can be reused right away
+                chunk_output = self._functions[bucket](tf.constant(self._pad(chunk, bucket)))
+            else:
+                chunk_output = self._functions[bucket](tf.constant(chunk))
+            outputs.append(chunk_output.numpy()[:len(chunk)])
+
+        result = outputs[0] if len(outputs) == 1 else np.concatenate(outputs)
+
+        latency = time.perf_counter() - start
+        with self._stats_lock:
+            self.total_calls += 1
+            self.total_samples += count
+            self.total_time += latency
+            self.last_latency = latency
+
+        return result
+
+    def get_stats(self):
+        """
+        Get per-call latency statistics
+
+        Returns:
+            Dictionary with call count, sample count and latencies in milliseconds
+        """
+        with self._stats_lock:
+            calls = self.total_calls
+            return {
+                'calls': calls,
+                'samples': self.total_samples,
+                'average_latency_ms': self.total_time / calls * 1000.0 if calls else 0.0,
+                'last_latency_ms': self.last_latency * 1000.0,
+                'jit_compile': self.jit_compile
+            }
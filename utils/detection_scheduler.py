@@ -0,0 +1,322 @@
+import time
+
+import cv2
+import numpy as np
+
+from utils.hand_geometry import bounding_boxes
+
+# Landmarks followed with optical flow: wrist, knuckles and fingertips
+TRACKED_LANDMARKS = np.array([0, 1, 5, 9, 13, 17, 4, 8, 12, 16, 20], dtype=np.intp)
+
+
+def box_iou(a, b):
+    """
+    Intersection over union of two [x_min, y_min, x_max, y_max] boxes
+
+    Returns:
+        Float in [0, 1]
+    """
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return float(inter / union) if union > 0 else 0.0
+
+
+class DetectionScheduler:
+    def __init__(self, detect_interval=3, min_interval=1, max_interval=8, load_fn=None,
+                 motion_threshold=0.25, scene_motion_threshold=6.0, min_tracked_ratio=0.6,
+                 max_flow_error=2.0, min_drift_iou=0.6, win_size=21, max_level=2, max_hands=1):
+        """
+        Initialize the per-stream scheduler that decides when to run hand detection
+
+        Full MediaPipe detection runs every N frames. In between, the last
+        detected landmarks are moved with sparse Lucas-Kanade optical flow
+        on a few landmark points. Detection is forced when tracking fails,
+        the hand moves fast, the scene changes while no hand is visible, or
+        the caller asks for it (e.g. on a low-confidence prediction).
+
+        N grows with server load (load_fn) up to max_interval and shrinks
+        again when the propagated box drifts from the next detection.
+        Up to max_hands hands are followed; all of them are tracked in one
+        optical-flow call and detection runs if any of them is lost.
+
+        Args:
+            detect_interval: N when the server is idle
+            min_interval: Smallest N (1 detects every frame)
+            max_interval: Largest N under full load
+            load_fn: Callable returning the current load in [0, 1], or None
+            motion_threshold: Per-frame hand shift, relative to its size, that forces detection
+            scene_motion_threshold: Mean grey-level change that forces detection while no hand is tracked
+            min_tracked_ratio: Fraction of points that must be tracked reliably
+            max_flow_error: Forward-backward flow error in pixels above which a point is dropped
+            min_drift_iou: IoU between propagated and detected boxes below which N is reduced
+            win_size: Lucas-Kanade search window size in pixels
+            max_level: Number of pyramid levels for Lucas-Kanade
+            max_hands: Maximum number of hands followed
+        """
+        self.detect_interval = detect_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.load_fn = load_fn
+        self.motion_threshold = motion_threshold
+        self.scene_motion_threshold = scene_motion_threshold
+        self.min_tracked_ratio = min_tracked_ratio
+        self.max_flow_error = max_flow_error
+        self.min_drift_iou = min_drift_iou
+        self.lk_params = {
+            'winSize': (win_size, win_size),
+            'maxLevel': max_level,
+            'criteria': (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        }
+
+        # Hand state, from the last detection or propagated since; only the
+        # first num_hands rows are valid
+        self.max_hands = max_hands
+        self.landmarks = np.zeros((max_hands, 21, 3), dtype=np.float32)
+        self.hand_types = [None] * max_hands
+        self.num_hands = 0
+        self.detected = False  # whether the current state comes from detection
+
+        self.interval = detect_interval
+        self.frames_since_detection = 0
+        self._drift_cap = max_interval
+        self._force = False
+        self._propagated = False
+
+        # Two grey buffers, swapped every frame
+        self._gray = None
+        self._prev_gray = None
+
+        # Statistics
+        self.frames = 0
+        self.detections = 0
+        self.propagations = 0
+        self.total_flow_error = 0.0
+        self.drift_samples = 0
+        self.total_drift_iou = 0.0
+        self.total_drift_center = 0.0
+        self.last_drift_iou = None
+        self.total_propagation_time = 0.0
+
+    def request_detection(self):
+        """Run detection on the next frame"""
+        self._force = True
+
+    @property
+    def has_hand(self):
+        """Whether at least one hand is tracked"""
+        return self.num_hands > 0
+
+    @property
+    def hand_type(self):
+        """Handedness of the first hand, or None"""
+        return self.hand_types[0] if self.num_hands else None
+
+    def reset(self):
+        """Forget the tracked hands and the previous frame"""
+        self.num_hands = 0
+        self.detected = False
+        self._prev_gray = None
+        self._propagated = False
+        self.frames_since_detection = 0
+
+    def get_bbox(self, hand_no=0):
+        """
+        Get the current box of a hand
+
+        Args:
+            hand_no: Which hand (0 for first hand)
+
+        Returns:
+            float32 array [x_min, y_min, x_max, y_max] in pixels, or None
+        """
+        return bounding_boxes(self.landmarks[hand_no]) if hand_no < self.num_hands else None
+
+    def get_bboxes(self):
+        """Get the boxes of every tracked hand as a (num_hands, 4) array"""
+        return bounding_boxes(self.landmarks[:self.num_hands])
+
+    def get_landmarks(self, hand_no=0):
+        """Get a copy of a hand's current (21, 3) landmarks, or None"""
+        return self.landmarks[hand_no].copy() if hand_no < self.num_hands else None
+
+    def _to_gray(self, img, rgb):
+        """Convert a frame into the spare grey buffer and swap buffers"""
+        h, w = img.shape[:2]
+        if self._prev_gray is not None and self._prev_gray.shape != (h, w):
+            self._prev_gray = None
+        gray = self._gray if self._gray is not None and self._gray.shape == (h, w) else np.empty((h, w), np.uint8)
+        cv2.cvtColor(img, cv2.COLOR_RGB2GRAY if rgb else cv2.COLOR_BGR2GRAY, dst=gray)
+
+        prev = self._prev_gray
+        self._gray = prev
+        self._prev_gray = gray
+        return prev, gray
+
+    def propagate(self, img, rgb=True):
+        """
+        Try to carry the hand state over to a new frame without detection
+
+        Args:
+            img: Frame (RGB, or BGR if rgb=False)
+            rgb: Whether the frame is RGB
+
+        Returns:
+            Boolean: True if the state was propagated, False if the caller
+            must run detection and then call record_detection
+        """
+        start = time.perf_counter()
+        self.frames += 1
+        prev, gray = self._to_gray(img, rgb)
+
+        if prev is None or self._force:
+            return False
+        # A scheduled detection still tracks this frame so drift is measured on it
+        due = self.frames_since_detection + 1 >= self.interval
+
+        if not self.has_hand:
+            if due:
+                return False
+            # Nothing to track: only look again if the scene changed
+            small_prev = cv2.resize(prev, (64, 48), interpolation=cv2.INTER_AREA)
+            small = cv2.resize(gray, (64, 48), interpolation=cv2.INTER_AREA)
+            if cv2.absdiff(small_prev, small).mean() > self.scene_motion_threshold:
+                return False
+            self.frames_since_detection += 1
+            self.detected = False
+            return True
+
+        if not self._track(prev, gray):
+            return False
+
+        self.total_propagation_time += time.perf_counter() - start
+        if due:
+            return False
+        self.frames_since_detection += 1
+        self.detected = False
+        return True
+
+    def _track(self, prev, gray):
+        """
+        Move the landmarks from the previous grey frame to the current one
+
+        Returns:
+            Boolean: False if tracking was unreliable (the state is unchanged)
+        """
+        hands = self.landmarks[:self.num_hands]
+        points = np.ascontiguousarray(hands[:, TRACKED_LANDMARKS, :2]).reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, points, None, **self.lk_params)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, prev, moved, None, **self.lk_params)
+
+        per_hand = (self.num_hands, len(TRACKED_LANDMARKS))
+        points = points.reshape(per_hand + (2,))
+        moved = moved.reshape(per_hand + (2,))
+        flow_error = np.linalg.norm(back.reshape(per_hand + (2,)) - points, axis=2)
+        good = (status.reshape(per_hand) == 1) & (back_status.reshape(per_hand) == 1) & (flow_error < self.max_flow_error)
+        if good.mean(axis=1).min() < self.min_tracked_ratio:
+            return False
+
+        # Move each hand by its median shift and rescale it by the median change of spread
+        boxes = bounding_boxes(hands)
+        updates = []
+        for i in range(self.num_hands):
+            ok = good[i]
+            shift = np.median(moved[i, ok] - points[i, ok], axis=0)
+            x_min, y_min, x_max, y_max = boxes[i]
+            if np.hypot(*shift) > self.motion_threshold * max(x_max - x_min, y_max - y_min, 1.0):
+                return False
+
+            center = points[i, ok].mean(axis=0)
+            new_center = moved[i, ok].mean(axis=0)
+            spread = np.linalg.norm(points[i, ok] - center, axis=1)
+            new_spread = np.linalg.norm(moved[i, ok] - new_center, axis=1)
+            valid = spread > 1e-3
+            scale = float(np.median(new_spread[valid] / spread[valid])) if valid.any() else 1.0
+            updates.append((center, shift, scale))
+
+        for hand, (center, shift, scale) in zip(hands, updates):
+            xy = hand[:, :2]
+            xy -= center
+            xy *= scale
+            xy += center + shift
+            hand[:, 2] *= scale
+
+        self._propagated = True
+        self.propagations += 1
+        self.total_flow_error += float(flow_error[good].mean())
+        return True
+
+    def record_detection(self, detector):
+        """
+        Take the hand state from a detector that just processed the frame
+
+        Args:
+            detector: HandDetector after find_hands
+        """
+        propagated_boxes = self.get_bboxes() if self._propagated else None
+
+        self.num_hands = min(detector.num_hands, self.max_hands)
+        for i in range(self.num_hands):
+            self.landmarks[i] = detector.landmarks[i]
+            self.hand_types[i] = detector.get_hand_type(i)
+
+        # Drift: how far each propagated box ended up from its detected hand
+        if propagated_boxes is not None and len(propagated_boxes) and self.num_hands:
+            detected_boxes = self.get_bboxes()
+            ious = []
+            for box in propagated_boxes:
+                # Hands may come back in another order; match by overlap
+                match = max(detected_boxes, key=lambda detected: box_iou(box, detected))
+                size = max(match[2] - match[0], match[3] - match[1], 1.0)
+                center_error = np.hypot(
+                    (box[0] + box[2] - match[0] - match[2]) / 2.0,
+                    (box[1] + box[3] - match[1] - match[3]) / 2.0
+                ) / size
+                ious.append(box_iou(box, match))
+                self.total_drift_center += float(center_error)
+                self.drift_samples += 1
+                self.total_drift_iou += ious[-1]
+            self.last_drift_iou = min(ious)
+
+        self.detected = True
+        self.detections += 1
+        self.frames_since_detection = 0
+        self._force = False
+        self._update_interval()
+        self._propagated = False
+
+    def _update_interval(self):
+        """Adapt N to the server load and the drift seen at this detection"""
+        if self._propagated and self.last_drift_iou is not None:
+            if self.last_drift_iou < self.min_drift_iou:
+                self._drift_cap = max(self.min_interval, self._drift_cap - 1)
+            else:
+                self._drift_cap = min(self.max_interval, self._drift_cap + 1)
+
+        load = min(max(self.load_fn(), 0.0), 1.0) if self.load_fn is not None else 0.0
+        target = self.detect_interval + load * (self.max_interval - self.detect_interval)
+        self.interval = max(self.min_interval, min(int(round(target)), self._drift_cap))
+
+    def get_stats(self):
+        """
+        Get scheduling and drift statistics
+
+        Returns:
+            Dictionary with frame counts, the current interval, the share of
+            frames that ran detection, mean flow error and mean drift at re-detection
+        """
+        propagations = self.propagations
+        samples = self.drift_samples
+        return {
+            'frames': self.frames,
+            'detections': self.detections,
+            'propagations': propagations,
+            'detection_ratio': self.detections / self.frames if self.frames else 0.0,
+            'interval': self.interval,
+            'average_flow_error_px': self.total_flow_error / propagations if propagations else 0.0,
+            'average_propagation_ms': self.total_propagation_time / propagations * 1000.0 if propagations else 0.0,
+            'average_drift_iou': self.total_drift_iou / samples if samples else None,
+            'average_drift_center': self.total_drift_center / samples if samples else None,
+            'last_drift_iou': self.last_drift_iou
+        }
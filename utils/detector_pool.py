@@ -0,0 +1,228 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class HandDetectorPool:
+    def __init__(self, detector_factory, size=4):
+        """
+        Initialize a fixed-size pool of hand detectors shared by client streams
+
+        MediaPipe graphs are not thread-safe and, in video mode, carry the
+        tracking state of the stream they last processed. Each stream is
+        therefore pinned to one detector for as long as possible; when every
+        detector is pinned, the detector of the least recently used idle
+        stream is reset and handed over. Detectors are created on first use.
+
+        Args:
+            detector_factory: Callable returning a new HandDetector
+            size: Maximum number of detectors (MediaPipe graphs)
+        """
+        self.detector_factory = detector_factory
+        self.size = size
+
+        self._detectors = []  # None marks a slot whose detector is still being built
+        self._busy = set()  # indices of checked-out detectors
+        self._owners = {}  # detector index -> stream id
+        self._streams = OrderedDict()  # stream id -> detector index, least recently used first
+        self._condition = threading.Condition()
+
+        # Pool statistics
+        self.checkouts = 0
+        self.reassignments = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+
+    def acquire(self, stream_id, timeout=None):
+        """
+        Check out the detector pinned to a stream
+
+        Args:
+            stream_id: Identifier of the client stream
+            timeout: Seconds to wait for a free detector (None waits forever)
+
+        Returns:
+            HandDetector, or None if none became free before the timeout
+        """
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+
+        with self._condition:
+            while True:
+                index = self._assign(stream_id)
+                if index is not None:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self.timeouts += 1
+                    return None
+                self._condition.wait(remaining)
+
+            self._busy.add(index)
+            self._streams.move_to_end(stream_id)
+            self.checkouts += 1
+            self.total_wait += time.monotonic() - start
+            detector = self._detectors[index]
+            fresh = self._owners.get(index) != stream_id
+            self._owners[index] = stream_id
+
+        if detector is None:
+            # Built outside the lock so other streams are not held up by graph start-up
+            detector = self._build(index)
+        elif fresh:
+            # A detector taken over from another stream must not reuse its tracking state
+            self._reset(detector)
+        return detector
+
+    def _build(self, index):
+        """
+        Create the detector for a slot reserved by acquire
+
+        Args:
+            index: Index of the reserved slot
+
+        Returns:
+            HandDetector now published in the slot
+        """
+        try:
+            detector = self.detector_factory()
+        except BaseException:
+            # Free the slot so the next stream retries the build
+            with self._condition:
+                self._busy.discard(index)
+                self._condition.notify_all()
+            raise
+        with self._condition:
+            if index < len(self._detectors):
+                self._detectors[index] = detector
+        return detector
+
+    def release(self, detector):
+        """
+        Return a checked-out detector to the pool
+
+        Args:
+            detector: HandDetector returned by acquire
+        """
+        with self._condition:
+            for index, candidate in enumerate(self._detectors):
+                if candidate is detector:
+                    self._busy.discard(index)
+                    break
+            self._condition.notify_all()
+
+    @contextmanager
+    def checkout(self, stream_id, timeout=None):
+        """
+        Context manager around acquire/release
+
+        Yields:
+            HandDetector, or None if none became free before the timeout
+        """
+        detector = self.acquire(stream_id, timeout=timeout)
+        try:
+            yield detector
+        finally:
+            if detector is not None:
+                self.release(detector)
+
+    def forget(self, stream_id):
+        """
+        Unpin a stream that has ended so its detector can be reused first
+
+        Args:
+            stream_id: Identifier of the client stream
+        """
+        with self._condition:
+            index = self._streams.pop(stream_id, None)
+            if index is not None and self._owners.get(index) == stream_id:
+                del self._owners[index]
+            self._condition.notify_all()
+
+    def _assign(self, stream_id):
+        """
+        Find the detector for a stream; the caller holds the condition
+
+        Returns:
+            Detector index, or None if the stream has to wait
+        """
+        index = self._streams.get(stream_id)
+        if index is not None:
+            # Keep affinity even if that means waiting for our own detector
+            return None if index in self._busy else index
+
+        # An unowned detector, or a new one while the pool is not full
+        for index in range(len(self._detectors)):
+            if index not in self._busy and index not in self._owners:
+                self._streams[stream_id] = index
+                return index
+        if len(self._detectors) < self.size:
+            # Reserve the slot; acquire builds the detector once the lock is released
+            self._detectors.append(None)
+            index = len(self._detectors) - 1
+            self._streams[stream_id] = index
+            return index
+
+        # Evict the least recently used stream whose detector is idle
+        for old_stream, index in self._streams.items():
+            if index not in self._busy:
+                del self._streams[old_stream]
+                self._streams[stream_id] = index
+                self.reassignments += 1
+                return index
+        return None
+
+    @staticmethod
+    def _reset(detector):
+        """Clear a detector's per-stream tracking state"""
+        if hasattr(detector, 'reset_tracking'):
+            detector.reset_tracking()
+        hands = getattr(detector, 'hands', None)
+        if hands is not None and hasattr(hands, 'reset'):
+            hands.reset()
+
+    def close(self):
+        """Close every MediaPipe graph in the pool"""
+        with self._condition:
+            detectors = list(self._detectors)
+            self._detectors = []
+            self._busy.clear()
+            self._owners.clear()
+            self._streams.clear()
+        for detector in detectors:
+            if detector is None:
+                continue
+            hands = getattr(detector, 'hands', None)
+            if hands is not None and hasattr(hands, 'close'):
+                hands.close()
+
+    def utilization(self):
+        """
+        Get the fraction of detectors currently checked out
+
+        Returns:
+            Float in [0, 1]
+        """
+        with self._condition:
+            return len(self._busy) / self.size if self.size else 1.0
+
+    def get_stats(self):
+        """
+        Get pool statistics
+
+        Returns:
+            Dictionary with pool size, live detectors, pinned streams and checkout counters
+        """
+        with self._condition:
+            checkouts = self.checkouts
+            return {
+                'size': self.size,
+                'detectors': sum(detector is not None for detector in self._detectors),
+                'busy': len(self._busy),
+                'streams': len(self._streams),
+                'checkouts': checkouts,
+                'reassignments': self.reassignments,
+                'timeouts': self.timeouts,
+                'average_wait_ms': self.total_wait / checkouts * 1000.0 if checkouts else 0.0
+            }
@@ -0,0 +1,119 @@
+import base64
+import threading
+
+import cv2
+import numpy as np
+
+# libjpeg can apply its IDCT at a reduced scale, so 1/2 and 1/4 decodes
+# cost a fraction of a full decode instead of decoding and resizing.
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class FrameDecoder:
+    def __init__(self, scale=1, initial_buffer_size=256 * 1024):
+        """
+        Initialize the FrameDecoder
+
+        Frames are decoded straight from the compressed bytes with
+        cv2.imdecode and converted to RGB in place, which is the only colour
+        space used by the rest of the recognition pipeline.
+
+        Args:
+            scale: Default DCT downscale factor (1, 2, 4 or 8)
+            initial_buffer_size: Initial size in bytes of the per-thread input buffer
+        """
+        if scale not in REDUCED_DECODE_FLAGS:
+            raise ValueError(f"Unsupported decode scale: {scale}")
+
+        self.scale = scale
+        self.initial_buffer_size = initial_buffer_size
+
+        # One reusable input buffer per worker thread
+        self._local = threading.local()
+
+    def _get_buffer(self, size):
+        """
+        Get the calling thread's input buffer, growing it if needed
+
+        Args:
+            size: Minimum number of bytes required
+
+        Returns:
+            bytearray of at least the requested size
+        """
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None or len(buffer) < size:
+            buffer = bytearray(max(size, self.initial_buffer_size))
+            self._local.buffer = buffer
+        return buffer
+
+    def read_stream(self, stream, content_length):
+        """
+        Read a request body into the reusable buffer without intermediate copies
+
+        Args:
+            stream: File-like object supporting readinto
+            content_length: Number of bytes to read
+
+        Returns:
+            memoryview over the bytes that were read
+        """
+        buffer = self._get_buffer(content_length)
+        view = memoryview(buffer)
+        total = 0
+        while total < content_length:
+            count = stream.readinto(view[total:content_length])
+            if not count:
+                break
+            total += count
+        return view[:total]
+
+    def decode(self, data, scale=None):
+        """
+        Decode JPEG/PNG bytes into an RGB image
+
+        Args:
+            data: Compressed image as bytes, bytearray or memoryview
+            scale: DCT downscale factor overriding the default (1, 2, 4 or 8)
+
+        Returns:
+            RGB image as a uint8 array, or None if the data could not be decoded
+        """
+        if scale is None:
+            scale = self.scale
+        flags = REDUCED_DECODE_FLAGS.get(scale)
+        if flags is None:
+            raise ValueError(f"Unsupported decode scale: {scale}")
+
+        if not data:
+            return None
+
+        # np.frombuffer wraps the bytes without copying them
+        encoded = np.frombuffer(data, dtype=np.uint8)
+        img = cv2.imdecode(encoded, flags)
+        if img is None:
+            return None
+
+        # Convert in place so there is a single full-frame allocation
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+        return img
+
+    def decode_data_url(self, data_url, scale=None):
+        """
+        Decode a base64 data URL (as produced by canvas.toDataURL)
+
+        Args:
+            data_url: String of the form "data:image/jpeg;base64,..."
+            scale: DCT downscale factor overriding the default
+
+        Returns:
+            RGB image as a uint8 array, or None if the data could not be decoded
+        """
+        if ',' in data_url:
+            data_url = data_url.split(',', 1)[1]
+        return self.decode(base64.b64decode(data_url), scale=scale)
@@ -0,0 +1,197 @@
+import json
+from collections import deque
+
+
+class RewriteState:
+    def __init__(self):
+        """
+        Incremental rewrite state of one growing text (e.g. a session's sentence)
+
+        Keeps the rewritten output together with the scan positions near
+        the end of the text, so appending only rescans the tail that a rule
+        could still reach.
+        """
+        self.text = ""
+        self.output = ""
+        # (position in text, length of output before it) of the scan steps
+        # a longer text could still change
+        self.checkpoints = [(0, 0)]
+
+    def reset(self):
+        """Forget the text"""
+        self.text = ""
+        self.output = ""
+        self.checkpoints = [(0, 0)]
+
+
+class GrammarRewriter:
+    def __init__(self, rules):
+        """
+        Compile literal rewrite rules into one Aho-Corasick automaton
+
+        Rewriting scans the text once: at every position the longest rule
+        starting there is replaced and the scan continues after it,
+        otherwise the character is copied (leftmost-longest, no overlaps,
+        replacements are not rescanned). Finding the matches costs
+        O(text length + matches) however many rules there are.
+
+        Args:
+            rules: Mapping or list of (pattern, replacement) pairs
+        """
+        if isinstance(rules, dict):
+            rules = rules.items()
+
+        # Trie of the patterns; node 0 is the root
+        self._goto = [{}]
+        self._length = [0]  # pattern length ending at the node, 0 if none
+        self._replacement = [None]
+        for pattern, replacement in rules:
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._length.append(0)
+                    self._replacement.append(None)
+                node = next_node
+            self._length[node] = len(pattern)
+            self._replacement[node] = replacement
+
+        self.num_rules = sum(1 for length in self._length if length)
+        self.max_length = max(self._length)
+
+        # Failure links, and output links to the nearest pattern end along them
+        self._fail = [0] * len(self._goto)
+        self._output = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                # Children of the root fall back to the root itself
+                target = self._goto[fail].get(char, 0) if node else 0
+                self._fail[child] = target
+                self._output[child] = target if self._length[target] else self._output[target]
+                queue.append(child)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load rules from a JSON file of the form {"rules": {"pattern": "replacement", ...}}
+
+        Args:
+            path: Path to the JSON file
+
+        Returns:
+            GrammarRewriter
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['rules'])
+
+    def _longest_matches(self, text, start):
+        """
+        Find the longest rule starting at every position from start on
+
+        Returns:
+            Dictionary {position: (length, replacement)}
+        """
+        goto = self._goto
+        fail = self._fail
+        lengths = self._length
+        outputs = self._output
+
+        best = {}
+        node = 0
+        for end in range(start, len(text)):
+            char = text[end]
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            # Every pattern ending here: the node itself and its output chain
+            match = node if lengths[node] else outputs[node]
+            while match:
+                length = lengths[match]
+                position = end - length + 1
+                if length > best.get(position, (0,))[0]:
+                    best[position] = (length, self._replacement[match])
+                match = outputs[match]
+        return best
+
+    def _scan(self, text, start, pieces, output_length, checkpoints):
+        """Rewrite text[start:] into pieces, recording a checkpoint at every step"""
+        best = self._longest_matches(text, start)
+        i = start
+        while i < len(text):
+            checkpoints.append((i, output_length))
+            match = best.get(i)
+            if match is not None:
+                length, replacement = match
+                pieces.append(replacement)
+                output_length += len(replacement)
+                i += length
+            else:
+                pieces.append(text[i])
+                output_length += 1
+                i += 1
+        checkpoints.append((i, output_length))
+
+    def rewrite(self, text):
+        """
+        Apply the rules to a whole text
+
+        Args:
+            text: Text to rewrite
+
+        Returns:
+            Rewritten text
+        """
+        if not text or not self.num_rules:
+            return text
+        pieces = []
+        self._scan(text, 0, pieces, 0, [])
+        return "".join(pieces)
+
+    def create_state(self):
+        """Create the incremental state of one growing text"""
+        return RewriteState()
+
+    def rewrite_appended(self, state, text):
+        """
+        Rewrite a text that usually extends the previous one
+
+        Only the part a rule could still reach is rescanned: every scan
+        step whose longest possible match lies inside the old text is
+        final. A text that does not extend the previous one is rewritten
+        from scratch.
+
+        Args:
+            state: RewriteState of the text
+            text: Current full text
+
+        Returns:
+            Rewritten text (the same as rewrite(text))
+        """
+        if not text.startswith(state.text):
+            state.reset()
+
+        # The state only keeps steps whose window of max_length characters
+        # runs past the old end; everything before the first one is final
+        position, output_length = state.checkpoints[0]
+
+        pieces = [state.output[:output_length]]
+        checkpoints = []
+        self._scan(text, position, pieces, output_length, checkpoints)
+
+        state.text = text
+        state.output = "".join(pieces)
+        keep_from = len(text) - max(self.max_length, 1)
+        state.checkpoints = [checkpoint for checkpoint in checkpoints if checkpoint[0] > keep_from]
+        return state.output
@@ -2,8 +2,31 @@ import cv2
 import mediapipe as mp
 import numpy as np
 
+from utils.hand_geometry import bounding_boxes, fingers_up as geometry_fingers_up
+from utils.preprocessing import crop_box
+
+def denormalize_landmarks(normalized, width, height):
+    """
+    Convert normalized MediaPipe landmarks to the detector's pixel format
+    
+    Landmarks produced elsewhere (e.g. MediaPipe running in the browser)
+    come as x, y in [0, 1]; this maps them to the same (21, 3) layout that
+    HandDetector.find_landmark_array returns.
+    
+    Args:
+        normalized: Sequence of 21 (x, y, z) triples
+        width: Width of the image the landmarks were detected on
+        height: Height of the image the landmarks were detected on
+        
+    Returns:
+        float32 array of shape (21, 3)
+    """
+    points = np.asarray(normalized, dtype=np.float32).reshape(21, 3)
+    return points * np.array([width, height, width], dtype=np.float32)
+
 class HandDetector:
-    def __init__(self, static_image_mode=False, max_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    def __init__(self, static_image_mode=False, max_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 track_roi=False, roi_margin=0.5, roi_max_size=256, redetect_interval=15):
         """
         Initialize the HandDetector
         
@@ -12,12 +35,26 @@ class HandDetector:
             max_hands: Maximum number of hands to detect
             min_detection_confidence: Minimum confidence for hand detection
             min_tracking_confidence: Minimum confidence for hand tracking
+            track_roi: Whether to process only a region around the last known hands
+            roi_margin: Fraction of the hand's size added on every side of the region
+            roi_max_size: Longest side the region is downscaled to before processing
+            redetect_interval: Frames after which the full frame is processed again
         """
         self.static_image_mode = static_image_mode
         self.max_hands = max_hands
         self.min_detection_confidence = min_detection_confidence
         self.min_tracking_confidence = min_tracking_confidence
         
+        # ROI tracking: box around all of the last hands in full-frame pixels,
+        # and how many hands a region pass must find to be trusted
+        self.track_roi = track_roi
+        self.roi_margin = roi_margin
+        self.roi_max_size = roi_max_size
+        self.redetect_interval = redetect_interval
+        self.roi_bbox = None
+        self.roi_num_hands = 0
+        self.frames_since_full = 0
+        
         # Initialize MediaPipe hands
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
@@ -26,37 +63,227 @@ class HandDetector:
             min_detection_confidence=self.min_detection_confidence,
             min_tracking_confidence=self.min_tracking_confidence
         )
+        # Crops come from a moving region, so they get their own graph without
+        # tracking state; the graph above only ever sees full frames
+        self.roi_hands = None
+        if self.track_roi:
+            self.roi_hands = self.mp_hands.Hands(
+                static_image_mode=True,
+                max_num_hands=self.max_hands,
+                min_detection_confidence=self.min_detection_confidence
+            )
         self.mp_drawing = mp.solutions.drawing_utils
         
         # Store the results for further processing
         self.results = None
         
-    def find_hands(self, img, draw=True):
+        # Landmarks of the last frame in pixels (x, y, z scaled like x),
+        # preallocated for max_hands; only the first num_hands rows are valid
+        self.landmarks = np.zeros((self.max_hands, 21, 3), dtype=np.float32)
+        self.num_hands = 0
+        self.frame_size = (1, 1)
+        
+    def find_hands(self, img, draw=False, rgb=False):
         """
         Find hands in the image and optionally draw landmarks
         
         Args:
-            img: Input image (BGR format)
-            draw: Whether to draw hand landmarks
+            img: Input image (BGR format, or RGB if rgb=True)
+            draw: Whether to draw hand landmarks (see draw_hands)
+            rgb: Whether the image is already in RGB order
             
         Returns:
             Image with hand landmarks drawn (if draw=True)
         """
-        # Convert BGR to RGB for MediaPipe
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # MediaPipe expects RGB; skip the conversion when the caller already has it
+        img_rgb = img if rgb else cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        
+        # Process the region around the last hands, or the whole frame
+        self.results = None
+        if self.track_roi and self.roi_bbox is not None and self.frames_since_full < self.redetect_interval:
+            self.results = self._process_roi(img_rgb)
+        if self.results is None:
+            if self.frames_since_full and not self.static_image_mode:
+                # The full-frame graph last tracked a frame from before the ROI passes
+                self.hands.reset()
+            self.results = self.hands.process(img_rgb)
+            self.frames_since_full = 0
+        else:
+            self.frames_since_full += 1
+        self._update_landmarks(img_rgb.shape[1], img_rgb.shape[0])
+        if self.track_roi:
+            self._track_hands()
+        
+        if draw:
+            self.draw_hands(img)
+                
+        return img
+    
+    def draw_hands(self, img):
+        """
+        Draw the landmarks found by the last find_hands call
         
-        # Process the image
-        self.results = self.hands.process(img_rgb)
+        Rendering is kept apart from detection so callers that do not show
+        the image (e.g. the server) never pay for it.
         
-        # Draw landmarks if hands are detected and draw is True
-        if self.results.multi_hand_landmarks and draw:
+        Args:
+            img: Image to draw on (modified in place)
+            
+        Returns:
+            The same image
+        """
+        if self.results is not None and self.results.multi_hand_landmarks:
             for hand_landmarks in self.results.multi_hand_landmarks:
                 self.mp_drawing.draw_landmarks(
                     img, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
                 )
-                
         return img
     
+    def reset_tracking(self):
+        """Forget the tracked region so the next frame is processed in full"""
+        self.roi_bbox = None
+        self.roi_num_hands = 0
+        self.frames_since_full = 0
+    
+    def _track_hands(self):
+        """Track the box around every hand just found (one region holds them all)"""
+        if self.num_hands:
+            self.roi_bbox = tuple(float(v) for v in bounding_boxes(self.landmarks[:self.num_hands].reshape(-1, 3)))
+        else:
+            self.roi_bbox = None
+        self.roi_num_hands = self.num_hands
+    
+    def set_roi(self, bboxes):
+        """
+        Track the region around boxes found elsewhere
+        
+        A caller that moves the hands between detections (e.g. with optical
+        flow) passes their newest boxes here, so the next region is cropped
+        around where the hands are now rather than where they were last
+        detected.
+        
+        Args:
+            bboxes: Array of shape (hands, 4) or a single box, as
+                [x_min, y_min, x_max, y_max] in full-frame pixels; empty or
+                None processes the next frame in full
+        """
+        if not self.track_roi:
+            return
+        bboxes = np.asarray(bboxes if bboxes is not None else [], dtype=np.float32).reshape(-1, 4)
+        if not len(bboxes):
+            self.roi_bbox = None
+            self.roi_num_hands = 0
+            return
+        self.roi_bbox = (float(bboxes[:, 0].min()), float(bboxes[:, 1].min()),
+                         float(bboxes[:, 2].max()), float(bboxes[:, 3].max()))
+        self.roi_num_hands = len(bboxes)
+    
+    def _roi_rect(self, width, height):
+        """Get the tracked bbox expanded by roi_margin and clipped to the frame"""
+        x_min, y_min, x_max, y_max = self.roi_bbox
+        # Square region so rotating hands stay inside it
+        side = max(x_max - x_min, y_max - y_min) * (1.0 + 2.0 * self.roi_margin)
+        cx, cy = (x_min + x_max) / 2.0, (y_min + y_max) / 2.0
+        x0 = max(0, int(cx - side / 2.0))
+        y0 = max(0, int(cy - side / 2.0))
+        x1 = min(width, int(cx + side / 2.0) + 1)
+        y1 = min(height, int(cy + side / 2.0) + 1)
+        return x0, y0, x1, y1
+    
+    def _process_roi(self, img_rgb):
+        """
+        Run MediaPipe on the region around the last hands
+        
+        The region is downscaled to roi_max_size and the landmarks are mapped
+        back to normalized full-frame coordinates, so callers cannot tell the
+        results apart from a full-frame pass.
+        
+        Returns:
+            MediaPipe results, or None if the region holds fewer hands than
+            were tracked (the full frame is then processed)
+        """
+        height, width = img_rgb.shape[:2]
+        x0, y0, x1, y1 = self._roi_rect(width, height)
+        roi_w, roi_h = x1 - x0, y1 - y0
+        if roi_w < 2 or roi_h < 2:
+            return None
+        
+        roi = img_rgb[y0:y1, x0:x1]
+        k = self.roi_max_size / max(roi_w, roi_h)
+        if k < 1.0:
+            roi = cv2.resize(roi, (max(1, round(roi_w * k)), max(1, round(roi_h * k))), interpolation=cv2.INTER_AREA)
+        else:
+            # MediaPipe needs a contiguous buffer
+            roi = np.ascontiguousarray(roi)
+        
+        results = self.roi_hands.process(roi)
+        if not results.multi_hand_landmarks or len(results.multi_hand_landmarks) < self.roi_num_hands:
+            return None
+        
+        # Normalized ROI coordinates -> normalized frame coordinates; z is
+        # relative to the image width, so it scales like x
+        sx, sy = roi_w / width, roi_h / height
+        ox, oy = x0 / width, y0 / height
+        for hand in results.multi_hand_landmarks:
+            for lm in hand.landmark:
+                lm.x = lm.x * sx + ox
+                lm.y = lm.y * sy + oy
+                lm.z = lm.z * sx
+        return results
+    
+    def _update_landmarks(self, width, height):
+        """Copy the detected landmarks into the preallocated pixel array"""
+        hands = self.results.multi_hand_landmarks or []
+        self.frame_size = (width, height)
+        self.num_hands = min(len(hands), self.max_hands)
+        for i in range(self.num_hands):
+            self.landmarks[i] = [(lm.x, lm.y, lm.z) for lm in hands[i].landmark]
+        self.landmarks[:self.num_hands] *= np.array([width, height, width], dtype=np.float32)
+    
+    def get_landmarks(self):
+        """
+        Get the landmarks of every detected hand
+        
+        The array is a view into a buffer reused by the next find_hands call.
+        
+        Returns:
+            float32 array of shape (num_hands, 21, 3) in pixels
+        """
+        return self.landmarks[:self.num_hands]
+    
+    def find_bbox(self, hand_no=0):
+        """
+        Get the bounding box of a hand
+        
+        Args:
+            hand_no: Which hand (0 for first hand)
+            
+        Returns:
+            float32 array [x_min, y_min, x_max, y_max] in pixels, or None
+        """
+        if hand_no >= self.num_hands:
+            return None
+        return bounding_boxes(self.landmarks[hand_no])
+    
+    def find_crop(self, img, hand_no=0, offset=20):
+        """
+        Detect hands and crop one the way the server does before classifying
+        
+        Args:
+            img: Input image (BGR format)
+            hand_no: Which hand (0 for first hand)
+            offset: Pixels added around the hand's box
+            
+        Returns:
+            Cropped image, or None if the hand was not found
+        """
+        self.find_hands(img, draw=False)
+        bbox = self.find_bbox(hand_no)
+        if bbox is None:
+            return None
+        crop = crop_box(img, bbox, offset)
+        return crop if crop.size else None
+    
     def find_position(self, img, hand_no=0, draw=True):
         """
         Find the position of hand landmarks
@@ -69,37 +296,40 @@ class HandDetector:
         Returns:
             List of landmark positions [(id, x, y), ...]
         """
-        x_list = []
-        y_list = []
-        bbox = []
-        landmark_list = []
+        if hand_no >= self.num_hands:
+            return []
         
-        if self.results.multi_hand_landmarks:
-            if hand_no < len(self.results.multi_hand_landmarks):
-                my_hand = self.results.multi_hand_landmarks[hand_no]
-                
-                for id, lm in enumerate(my_hand.landmark):
-                    h, w, c = img.shape
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    x_list.append(cx)
-                    y_list.append(cy)
-                    landmark_list.append([id, cx, cy])
-                    
-                    if draw:
-                        cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
-                
-                # Calculate bounding box
-                if x_list and y_list:
-                    x_min, x_max = min(x_list), max(x_list)
-                    y_min, y_max = min(y_list), max(y_list)
-                    bbox = [x_min, y_min, x_max, y_max]
-                    
-                    if draw:
-                        cv2.rectangle(img, (x_min - 20, y_min - 20), 
-                                    (x_max + 20, y_max + 20), (0, 255, 0), 2)
+        pixels = self.landmarks[hand_no, :, :2].astype(np.int32)
+        landmark_list = np.column_stack((np.arange(21), pixels)).tolist()
+        
+        if draw:
+            for cx, cy in pixels.tolist():
+                cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
+            x_min, y_min = pixels.min(axis=0).tolist()
+            x_max, y_max = pixels.max(axis=0).tolist()
+            cv2.rectangle(img, (x_min - 20, y_min - 20), 
+                        (x_max + 20, y_max + 20), (0, 255, 0), 2)
                         
         return landmark_list
     
+    def find_landmark_array(self, img, hand_no=0):
+        """
+        Get the 3D landmarks of a hand as an array
+        
+        Args:
+            img: Input image (used for its size)
+            hand_no: Which hand to get landmarks for (0 for first hand)
+            
+        Returns:
+            float32 array of shape (21, 3) with pixel x, y and z (z uses the
+            same scale as x), or None if the hand was not found
+        """
+        if hand_no >= self.num_hands:
+            return None
+        
+        # Copy: the buffer is overwritten by the next frame
+        return self.landmarks[hand_no].copy()
+    
     def fingers_up(self, landmark_list):
         """
         Determine which fingers are up
@@ -112,24 +342,10 @@ class HandDetector:
         """
         if len(landmark_list) != 21:
             return [0, 0, 0, 0, 0]
-            
-        fingers = []
-        tip_ids = [4, 8, 12, 16, 20]  # Fingertip landmark IDs
         
-        # Thumb (different logic due to orientation)
-        if landmark_list[tip_ids[0]][1] > landmark_list[tip_ids[0] - 1][1]:
-            fingers.append(1)
-        else:
-            fingers.append(0)
-            
-        # Other fingers
-        for id in range(1, 5):
-            if landmark_list[tip_ids[id]][2] < landmark_list[tip_ids[id] - 2][2]:
-                fingers.append(1)
-            else:
-                fingers.append(0)
-                
-        return fingers
+        # Entries are [id, x, y]
+        points = np.asarray(landmark_list)[:, 1:]
+        return geometry_fingers_up(points).astype(int).tolist()
     
     def find_distance(self, p1, p2, img=None, draw=True):
         """
@@ -144,24 +360,25 @@ class HandDetector:
         Returns:
             Distance, image with line drawn, center point
         """
-        if self.results.multi_hand_landmarks:
-            if len(self.results.multi_hand_landmarks) > 0:
-                hand = self.results.multi_hand_landmarks[0]
-                
-                h, w, c = img.shape if img is not None else (1, 1, 1)
-                
-                x1, y1 = int(hand.landmark[p1].x * w), int(hand.landmark[p1].y * h)
-                x2, y2 = int(hand.landmark[p2].x * w), int(hand.landmark[p2].y * h)
-                cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-                
-                if img is not None and draw:
-                    cv2.line(img, (x1, y1), (x2, y2), (255, 0, 255), 3)
-                    cv2.circle(img, (x1, y1), 15, (255, 0, 255), cv2.FILLED)
-                    cv2.circle(img, (x2, y2), 15, (255, 0, 255), cv2.FILLED)
-                    cv2.circle(img, (cx, cy), 15, (0, 0, 255), cv2.FILLED)
-                
-                length = np.hypot(x2 - x1, y2 - y1)
-                return length, img, [x1, y1, x2, y2, cx, cy]
+        if self.num_hands > 0:
+            if img is not None:
+                points = self.landmarks[0]
+            else:
+                # Without an image, report normalized coordinates as before
+                points = self.landmarks[0] / np.array([self.frame_size[0], self.frame_size[1], 1], dtype=np.float32)
+            
+            x1, y1 = int(points[p1, 0]), int(points[p1, 1])
+            x2, y2 = int(points[p2, 0]), int(points[p2, 1])
+            cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+            
+            if img is not None and draw:
+                cv2.line(img, (x1, y1), (x2, y2), (255, 0, 255), 3)
+                cv2.circle(img, (x1, y1), 15, (255, 0, 255), cv2.FILLED)
+                cv2.circle(img, (x2, y2), 15, (255, 0, 255), cv2.FILLED)
+                cv2.circle(img, (cx, cy), 15, (0, 0, 255), cv2.FILLED)
+            
+            length = np.hypot(x2 - x1, y2 - y1)
+            return length, img, [x1, y1, x2, y2, cx, cy]
         
         return 0, img, []
     
@@ -0,0 +1,130 @@
+import numpy as np
+
+# Every function takes landmarks shaped (..., 21, D): one hand (21, D), the
+# hands of a frame (hands, 21, D) or many frames (frames, hands, 21, D).
+
+WRIST = 0
+FINGER_TIPS = (4, 8, 12, 16, 20)
+
+# Landmark chains from the wrist to each fingertip (thumb, index, middle, ring, pinky)
+FINGER_CHAINS = (
+    (0, 1, 2, 3, 4),
+    (0, 5, 6, 7, 8),
+    (0, 9, 10, 11, 12),
+    (0, 13, 14, 15, 16),
+    (0, 17, 18, 19, 20),
+)
+
+# (a, joint, b) triples: the angle is measured at the middle landmark
+JOINT_TRIPLES = np.array(
+    [chain[i:i + 3] for chain in FINGER_CHAINS for i in range(3)],
+    dtype=np.intp
+)
+
+
+def bounding_boxes(points):
+    """
+    Get the bounding box of each hand
+
+    Args:
+        points: Array of shape (..., 21, D) with D >= 2
+
+    Returns:
+        Array of shape (..., 4) with x_min, y_min, x_max, y_max
+    """
+    points = np.asarray(points)
+    xy = points[..., :2]
+    return np.concatenate((xy.min(axis=-2), xy.max(axis=-2)), axis=-1)
+
+
+def pairwise_distances(points):
+    """
+    Get the distance between every pair of landmarks
+
+    Args:
+        points: Array of shape (..., 21, D)
+
+    Returns:
+        float32 array of shape (..., 21, 21)
+    """
+    points = np.asarray(points, dtype=np.float32)
+    diff = points[..., :, np.newaxis, :] - points[..., np.newaxis, :, :]
+    return np.sqrt(np.einsum('...ijk,...ijk->...ij', diff, diff))
+
+
+def landmark_distances(points, pairs):
+    """
+    Get the distance between selected pairs of landmarks
+
+    Args:
+        points: Array of shape (..., 21, D)
+        pairs: Sequence of (i, j) landmark index pairs
+
+    Returns:
+        float32 array of shape (..., len(pairs))
+    """
+    points = np.asarray(points, dtype=np.float32)
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    diff = points[..., pairs[:, 0], :] - points[..., pairs[:, 1], :]
+    return np.sqrt(np.einsum('...ij,...ij->...i', diff, diff))
+
+
+def joint_angles(points):
+    """
+    Get the bend angle at every finger joint
+
+    Args:
+        points: Array of shape (..., 21, D)
+
+    Returns:
+        float32 array of shape (..., 15) in radians, ordered finger by finger
+        from the base joint to the last one (pi means fully straight)
+    """
+    points = np.asarray(points, dtype=np.float32)
+    a = points[..., JOINT_TRIPLES[:, 0], :] - points[..., JOINT_TRIPLES[:, 1], :]
+    b = points[..., JOINT_TRIPLES[:, 2], :] - points[..., JOINT_TRIPLES[:, 1], :]
+
+    dot = np.einsum('...ij,...ij->...i', a, b)
+    norms = np.sqrt(np.einsum('...ij,...ij->...i', a, a) * np.einsum('...ij,...ij->...i', b, b))
+    cosine = np.divide(dot, norms, out=np.ones_like(dot), where=norms > 0)
+    return np.arccos(np.clip(cosine, -1.0, 1.0))
+
+
+def fingers_up(points):
+    """
+    Get which fingers point up in image coordinates
+
+    This is the rule used by HandDetector.fingers_up: the thumb is up when
+    its tip is right of the joint below it, other fingers when the tip is
+    above the middle joint. It assumes an upright hand facing the camera.
+
+    Args:
+        points: Array of shape (..., 21, D) in pixel or normalized coordinates
+
+    Returns:
+        Boolean array of shape (..., 5) (thumb, index, middle, ring, pinky)
+    """
+    points = np.asarray(points)
+    tips = np.asarray(FINGER_TIPS)
+    thumb = points[..., tips[0], 0] > points[..., tips[0] - 1, 0]
+    others = points[..., tips[1:], 1] < points[..., tips[1:] - 2, 1]
+    return np.concatenate((thumb[..., np.newaxis], others), axis=-1)
+
+
+def fingers_extended(points):
+    """
+    Get which fingers are extended, independent of hand orientation
+
+    A finger is extended when its tip is farther from the wrist than its
+    middle joint; the thumb when its tip is farther from the index knuckle
+    than its last joint.
+
+    Args:
+        points: Array of shape (..., 21, D)
+
+    Returns:
+        Boolean array of shape (..., 5) (thumb, index, middle, ring, pinky)
+    """
+    tip_pairs = [(4, 5)] + [(tip, WRIST) for tip in FINGER_TIPS[1:]]
+    joint_pairs = [(3, 5)] + [(tip - 2, WRIST) for tip in FINGER_TIPS[1:]]
+    return landmark_distances(points, tip_pairs) > landmark_distances(points, joint_pairs)
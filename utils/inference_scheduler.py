@@ -0,0 +1,181 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceScheduler:
+    def __init__(self, predict_batch, max_batch_size=16, max_latency=0.005, name="inference-scheduler",
+                 validate=None):
+        """
+        Initialize the micro-batching inference scheduler
+
+        Samples submitted from any number of request threads are queued and
+        handed to predict_batch in groups. A batch is flushed as soon as it
+        is full or the oldest deadline among its samples has passed.
+
+        Args:
+            predict_batch: Callable taking a list of samples and returning one result per sample
+            max_batch_size: Maximum number of samples per batch
+            max_latency: Default maximum seconds a sample may wait for its batch to fill
+            name: Name of the worker thread
+            validate: Callable raising ValueError for a sample predict_batch
+                cannot take, or None; bad samples are rejected on submit so
+                they never fail a batch shared with other requests
+        """
+        self.predict_batch = predict_batch
+        self.validate = validate
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+
+        self._queue = queue.Queue()
+        self._closed = False
+
+        # Statistics
+        self.total_batches = 0
+        self.total_samples = 0
+
+        self._worker = threading.Thread(target=self._run, name=name)
+        self._worker.daemon = True
+        self._worker.start()
+
+    def submit(self, sample, max_latency=None):
+        """
+        Queue a sample for batched inference
+
+        Args:
+            sample: Input accepted by predict_batch
+            max_latency: Maximum seconds this sample may wait (defaults to the scheduler setting)
+
+        Returns:
+            Future resolving to the sample's result
+        """
+        if self._closed:
+            raise RuntimeError("Inference scheduler is closed")
+
+        if self.validate is not None:
+            self.validate(sample)
+
+        if max_latency is None:
+            max_latency = self.max_latency
+
+        future = Future()
+        self._queue.put((sample, time.monotonic() + max_latency, future))
+        return future
+
+    def submit_many(self, samples, max_latency=None):
+        """
+        Queue several samples of one request so they share a batch
+
+        Args:
+            samples: Inputs accepted by predict_batch
+            max_latency: Maximum seconds these samples may wait (defaults to the scheduler setting)
+
+        Returns:
+            List of futures, one per sample
+        """
+        if self._closed:
+            raise RuntimeError("Inference scheduler is closed")
+
+        # Either every sample is queued or none
+        if self.validate is not None:
+            for sample in samples:
+                self.validate(sample)
+
+        if max_latency is None:
+            max_latency = self.max_latency
+
+        deadline = time.monotonic() + max_latency
+        futures = [Future() for _ in samples]
+        for sample, future in zip(samples, futures):
+            self._queue.put((sample, deadline, future))
+        return futures
+
+    def predict(self, sample, max_latency=None, timeout=None):
+        """
+        Run a sample through the scheduler and wait for its result
+
+        Args:
+            sample: Input accepted by predict_batch
+            max_latency: Maximum seconds this sample may wait for batching
+            timeout: Maximum seconds to wait for the result
+
+        Returns:
+            Result for the sample
+        """
+        return self.submit(sample, max_latency=max_latency).result(timeout=timeout)
+
+    def close(self):
+        """Stop the worker thread after the queued samples are processed"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+    def get_stats(self):
+        """
+        Get batching statistics
+
+        Returns:
+            Dictionary with batch count, sample count and average batch size
+        """
+        batches = self.total_batches
+        return {
+            'batches': batches,
+            'samples': self.total_samples,
+            'average_batch_size': self.total_samples / batches if batches else 0.0
+        }
+
+    def _collect_batch(self, first):
+        """Gather queued samples until the batch is full or its deadline passes"""
+        batch = [first]
+        deadline = first[1]
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    # Deadline reached: only take what is already queued
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                # Re-queue the shutdown marker for the main loop
+                self._queue.put(None)
+                break
+
+            batch.append(item)
+            deadline = min(deadline, item[1])
+
+        return batch
+
+    def _run(self):
+        """Worker loop"""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = self._collect_batch(first)
+            futures = [future for _, _, future in batch]
+
+            try:
+                results = self.predict_batch([sample for sample, _, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"predict_batch returned {len(results)} results for {len(batch)} samples")
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Batched inference failed: {str(e)}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+            self.total_batches += 1
+            self.total_samples += len(batch)
@@ -0,0 +1,147 @@
+import os
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+FEATURE_SIZE = NUM_LANDMARKS * 3
+
+
+def normalize_landmarks(points, hand_type=None):
+    """
+    Turn hand landmarks into a position, scale and handedness invariant vector
+
+    The wrist is moved to the origin and coordinates are divided by the
+    largest wrist distance. Left hands are mirrored so one model serves both.
+
+    Args:
+        points: Array of shape (21, 3) with x, y, z coordinates
+        hand_type: "Left", "Right" or None (from HandDetector.get_hand_type)
+
+    Returns:
+        float32 feature vector of length 63
+    """
+    return normalize_landmarks_batch(np.asarray(points)[np.newaxis], [hand_type])[0]
+
+
+def normalize_landmarks_batch(points, hand_types=None):
+    """
+    Vectorized normalize_landmarks for many hands at once
+
+    Args:
+        points: Array of shape (n, 21, 3)
+        hand_types: Sequence of n "Left"/"Right"/None values (None: no mirroring)
+
+    Returns:
+        float32 array of shape (n, 63)
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+    relative = points - points[:, :1]
+    if hand_types is not None:
+        left = np.array([hand_type == 'Left' for hand_type in hand_types], dtype=bool)
+        relative[left, :, 0] *= -1
+
+    scale = np.sqrt(np.einsum('nij,nij->ni', relative, relative).max(axis=1))
+    np.divide(relative, scale[:, np.newaxis, np.newaxis], out=relative, where=scale[:, np.newaxis, np.newaxis] > 0)
+
+    return relative.reshape(-1, FEATURE_SIZE)
+
+
+class LandmarkClassifier:
+    def __init__(self, model_path="Model/landmark_model.npz"):
+        """
+        Initialize the landmark-based sign classifier
+
+        The model is a small multilayer perceptron over normalized hand
+        landmarks, evaluated with NumPy so a prediction takes microseconds
+        and needs neither TensorFlow nor an image crop. Weights are produced
+        by train_landmark_model.py.
+
+        Args:
+            model_path: Path to the .npz file with weights and labels
+        """
+        self.model_path = model_path
+        self.weights = []
+        self.biases = []
+        self.labels = []
+
+        self.load_model()
+
+    def load_model(self):
+        """Load weights and labels from the .npz file"""
+        if not os.path.exists(self.model_path):
+            print(f"Landmark model not found at {self.model_path}")
+            return
+
+        try:
+            with np.load(self.model_path, allow_pickle=False) as data:
+                num_layers = int(data['num_layers'])
+                self.weights = [data[f'W{i}'].astype(np.float32) for i in range(num_layers)]
+                self.biases = [data[f'b{i}'].astype(np.float32) for i in range(num_layers)]
+                self.labels = [str(label) for label in data['labels']]
+            print(f"Landmark model loaded from {self.model_path} ({len(self.labels)} labels)")
+        except Exception as e:
+            print(f"Error loading landmark model: {str(e)}")
+            self.weights = []
+            self.biases = []
+            self.labels = []
+
+    def is_loaded(self):
+        """Check whether a model is available"""
+        return bool(self.weights)
+
+    def predict(self, features):
+        """
+        Run the network on a batch of feature vectors
+
+        Args:
+            features: Array of shape (n, 63)
+
+        Returns:
+            Array of class probabilities with n rows
+        """
+        x = np.asarray(features, dtype=np.float32)
+        last = len(self.weights) - 1
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            x = x @ weight + bias
+            if i < last:
+                np.maximum(x, 0, out=x)
+
+        # Softmax
+        x -= x.max(axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=1, keepdims=True)
+        return x
+
+    def get_prediction(self, points, hand_type=None):
+        """
+        Classify a single hand
+
+        Args:
+            points: Array of shape (21, 3) from HandDetector.find_landmark_array
+            hand_type: "Left", "Right" or None
+
+        Returns:
+            Tuple: (prediction_probabilities, predicted_class_index)
+        """
+        if not self.is_loaded():
+            return np.zeros(len(self.labels)), None
+
+        probabilities = self.predict(normalize_landmarks(points, hand_type)[np.newaxis, :])[0]
+        return probabilities, int(np.argmax(probabilities))
+
+    def get_predictions(self, points, hand_types=None):
+        """
+        Classify several hands in one network call
+
+        Args:
+            points: Array of shape (n, 21, 3)
+            hand_types: Sequence of n "Left"/"Right"/None values
+
+        Returns:
+            Tuple: (probabilities of shape (n, classes), list of predicted class indices)
+        """
+        if not self.is_loaded():
+            return np.zeros((len(points), len(self.labels))), [None] * len(points)
+
+        probabilities = self.predict(normalize_landmarks_batch(points, hand_types))
+        return probabilities, [int(index) for index in np.argmax(probabilities, axis=1)]
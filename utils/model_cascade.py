@@ -0,0 +1,135 @@
+import threading
+import time
+
+import numpy as np
+
+
+def top2_margin(probabilities):
+    """
+    Get the top-1 probability and its margin over the top-2 for every row
+
+    Args:
+        probabilities: Array of shape (n, classes)
+
+    Returns:
+        Tuple: (top-1 probabilities, top-1 minus top-2), each of shape (n,)
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float32)
+    if probabilities.shape[1] < 2:
+        top1 = probabilities[:, 0]
+        return top1, top1
+    top = np.partition(probabilities, -2, axis=1)[:, -2:]
+    return top[:, 1], top[:, 1] - top[:, 0]
+
+
+class ModelCascade:
+    def __init__(self, tiers, min_confidence=0.8, min_margin=0.2):
+        """
+        Initialize a confidence-gated cascade of sign classifiers
+
+        Every batch goes through the cheapest tier first. Samples whose
+        top-1 probability is below min_confidence, or whose top-1/top-2
+        margin is below min_margin, are passed on to the next tier; the last
+        tier's answer is always accepted. Since most frames are easy, the
+        average cost per frame stays close to the cheapest tier's.
+
+        All tiers must predict the same labels in the same order.
+
+        Args:
+            tiers: List of (name, predict_batch) pairs, cheapest first; each
+                predict_batch takes a list of RGB crops and returns class
+                probabilities with one row per crop
+            min_confidence: Top-1 probability a tier needs to keep a sample
+            min_margin: Top-1/top-2 margin a tier needs to keep a sample
+        """
+        if not tiers:
+            raise ValueError("A cascade needs at least one tier")
+
+        self.tiers = list(tiers)
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+
+        # Per-tier statistics
+        self._stats_lock = threading.Lock()
+        self.total_samples = 0
+        self.tier_samples = [0] * len(self.tiers)
+        self.tier_accepted = [0] * len(self.tiers)
+        self.tier_calls = [0] * len(self.tiers)
+        self.tier_time = [0.0] * len(self.tiers)
+
+    def predict_batch(self, crops):
+        """
+        Classify a batch, escalating uncertain samples tier by tier
+
+        Args:
+            crops: List of RGB hand crops
+
+        Returns:
+            Array of class probabilities, one row per crop
+        """
+        results = None
+        pending = np.arange(len(crops))
+        last = len(self.tiers) - 1
+
+        for tier, (_, predict_batch) in enumerate(self.tiers):
+            start = time.perf_counter()
+            probabilities = np.asarray(predict_batch([crops[i] for i in pending]), dtype=np.float32)
+            elapsed = time.perf_counter() - start
+
+            if results is None:
+                results = np.empty((len(crops), probabilities.shape[1]), dtype=np.float32)
+            results[pending] = probabilities
+
+            if tier == last:
+                accepted = len(pending)
+                uncertain = pending[:0]
+            else:
+                top1, margin = top2_margin(probabilities)
+                escalate = (top1 < self.min_confidence) | (margin < self.min_margin)
+                accepted = len(pending) - int(escalate.sum())
+                uncertain = pending[escalate]
+
+            with self._stats_lock:
+                if tier == 0:
+                    self.total_samples += len(crops)
+                self.tier_samples[tier] += len(pending)
+                self.tier_accepted[tier] += accepted
+                self.tier_calls[tier] += 1
+                self.tier_time[tier] += elapsed
+
+            pending = uncertain
+            if not len(pending):
+                break
+
+        return results
+
+    def get_stats(self):
+        """
+        Get per-tier statistics
+
+        Returns:
+            Dictionary with the thresholds, the average cost per sample and,
+            for every tier, how many samples reached it, the share it answered
+            (hit rate) and its average latency per call
+        """
+        with self._stats_lock:
+            total = self.total_samples
+            tiers = []
+            for tier, (name, _) in enumerate(self.tiers):
+                samples = self.tier_samples[tier]
+                calls = self.tier_calls[tier]
+                tiers.append({
+                    'name': name,
+                    'samples': samples,
+                    'accepted': self.tier_accepted[tier],
+                    'hit_rate': self.tier_accepted[tier] / samples if samples else 0.0,
+                    'share': self.tier_accepted[tier] / total if total else 0.0,
+                    'average_latency_ms': self.tier_time[tier] / calls * 1000.0 if calls else 0.0
+                })
+            return {
+                'min_confidence': self.min_confidence,
+                'min_margin': self.min_margin,
+                'samples': total,
+                'average_cost_ms': sum(self.tier_time) / total * 1000.0 if total else 0.0,
+                'tiers': tiers
+            }
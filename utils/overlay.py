@@ -0,0 +1,67 @@
+import numpy as np
+
+# MediaPipe Hands landmark connections, kept here so rendering needs no MediaPipe import
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+_CONNECTION_INDEX = np.array(HAND_CONNECTIONS, dtype=np.intp).ravel()
+
+CONNECTION_COLOR = '#00ff00'
+LANDMARK_COLOR = '#ff00ff'
+BOX_COLOR = '#00ff00'
+TEXT_COLOR = '#00ff00'
+
+
+def build_overlay(width, height, landmarks=None, bbox=None, label=None, confidence=None, box_offset=20):
+    """
+    Describe the preview overlay as a compact list of drawing primitives
+
+    The server never draws into frames; when a client asks for a preview
+    it gets these primitives and renders them on its own canvas. Every
+    primitive is a list starting with a one-letter kind:
+
+        ['s', [x1, y1, x2, y2, ...], color, line_width]   line segments
+        ['c', [x, y, ...], radius, color]                  filled circles
+        ['r', x_min, y_min, x_max, y_max, color, width]    rectangle outline
+        ['t', x, y, text, color]                           text
+        ['b', x, y, w, h, color]                           filled bar
+
+    Coordinates are integer pixels of the processed frame; scale them by
+    canvas size / (w, h).
+
+    Args:
+        width: Width of the processed frame
+        height: Height of the processed frame
+        landmarks: Array of shape (21, 2+) or (hands, 21, 2+) in pixels, or None
+        bbox: [x_min, y_min, x_max, y_max] in pixels, an array of such boxes, or None
+        label: Predicted sign, or None
+        confidence: Prediction confidence in [0, 1], or None
+        box_offset: Margin drawn around the hand box
+
+    Returns:
+        Dictionary {'w': width, 'h': height, 'p': [primitive, ...]}
+    """
+    primitives = []
+
+    if landmarks is not None:
+        # One segment and one circle primitive cover every hand
+        xy = np.asarray(landmarks)[..., :2].astype(np.int32).reshape(-1, 21, 2)
+        primitives.append(['s', xy[:, _CONNECTION_INDEX].ravel().tolist(), CONNECTION_COLOR, 2])
+        primitives.append(['c', xy.ravel().tolist(), 4, LANDMARK_COLOR])
+
+    if bbox is not None:
+        for box in np.asarray(bbox).reshape(-1, 4):
+            x_min, y_min, x_max, y_max = (int(v) for v in box)
+            primitives.append(['r', x_min - box_offset, y_min - box_offset,
+                               x_max + box_offset, y_max + box_offset, BOX_COLOR, 2])
+
+    if label:
+        confidence = float(confidence or 0.0)
+        primitives.append(['t', 10, 30, f"{label}: {confidence:.2f}", TEXT_COLOR])
+        primitives.append(['b', 10, 50, int(confidence * 200), 20, TEXT_COLOR])
+
+    return {'w': int(width), 'h': int(height), 'p': primitives}
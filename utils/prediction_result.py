@@ -0,0 +1,88 @@
+from functools import cached_property
+
+import numpy as np
+
+
+class PredictionResult:
+    def __init__(self, probabilities, labels=None):
+        """
+        One frame's class probabilities with everything derived from them
+
+        The model runs once per frame; argmax, top-k, margin, entropy and
+        label lookups are computed on first use and cached, so asking for
+        several of them never triggers another prediction.
+
+        Args:
+            probabilities: Class probabilities of one sample
+            labels: Class labels, or None
+        """
+        self.probabilities = np.asarray(probabilities, dtype=np.float32).reshape(-1)
+        self.labels = labels if labels is not None else []
+        self._top = {}
+
+    @cached_property
+    def index(self):
+        """Index of the most probable class"""
+        return int(np.argmax(self.probabilities)) if len(self.probabilities) else 0
+
+    @cached_property
+    def confidence(self):
+        """Probability of the most probable class"""
+        return float(self.probabilities[self.index]) if len(self.probabilities) else 0.0
+
+    @cached_property
+    def label(self):
+        """Label of the most probable class, or None if it has no label"""
+        return self.labels[self.index] if self.index < len(self.labels) else None
+
+    @cached_property
+    def margin(self):
+        """Difference between the two highest probabilities"""
+        if len(self.probabilities) < 2:
+            return self.confidence
+        top1, top2 = self.top_k(2)
+        return float(self.probabilities[top1] - self.probabilities[top2])
+
+    @cached_property
+    def entropy(self):
+        """Shannon entropy of the distribution in nats"""
+        p = self.probabilities[self.probabilities > 0]
+        return float(-(p * np.log(p)).sum())
+
+    def top_k(self, k):
+        """
+        Get the indices of the k most probable classes
+
+        Uses a partial sort, so the cost is O(classes + k log k).
+
+        Args:
+            k: Number of classes
+
+        Returns:
+            Array of class indices, most probable first
+        """
+        k = min(k, len(self.probabilities))
+        if k not in self._top:
+            if k <= 0:
+                top = np.empty(0, dtype=np.intp)
+            else:
+                top = np.argpartition(self.probabilities, -k)[-k:]
+                top = top[np.argsort(self.probabilities[top])[::-1]]
+            self._top[k] = top
+        return self._top[k]
+
+    def top_predictions(self, k=3):
+        """
+        Get the k most probable labelled classes
+
+        Args:
+            k: Number of classes
+
+        Returns:
+            List of tuples: [(label, confidence), ...]
+        """
+        return [(self.labels[i], float(self.probabilities[i])) for i in self.top_k(k) if i < len(self.labels)]
+
+    def is_confident(self, threshold=0.7):
+        """Check whether the top class reaches a confidence threshold"""
+        return self.confidence >= threshold
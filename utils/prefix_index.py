@@ -0,0 +1,314 @@
+import heapq
+import json
+import os
+
+import numpy as np
+
+# Sorts after every character a word can continue with
+_PREFIX_END = '\U0010ffff'
+
+# Version of the saved table layout
+INDEX_FORMAT = 1
+
+
+def normalization_name(normalize):
+    """Default name recorded for a normalization callable"""
+    if normalize is None:
+        return None
+    return f"{getattr(normalize, '__module__', '')}.{getattr(normalize, '__qualname__', repr(normalize))}"
+
+
+def _metadata_path(path):
+    """Path of the JSON file describing a saved table"""
+    return os.path.splitext(path)[0] + '.json'
+
+
+def read_lexicon(path):
+    """
+    Read a lexicon file with one "word<TAB>frequency" entry per line
+
+    Lines starting with # are comments; a missing frequency counts as 1.
+
+    Args:
+        path: Path to the lexicon file
+
+    Returns:
+        List of (word, frequency) pairs in file order
+    """
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            word, _, frequency = line.partition('\t')
+            word = word.strip()
+            if word:
+                entries.append((word, int(frequency) if frequency.strip() else 1))
+    return entries
+
+
+class PrefixIndex:
+    def __init__(self, entries, normalize=None):
+        """
+        Build a prefix index over words ranked by frequency
+
+        Words are stored in one array sorted by their normalized key, so
+        all completions of a prefix form a contiguous range found with two
+        binary searches. A sparse table over the words' ranks answers "most
+        frequent word in a range" in O(1), so the top k of a range are
+        extracted in O(k log k) however many words share the prefix.
+
+        Args:
+            entries: Iterable of (word, frequency) pairs; ties keep their order
+            normalize: Callable applied to words and queries (e.g. removing
+                diacritics), or None
+        """
+        self.normalize = normalize
+        entries = list(entries)
+
+        # Rank 0 is the most frequent word
+        order = sorted(range(len(entries)), key=lambda i: -entries[i][1])
+        ranks = np.empty(len(entries), dtype=np.int32)
+        ranks[order] = np.arange(len(entries), dtype=np.int32)
+
+        keys = [self._key(word) for word, _ in entries]
+        by_key = sorted(range(len(entries)), key=lambda i: (keys[i], ranks[i]))
+
+        width = max([len(key) for key in keys] + [len(word) for word, _ in entries] + [1])
+        self.table = np.zeros(len(entries), dtype=[('key', f'U{width}'), ('word', f'U{width}'),
+                                                    ('rank', np.int32), ('frequency', np.int64)])
+        if entries:
+            by_key = np.asarray(by_key)
+            self.table['key'] = np.asarray(keys)[by_key]
+            self.table['word'] = np.asarray([word for word, _ in entries])[by_key]
+            self.table['rank'] = ranks[by_key]
+            self.table['frequency'] = np.asarray([frequency for _, frequency in entries])[by_key]
+
+        self._build_sparse_table()
+
+    @classmethod
+    def from_table(cls, table, normalize=None):
+        """Wrap an already sorted table (e.g. memory-mapped from disk)"""
+        index = cls.__new__(cls)
+        index.normalize = normalize
+        index.table = table
+        index._build_sparse_table()
+        return index
+
+    @classmethod
+    def from_lexicon(cls, path, normalize=None):
+        """
+        Build an index from a lexicon file (see read_lexicon)
+
+        Returns:
+            PrefixIndex
+        """
+        return cls(read_lexicon(path), normalize=normalize)
+
+    def save(self, path, normalization=None):
+        """
+        Save the sorted table as a .npy file that load can memory-map
+
+        A JSON file next to it records the table format and the
+        normalization the keys were built with; it is written last, so a
+        partly saved table is never accepted.
+
+        Args:
+            path: Output path
+            normalization: Name (and version) of the normalization, or None
+                for the normalize callable's qualified name
+        """
+        if normalization is None:
+            normalization = normalization_name(self.normalize)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.save(path, self.table, allow_pickle=False)
+        with open(_metadata_path(path), 'w', encoding='utf-8') as f:
+            json.dump({'format': INDEX_FORMAT, 'normalization': normalization, 'size': len(self.table)}, f)
+
+    @classmethod
+    def load(cls, path, normalize=None, normalization=None, mmap=True):
+        """
+        Open a table written by save
+
+        Args:
+            path: Path to the .npy file
+            normalize: Same normalization the table was built with
+            normalization: Name the table must have been saved with, or None
+                for the normalize callable's qualified name
+            mmap: Whether to memory-map the file instead of reading it
+
+        Returns:
+            PrefixIndex
+
+        Raises:
+            ValueError: If the table has another format or normalization
+        """
+        if normalization is None:
+            normalization = normalization_name(normalize)
+        with open(_metadata_path(path), 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if metadata.get('format') != INDEX_FORMAT:
+            raise ValueError(f"Prefix index has format {metadata.get('format')}, expected {INDEX_FORMAT}")
+        if metadata.get('normalization') != normalization:
+            raise ValueError(f"Prefix index was built with normalization {metadata.get('normalization')}")
+
+        table = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+        if len(table) != metadata.get('size'):
+            raise ValueError("Prefix index is incomplete")
+        return cls.from_table(table, normalize=normalize)
+
+    def _key(self, text):
+        """Normalize a word or query"""
+        return self.normalize(text) if self.normalize is not None else text
+
+    def _build_sparse_table(self):
+        """Precompute, per power of two, the best-ranked row of every range of that length"""
+        ranks = np.asarray(self.table['rank'])
+        levels = [np.arange(len(ranks), dtype=np.int32)]
+        span = 1
+        while span * 2 <= len(ranks):
+            previous = levels[-1]
+            left = previous[:len(ranks) - span * 2 + 1]
+            right = previous[span:span + len(left)]
+            levels.append(np.where(ranks[left] <= ranks[right], left, right))
+            span *= 2
+        self._ranks = ranks
+        self._levels = levels
+
+    def _best(self, start, end):
+        """Row with the best rank in table[start:end] (end > start)"""
+        level = (end - start).bit_length() - 1
+        left = self._levels[level][start]
+        right = self._levels[level][end - (1 << level)]
+        return int(left) if self._ranks[left] <= self._ranks[right] else int(right)
+
+    def prefix_range(self, prefix):
+        """
+        Get the rows whose key starts with a prefix
+
+        Args:
+            prefix: Query prefix (normalized here)
+
+        Returns:
+            Tuple: (start, end) rows of the table
+        """
+        key = self._key(prefix)
+        keys = self.table['key']
+        start = int(np.searchsorted(keys, key, side='left'))
+        end = int(np.searchsorted(keys, key + _PREFIX_END, side='left'))
+        return start, end
+
+    def exact_range(self, word):
+        """
+        Get the rows whose key equals a word's key
+
+        Returns:
+            Tuple: (start, end) rows of the table
+        """
+        key = self._key(word)
+        keys = self.table['key']
+        return int(np.searchsorted(keys, key, side='left')), int(np.searchsorted(keys, key, side='right'))
+
+    def is_final(self, word):
+        """
+        Check whether a word is in the lexicon and no longer lexicon word extends it
+
+        Returns:
+            True if every key starting with the word's key equals it
+        """
+        start, end = self.prefix_range(word)
+        return end > start and self.exact_range(word) == (start, end)
+
+    def get(self, word, default=None):
+        """
+        Get the lexicon spelling of a word (the most frequent one with the same key)
+
+        Args:
+            word: Word to look up
+            default: Returned if the word is not in the lexicon
+
+        Returns:
+            Word from the lexicon, or default
+        """
+        start, end = self.exact_range(word)
+        if start >= end:
+            return default
+        return str(self.table['word'][self._best(start, end)])
+
+    def top_k(self, prefix, k=5):
+        """
+        Get the k most frequent words starting with a prefix
+
+        Args:
+            prefix: Query prefix
+            k: Number of words
+
+        Returns:
+            List of words, most frequent first
+        """
+        start, end = self.prefix_range(prefix)
+        if k <= 0 or start >= end:
+            return []
+
+        # Best of a range first; taking it splits the range in two
+        best = self._best(start, end)
+        heap = [(self._ranks[best], best, start, end)]
+        words = []
+        while heap and len(words) < k:
+            _, row, range_start, range_end = heapq.heappop(heap)
+            words.append(str(self.table['word'][row]))
+            for sub_start, sub_end in ((range_start, row), (row + 1, range_end)):
+                if sub_start < sub_end:
+                    sub_best = self._best(sub_start, sub_end)
+                    heapq.heappush(heap, (self._ranks[sub_best], sub_best, sub_start, sub_end))
+        return words
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, word):
+        start, end = self.exact_range(word)
+        return end > start
+
+
+def load_prefix_index(lexicon_path, index_path=None, normalize=None, normalization=None):
+    """
+    Open the prebuilt index if it is up to date, otherwise build and save it
+
+    The saved index is reused while it is newer than the lexicon and was
+    built with the same normalization.
+
+    Args:
+        lexicon_path: Lexicon text file (see read_lexicon)
+        index_path: .npy file to memory-map or (re)write, or None
+        normalize: Normalization for words and queries
+        normalization: Name and version of normalize (change it whenever
+            normalize changes), or None for its qualified name
+
+    Returns:
+        PrefixIndex (empty if the lexicon cannot be read)
+    """
+    try:
+        if (index_path and os.path.exists(index_path)
+                and (not os.path.exists(lexicon_path)
+                     or os.path.getmtime(index_path) >= os.path.getmtime(lexicon_path))):
+            try:
+                index = PrefixIndex.load(index_path, normalize=normalize, normalization=normalization)
+                print(f"Loaded prefix index of {len(index)} words from {index_path}")
+                return index
+            except (OSError, ValueError) as e:
+                print(f"Rebuilding prefix index: {str(e)}")
+
+        index = PrefixIndex.from_lexicon(lexicon_path, normalize=normalize)
+        print(f"Built prefix index of {len(index)} words from {lexicon_path}")
+    except Exception as e:
+        print(f"Error loading lexicon: {str(e)}")
+        return PrefixIndex([], normalize=normalize)
+
+    if index_path:
+        try:
+            index.save(index_path, normalization=normalization)
+        except OSError as e:
+            print(f"Could not save prefix index: {str(e)}")
+    return index
@@ -0,0 +1,216 @@
+import json
+import threading
+
+import cv2
+import numpy as np
+
+DEFAULT_INPUT_SHAPE = (224, 224, 3)
+DEFAULT_INPUT_SCALE = 1.0 / 255.0
+
+
+def model_input_scale(model):
+    """
+    Get the factor pixels must be multiplied by before reaching a Keras model
+
+    Models built by create_simple_model.py and create_lightweight_model.py
+    start with a Rescaling(1/255) layer, so they expect raw [0, 255] pixels.
+
+    Args:
+        model: Keras model
+
+    Returns:
+        1.0 if the model rescales internally, otherwise 1/255
+    """
+    for layer in model.layers:
+        if layer.__class__.__name__ == 'Rescaling':
+            return 1.0
+    return DEFAULT_INPUT_SCALE
+
+
+def load_model_info(info_path="Model/model_info.json"):
+    """
+    Load the model metadata written by create_simple_model.py
+
+    Args:
+        info_path: Path to model_info.json
+
+    Returns:
+        Metadata dictionary (empty if the file is missing or invalid)
+    """
+    try:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def info_input_scale(info):
+    """
+    Get the input scale described by model metadata
+
+    Args:
+        info: Dictionary loaded from model_info.json
+
+    Returns:
+        Input scale, or None if the metadata does not say
+    """
+    preprocessing = info.get('preprocessing', {})
+    if 'input_scale' in preprocessing:
+        return float(preprocessing['input_scale'])
+    if 'rescaling' in preprocessing:
+        # Older metadata describes the model's own Rescaling layer
+        return 1.0
+    return None
+
+
+def crop_box(img, bbox, offset=20):
+    """
+    Crop a hand's box plus a margin, clipped to the image
+
+    This is the crop the server classifies, so offline tools that feed
+    the classifier use it as well.
+
+    Args:
+        img: Image
+        bbox: [x_min, y_min, x_max, y_max] in pixels
+        offset: Pixels added on every side
+
+    Returns:
+        View into img (may be empty if the box is outside the image)
+    """
+    x_min, y_min, x_max, y_max = np.asarray(bbox).astype(int).tolist()
+    x_min = max(0, x_min - offset)
+    y_min = max(0, y_min - offset)
+    x_max = min(img.shape[1], x_max + offset)
+    y_max = min(img.shape[0], y_max + offset)
+    return img[y_min:y_max, x_min:x_max]
+
+
+def validate_crop(crop):
+    """
+    Check that a crop can be preprocessed
+
+    Args:
+        crop: Hand crop
+
+    Raises:
+        ValueError: If the crop is not a non-empty image with 3 channels
+    """
+    if not isinstance(crop, np.ndarray) or crop.ndim != 3 or crop.shape[2] != 3:
+        raise ValueError(f"Expected an image of shape (height, width, 3), got {getattr(crop, 'shape', type(crop))}")
+    if crop.shape[0] == 0 or crop.shape[1] == 0:
+        raise ValueError("Empty crop")
+
+
+class CropPreprocessor:
+    def __init__(self, input_shape=DEFAULT_INPUT_SHAPE, input_scale=DEFAULT_INPUT_SCALE,
+                 letterbox=False, pad_value=255, max_batch_size=16):
+        """
+        Initialize the fused crop -> resize -> normalize stage
+
+        Crops are resized into a preallocated uint8 scratch image and then
+        scaled straight into a preallocated float32 batch buffer, so no
+        per-frame float temporaries are created.
+
+        Args:
+            input_shape: Model input shape (height, width, channels)
+            input_scale: Factor applied to pixel values (1.0 if the model rescales itself)
+            letterbox: Whether to preserve the crop's aspect ratio and pad the rest
+            pad_value: Pixel value used for letterbox padding (white, as in datacollection.py)
+            max_batch_size: Initial number of slots in the batch buffer
+        """
+        self.height, self.width, self.channels = (int(dim) for dim in input_shape)
+        self.input_scale = np.float32(input_scale)
+        self.letterbox = letterbox
+        self.pad_value = pad_value
+        self.max_batch_size = max_batch_size
+
+        # Buffers are per thread so concurrent callers never share them
+        self._local = threading.local()
+
+    @classmethod
+    def from_keras_model(cls, model, **kwargs):
+        """
+        Create a preprocessor matching a Keras model's input
+
+        Args:
+            model: Keras model with a static input shape
+            **kwargs: Extra arguments for the constructor
+
+        Returns:
+            CropPreprocessor
+        """
+        return cls(input_shape=tuple(model.input_shape[1:]), input_scale=model_input_scale(model), **kwargs)
+
+    @classmethod
+    def from_model_info(cls, input_shape=None, info_path="Model/model_info.json", **kwargs):
+        """
+        Create a preprocessor from model metadata
+
+        Args:
+            input_shape: Input shape reported by the runtime (takes precedence over the metadata)
+            info_path: Path to model_info.json
+            **kwargs: Extra arguments for the constructor
+
+        Returns:
+            CropPreprocessor
+        """
+        info = load_model_info(info_path)
+        if input_shape is None:
+            input_shape = info.get('input_shape', DEFAULT_INPUT_SHAPE)
+        input_scale = info_input_scale(info)
+        if input_scale is None:
+            input_scale = DEFAULT_INPUT_SCALE
+        return cls(input_shape=input_shape, input_scale=input_scale, **kwargs)
+
+    def _buffers(self, batch_size):
+        """Get the calling thread's batch buffer and scratch image"""
+        batch = getattr(self._local, 'batch', None)
+        if batch is None or len(batch) < batch_size:
+            size = max(batch_size, self.max_batch_size)
+            batch = np.empty((size, self.height, self.width, self.channels), dtype=np.float32)
+            self._local.batch = batch
+            self._local.scratch = np.empty((self.height, self.width, self.channels), dtype=np.uint8)
+        return batch, self._local.scratch
+
+    def _resize_into(self, crop, scratch):
+        """Resize a crop into the scratch image, letterboxing if enabled"""
+        if not self.letterbox:
+            cv2.resize(crop, (self.width, self.height), dst=scratch, interpolation=cv2.INTER_LINEAR)
+            return
+
+        h, w = crop.shape[:2]
+        k = min(self.width / w, self.height / h)
+        new_w = max(1, min(self.width, round(w * k)))
+        new_h = max(1, min(self.height, round(h * k)))
+        x_gap = (self.width - new_w) // 2
+        y_gap = (self.height - new_h) // 2
+
+        scratch.fill(self.pad_value)
+        cv2.resize(crop, (new_w, new_h), dst=scratch[y_gap:y_gap + new_h, x_gap:x_gap + new_w],
+                   interpolation=cv2.INTER_LINEAR)
+
+    def fill(self, crops, bgr=False):
+        """
+        Preprocess crops into the batch buffer
+
+        The returned array is a view into a reused buffer: it is only valid
+        until the next call from the same thread.
+
+        Args:
+            crops: List of RGB crops (uint8)
+            bgr: Whether the crops are BGR and need converting to RGB
+
+        Returns:
+            float32 array of shape (len(crops), height, width, channels)
+        """
+        batch, scratch = self._buffers(len(crops))
+
+        for i, crop in enumerate(crops):
+            self._resize_into(crop, scratch)
+            if bgr:
+                cv2.cvtColor(scratch, cv2.COLOR_BGR2RGB, dst=scratch)
+            # uint8 * float32 scalar is computed in float32 directly into the slot
+            np.multiply(scratch, self.input_scale, out=batch[i])
+
+        return batch[:len(crops)]
@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+from utils.stability import StabilityEmitter
+
+
+class RecognitionSession:
+    def __init__(self, session_id, detector_pool=None, scheduler_factory=None, sequence_factory=None,
+                 emitter_factory=StabilityEmitter, grammar_factory=None, decoder_factory=None,
+                 max_recognized_signs=10, max_history=100):
+        """
+        Initialize the recognition state owned by a single client
+
+        Args:
+            session_id: Identifier of the client (browser session or stream)
+            detector_pool: HandDetectorPool the client's frames are detected with
+            scheduler_factory: Callable returning a DetectionScheduler for this client
+            sequence_factory: Callable returning the client's SequenceState, or None
+            emitter_factory: Callable returning the StabilityEmitter that decides when a sign is final
+            grammar_factory: Callable returning the RewriteState of the client's sentence, or None
+            decoder_factory: Callable returning the DecoderState of the client's word in progress, or None
+            max_recognized_signs: Number of recent signs kept for sentence building
+            max_history: Number of recognition events kept in the history
+        """
+        self.session_id = session_id
+        self.detector_pool = detector_pool
+        # Decides which of this client's frames run detection
+        self.detection_scheduler = scheduler_factory() if scheduler_factory is not None else None
+        # Ring buffers of the temporal model for dynamic signs
+        self.sequence_state = sequence_factory() if sequence_factory is not None else None
+        # Votes over recent frames instead of a fixed cooldown
+        self.emitter = emitter_factory()
+        # Grammar rewriting of the sentence resumes near its end
+        self.grammar_state = grammar_factory() if grammar_factory is not None else None
+        # Beam of letter hypotheses for the word being spelled
+        self.word_state = decoder_factory() if decoder_factory is not None else None
+        self.max_recognized_signs = max_recognized_signs
+
+        # Held while one of this client's frames is being processed
+        self.lock = threading.Lock()
+
+        self.recognized_signs = []
+        self.current_sentence = ""
+        # current_sentence after grammar rules and spelling correction, as shown
+        self.processed_sentence = ""
+        self.last_prediction_time = 0.0
+        self.history = deque(maxlen=max_history)
+
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+    def checkout_detector(self, timeout=None):
+        """
+        Check out the HandDetector pinned to this client
+
+        Use as a context manager; it yields None if no detector became free
+        before the timeout.
+
+        Args:
+            timeout: Seconds to wait for a free detector (None waits forever)
+        """
+        return self.detector_pool.checkout(self.session_id, timeout=timeout)
+
+    def touch(self, now=None):
+        """Mark the session as recently used"""
+        self.last_used = time.time() if now is None else now
+
+    def record_prediction(self, label, confidence, now=None):
+        """
+        Record an emitted sign
+
+        Args:
+            label: Recognized sign
+            confidence: Classifier confidence for the sign
+            now: Current time (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        self.last_prediction_time = now
+
+        self.recognized_signs.append(label)
+        if len(self.recognized_signs) > self.max_recognized_signs:
+            self.recognized_signs = self.recognized_signs[-self.max_recognized_signs:]
+
+        self.history.append((now, label, confidence))
+
+    def append_to_sentence(self, text):
+        """
+        Append a sign or word to the sentence (the caller holds the lock)
+
+        Args:
+            text: Recognized sign or word
+        """
+        # Add the new text to recognized signs list for proper sentence building
+        if text not in self.recognized_signs:
+            self.recognized_signs.append(text)
+
+        # Signs are space-separated; grammar rules join letters into words
+        self.current_sentence += " " + text if self.current_sentence else text
+
+    def close(self):
+        """Release resources held by the session"""
+        # Wait for any frame still in flight before giving up the detector
+        with self.lock:
+            if self.detector_pool is not None:
+                self.detector_pool.forget(self.session_id)
+
+
+class RecognitionSessionRegistry:
+    def __init__(self, max_sessions=32, ttl=600.0, session_factory=RecognitionSession, **session_kwargs):
+        """
+        Initialize the registry of per-client recognition sessions
+
+        Sessions are kept in least-recently-used order. The least recently
+        used session is evicted when the registry is full, and sessions idle
+        for longer than the TTL are dropped.
+
+        Args:
+            max_sessions: Maximum number of live sessions
+            ttl: Seconds of inactivity after which a session expires
+            session_factory: Callable creating a session from an identifier
+            **session_kwargs: Extra keyword arguments passed to session_factory
+        """
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.session_factory = session_factory
+        self.session_kwargs = session_kwargs
+
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """
+        Get the session for a client, creating it if needed
+
+        Args:
+            session_id: Client identifier
+
+        Returns:
+            RecognitionSession
+        """
+        now = time.time()
+        evicted = []
+
+        with self._lock:
+            self._expire(now, evicted)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self.session_factory(session_id, **self.session_kwargs)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    _, oldest = self._sessions.popitem(last=False)
+                    evicted.append(oldest)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            session.touch(now)
+
+        # Close outside the registry lock; closing waits for a frame in flight
+        for old_session in evicted:
+            old_session.close()
+
+        return session
+
+    def remove(self, session_id):
+        """
+        Remove and close a session
+
+        Args:
+            session_id: Client identifier
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+
+    def _expire(self, now, evicted):
+        """Move sessions idle for longer than the TTL into evicted"""
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest.last_used <= self.ttl:
+                break
+            del self._sessions[session_id]
+            evicted.append(oldest)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
@@ -0,0 +1,304 @@
+import os
+
+import numpy as np
+
+from utils.landmark_classifier import normalize_landmarks, FEATURE_SIZE
+
+# Normalized hand shape plus where the wrist is and how big the hand is,
+# so movement across the frame is visible to the temporal model
+SEQUENCE_FEATURE_SIZE = FEATURE_SIZE + 3
+
+
+def sequence_features(points, hand_type, width, height):
+    """
+    Build the per-frame input of the temporal model
+
+    Args:
+        points: Array of shape (21, 3) in pixels
+        hand_type: "Left", "Right" or None
+        width: Frame width
+        height: Frame height
+
+    Returns:
+        float32 vector of length 66
+    """
+    points = np.asarray(points, dtype=np.float32)
+    features = np.empty(SEQUENCE_FEATURE_SIZE, dtype=np.float32)
+    features[:FEATURE_SIZE] = normalize_landmarks(points, hand_type)
+
+    wrist_x = points[0, 0] / width
+    if hand_type == 'Left':
+        wrist_x = 1.0 - wrist_x
+    extent = points[:, :2].max(axis=0) - points[:, :2].min(axis=0)
+    features[FEATURE_SIZE] = wrist_x
+    features[FEATURE_SIZE + 1] = points[0, 1] / height
+    features[FEATURE_SIZE + 2] = max(extent[0], extent[1]) / width
+    return features
+
+
+# Frame rate assumed for models exported before the rate was recorded
+# (they were trained on every frame of the clips, usually 30 fps video)
+LEGACY_FPS = 30.0
+
+
+def resample_features(times, features, fps):
+    """
+    Interpolate per-detection features onto a fixed frame rate
+
+    The temporal model steps at the frame rate it was trained at, whatever
+    rate frames arrive at; SequenceRecognizer.update does the same
+    incrementally.
+
+    Args:
+        times: Increasing timestamps in seconds, one per row of features
+        features: Array of shape (detections, 66)
+        fps: Frame rate of the model
+
+    Returns:
+        float32 array with one row per 1 / fps seconds from times[0]
+    """
+    times = np.asarray(times, dtype=np.float64)
+    features = np.asarray(features, dtype=np.float32)
+    if len(times) == 0:
+        return features
+    steps = int(np.floor((times[-1] - times[0]) * fps + 1e-6)) + 1
+    ticks = times[0] + np.arange(steps) / fps
+    resampled = np.empty((steps, features.shape[1]), dtype=np.float32)
+    for j in range(features.shape[1]):
+        resampled[:, j] = np.interp(ticks, times, features[:, j])
+    return resampled
+
+
+class _StreamingConv:
+    def __init__(self, kernel, bias, dilation):
+        """
+        Causal dilated Conv1D evaluated one time step at a time
+
+        Keeps a ring buffer of the last (kernel_size - 1) * dilation + 1
+        inputs, so a step costs one kernel application instead of a pass
+        over the whole window.
+        """
+        kernel_size, in_channels, out_channels = kernel.shape
+        self.kernel = kernel.reshape(kernel_size * in_channels, out_channels)
+        self.bias = bias
+        self.span = (kernel_size - 1) * dilation + 1
+        # Tap k reads the input from (kernel_size - 1 - k) * dilation steps ago
+        self.offsets = (kernel_size - 1 - np.arange(kernel_size)) * dilation
+        self.in_channels = in_channels
+        self.out_channels = out_channels
+
+    def apply(self, taps):
+        """Kernel application with ReLU on inputs of shape (kernel_size, in_channels)"""
+        x = taps.reshape(-1) @ self.kernel + self.bias
+        np.maximum(x, 0, out=x)
+        return x
+
+
+class SequenceState:
+    def __init__(self, layers, window, max_gap):
+        """
+        Per-session state of the streaming temporal model
+
+        Args:
+            layers: Convolution layers of the SequenceRecognizer
+            window: Number of recent frames the prediction pools over
+            max_gap: Seconds without a detected hand after which the state resets
+        """
+        self.layers = layers
+        self.window = window
+        self.max_gap = max_gap
+
+        # One input ring buffer per layer; the first holds recent landmark vectors
+        self.histories = [np.zeros((layer.span, layer.in_channels), dtype=np.float32) for layer in layers]
+        self.positions = [0] * len(layers)
+
+        # Ring buffer of the last layer's outputs and their running sum
+        out_channels = layers[-1].out_channels if layers else SEQUENCE_FEATURE_SIZE
+        self.outputs = np.zeros((window, out_channels), dtype=np.float32)
+        self.output_sum = np.zeros(out_channels, dtype=np.float64)
+        self.output_pos = 0
+
+        self.frames = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every buffered frame
+
+        The buffers are filled as if an endless run of all-zero frames had
+        been seen, which is what the model is trained on before a clip
+        starts (see train_sequence_model.clip_segment).
+        """
+        x = np.zeros(self.histories[0].shape[1] if self.histories else SEQUENCE_FEATURE_SIZE, dtype=np.float32)
+        for layer, history in zip(self.layers, self.histories):
+            history[:] = x
+            x = layer.apply(history[:layer.offsets.shape[0]])
+        self.positions = [0] * len(self.positions)
+        self.outputs[:] = x
+        self.output_sum[:] = self.outputs.sum(axis=0, dtype=np.float64)
+        self.output_pos = 0
+        self.frames = 0
+
+        # Last detection, interpolated towards by the next one
+        self.last_time = None
+        self.last_features = None
+        self.next_time = None
+
+
+class SequenceRecognizer:
+    def __init__(self, model_path="Model/sequence_model.npz", max_gap=1.0, min_frames=10):
+        """
+        Initialize the recognizer for dynamic (multi-frame) signs
+
+        The model is a stack of causal dilated 1D convolutions over per-frame
+        landmark features, average-pooled over the last `window` frames and
+        followed by a softmax layer. It runs incrementally: every frame
+        advances each layer by one step and updates the pooled sum, so the
+        cost per frame does not depend on the window length. Weights come
+        from train_sequence_model.py, which trains on clip prefixes preceded
+        by zero frames, so every reported prediction sees the same input as
+        in training.
+
+        Frames arrive at the client's pace and most of them only carry
+        landmarks moved by optical flow, so the model is fed real detections
+        only, interpolated onto the frame rate it was trained at (see
+        update): a window then covers the same time span as in training.
+
+        Args:
+            model_path: Path to the .npz file with weights and labels
+            max_gap: Seconds without a detected hand after which a session's sequence restarts
+            min_frames: Model steps needed before predictions are reported
+        """
+        self.model_path = model_path
+        self.max_gap = max_gap
+        self.min_frames = min_frames
+        self.layers = []
+        self.weight = None
+        self.bias = None
+        self.labels = []
+        self.window = 30
+        self.fps = LEGACY_FPS
+
+        self.load_model()
+
+    def load_model(self):
+        """Load weights and labels from the .npz file"""
+        if not os.path.exists(self.model_path):
+            print(f"Sequence model not found at {self.model_path}")
+            return
+
+        try:
+            with np.load(self.model_path, allow_pickle=False) as data:
+                num_layers = int(data['num_layers'])
+                dilations = data['dilations']
+                self.layers = [
+                    _StreamingConv(data[f'K{i}'].astype(np.float32), data[f'c{i}'].astype(np.float32), int(dilations[i]))
+                    for i in range(num_layers)
+                ]
+                self.weight = data['W'].astype(np.float32)
+                self.bias = data['b'].astype(np.float32)
+                self.labels = [str(label) for label in data['labels']]
+                self.window = int(data['window'])
+                self.fps = float(data['fps']) if 'fps' in data.files else LEGACY_FPS
+            print(f"Sequence model loaded from {self.model_path} ({len(self.labels)} labels, "
+                  f"{self.window}-frame window at {self.fps:g} fps)")
+        except Exception as e:
+            print(f"Error loading sequence model: {str(e)}")
+            self.layers = []
+            self.weight = None
+            self.labels = []
+
+    def is_loaded(self):
+        """Check whether a model is available"""
+        return self.weight is not None
+
+    def create_state(self):
+        """Create the streaming state for one session"""
+        return SequenceState(self.layers, self.window, self.max_gap)
+
+    def update(self, state, features, timestamp):
+        """
+        Advance a session's sequence to a new hand detection
+
+        The model steps every 1 / fps seconds; the inputs of the steps
+        since the previous detection are interpolated between the two
+        detections, as resample_features does for training clips.
+
+        Args:
+            state: SequenceState of the session
+            features: Vector from sequence_features of the detected hand
+            timestamp: Time of the detection in seconds (e.g. time.monotonic())
+
+        Returns:
+            Class probabilities after the last step, or None if no step was
+            due or fewer than min_frames steps have been taken
+        """
+        features = np.asarray(features, dtype=np.float32)
+        if state.last_time is not None and timestamp - state.last_time > state.max_gap:
+            state.reset()
+
+        if state.last_time is None:
+            probabilities = self.step(state, features)
+            state.next_time = timestamp + 1.0 / self.fps
+        else:
+            probabilities = None
+            span = timestamp - state.last_time
+            while state.next_time <= timestamp + 1e-6:
+                alpha = (state.next_time - state.last_time) / span if span > 0 else 1.0
+                x = state.last_features + np.float32(alpha) * (features - state.last_features)
+                probabilities = self.step(state, x)
+                state.next_time += 1.0 / self.fps
+
+        state.last_time = timestamp
+        state.last_features = features
+        return probabilities
+
+    def step(self, state, features):
+        """
+        Advance a session's sequence by one model step
+
+        Args:
+            state: SequenceState of the session
+            features: Vector from sequence_features
+
+        Returns:
+            Class probabilities over the last `window` frames, or None while
+            fewer than min_frames frames have been seen
+        """
+        x = np.asarray(features, dtype=np.float32)
+
+        for i, layer in enumerate(self.layers):
+            history = state.histories[i]
+            pos = state.positions[i]
+            history[pos] = x
+            x = layer.apply(history[(pos - layer.offsets) % layer.span])
+            state.positions[i] = (pos + 1) % layer.span
+
+        # Running sum over the window: add the newest output, drop the oldest
+        slot = state.output_pos
+        state.output_sum -= state.outputs[slot]
+        state.outputs[slot] = x
+        state.output_sum += x
+        state.output_pos = (slot + 1) % state.window
+
+        state.frames += 1
+        if state.frames < self.min_frames:
+            return None
+
+        # Before the window fills up it still holds the zero-frame outputs
+        pooled = (state.output_sum / state.window).astype(np.float32)
+        logits = pooled @ self.weight + self.bias
+        logits -= logits.max()
+        np.exp(logits, out=logits)
+        return logits / logits.sum()
+
+    def skip(self, state, timestamp):
+        """
+        Record a frame without a hand; long gaps end the current sequence
+
+        Args:
+            state: SequenceState of the session
+            timestamp: Time of the frame in seconds
+        """
+        if state.last_time is not None and timestamp - state.last_time > state.max_gap:
+            state.reset()
@@ -3,6 +3,9 @@ import cv2
 import tensorflow as tf
 from tensorflow import keras
 import os
+from utils.compiled_model import CompiledModel
+from utils.preprocessing import CropPreprocessor
+from utils.prediction_result import PredictionResult
 
 class SignClassifier:
     def __init__(self, model_path="Model/keras_model.h5", labels_path="data/labels.txt"):
@@ -16,8 +19,10 @@ class SignClassifier:
         self.model_path = model_path
         self.labels_path = labels_path
         self.model = None
+        self.compiled_model = None
+        self.preprocessor = None
         self.labels = []
-        self.img_size = 224  # Standard input size
+        self.img_size = 224  # Standard input size, replaced by the loaded model's
         
         # Load model and labels
         self.load_model()
@@ -28,6 +33,9 @@ class SignClassifier:
         try:
             if os.path.exists(self.model_path):
                 self.model = keras.models.load_model(self.model_path)
+                self.img_size = self.model.input_shape[1]
+                self.compiled_model = CompiledModel(self.model)
+                self.preprocessor = CropPreprocessor.from_keras_model(self.model, max_batch_size=1)
                 print(f"Model loaded successfully from {self.model_path}")
             else:
                 print(f"Model file not found at {self.model_path}")
@@ -47,9 +55,9 @@ class SignClassifier:
         
         self.model = keras.Model(inputs=inputs, outputs=outputs)
         
-        # Initialize with random weights
-        dummy_input = np.random.random((1, self.img_size, self.img_size, 3))
-        _ = self.model(dummy_input)
+        # Trace the inference function (this also initializes the weights)
+        self.compiled_model = CompiledModel(self.model)
+        self.preprocessor = CropPreprocessor.from_keras_model(self.model, max_batch_size=1)
         
     def load_labels(self):
         """Load class labels from file"""
@@ -87,104 +95,113 @@ class SignClassifier:
             img: Input image (BGR format from OpenCV)
             
         Returns:
-            Preprocessed image array
+            Preprocessed image batch (a view into a reused buffer)
         """
-        # Convert BGR to RGB
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # Resize, convert to RGB and scale as the model expects in one pass
+        return self.preprocessor.fill([img], bgr=True)
         
-        # Resize image to model input size
-        img_resized = cv2.resize(img_rgb, (self.img_size, self.img_size))
-        
-        # Normalize pixel values to [0, 1]
-        img_normalized = img_resized.astype(np.float32) / 255.0
-        
-        # Add batch dimension
-        img_batch = np.expand_dims(img_normalized, axis=0)
-        
-        return img_batch
-        
-    def get_prediction(self, img, draw=True):
+    def predict(self, img):
         """
-        Get prediction for the input image
+        Run the model once on a frame
+        
+        Pass the returned PredictionResult to get_top_predictions and
+        is_confident instead of the frame to avoid running the model again.
         
         Args:
             img: Input image (BGR format)
-            draw: Whether to draw prediction on image
             
         Returns:
-            Tuple: (prediction_probabilities, predicted_class_index)
+            PredictionResult
         """
         if self.model is None:
-            return np.zeros(len(self.labels)), 0
+            return PredictionResult(np.zeros(len(self.labels)), self.labels)
             
         try:
             # Preprocess image
             processed_img = self.preprocess_image(img)
             
             # Get prediction
-            predictions = self.model.predict(processed_img, verbose=0)
-            prediction_probs = predictions[0]  # Remove batch dimension
-            
-            # Get the class with highest probability
-            predicted_class = np.argmax(prediction_probs)
-            
-            # Draw prediction on image if requested
-            if draw and predicted_class < len(self.labels):
-                label = self.labels[predicted_class]
-                confidence = prediction_probs[predicted_class]
-                
-                # Draw prediction text
-                text = f"{label}: {confidence:.2f}"
-                cv2.putText(img, text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
-                           1, (0, 255, 0), 2, cv2.LINE_AA)
-                
-                # Draw confidence bar
-                bar_width = int(confidence * 200)
-                cv2.rectangle(img, (10, 50), (10 + bar_width, 70), (0, 255, 0), -1)
-                cv2.rectangle(img, (10, 50), (210, 70), (255, 255, 255), 2)
-            
-            return prediction_probs, predicted_class
-            
+            predictions = self.compiled_model.predict(processed_img)
+            return PredictionResult(predictions[0], self.labels)  # Remove batch dimension
         except Exception as e:
             print(f"Error in prediction: {str(e)}")
-            return np.zeros(len(self.labels)), 0
-    
-    def get_top_predictions(self, img, top_k=3):
+            return PredictionResult(np.zeros(len(self.labels)), self.labels)
+        
+    def get_prediction(self, img, draw=False):
         """
-        Get top-k predictions for the input image
+        Get prediction for the input image
         
         Args:
             img: Input image (BGR format)
-            top_k: Number of top predictions to return
+            draw: Whether to draw prediction on image (see draw_prediction)
             
         Returns:
-            List of tuples: [(label, confidence), ...]
+            Tuple: (prediction_probabilities, predicted_class_index)
         """
-        prediction_probs, _ = self.get_prediction(img, draw=False)
+        result = self.predict(img)
         
-        # Get top-k indices
-        top_indices = np.argsort(prediction_probs)[-top_k:][::-1]
+        # Draw prediction on image if requested
+        if draw and self.model is not None:
+            self.draw_prediction(img, result.index, result.confidence)
         
-        # Create list of (label, confidence) pairs
-        top_predictions = []
-        for idx in top_indices:
-            if idx < len(self.labels):
-                label = self.labels[idx]
-                confidence = prediction_probs[idx]
-                top_predictions.append((label, confidence))
+        return result.probabilities, result.index
+    
+    def draw_prediction(self, img, predicted_class, confidence):
+        """
+        Draw a prediction's label and confidence bar on an image
+        
+        Args:
+            img: Image to draw on (modified in place)
+            predicted_class: Predicted class index
+            confidence: Probability of the predicted class
+            
+        Returns:
+            The same image
+        """
+        if predicted_class >= len(self.labels):
+            return img
+        
+        label = self.labels[predicted_class]
+        
+        # Draw prediction text
+        text = f"{label}: {confidence:.2f}"
+        cv2.putText(img, text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
+                   1, (0, 255, 0), 2, cv2.LINE_AA)
+        
+        # Draw confidence bar
+        bar_width = int(confidence * 200)
+        cv2.rectangle(img, (10, 50), (10 + bar_width, 70), (0, 255, 0), -1)
+        cv2.rectangle(img, (10, 50), (210, 70), (255, 255, 255), 2)
+        return img
+    
+    def get_top_predictions(self, img=None, top_k=3, result=None):
+        """
+        Get top-k predictions for the input image
         
-        return top_predictions
+        Args:
+            img: Input image (BGR format); ignored if result is given
+            top_k: Number of top predictions to return
+            result: PredictionResult already computed for the frame
+            
+        Returns:
+            List of tuples: [(label, confidence), ...]
+        """
+        if result is None:
+            result = self.predict(img)
+        return result.top_predictions(top_k)
     
-    def is_confident(self, img, threshold=0.7):
+    def is_confident(self, img=None, threshold=0.7, result=None):
         """
         Check if the model is confident about its prediction
         
         Args:
-            img: Input image
+            img: Input image; ignored if result is given
             threshold: Confidence threshold
+            result: PredictionResult already computed for the frame
             
         Returns:
             Boolean: True if confident, False otherwise
         """
-        prediction_probs, predicted_class = self.get_prediction(img, draw=False)
-        return prediction_probs[predicted_class] >= threshold
+        if result is None:
+            result = self.predict(img)
+        return result.is_confident(threshold)
@@ -0,0 +1,409 @@
+import hashlib
+import json
+import math
+import os
+from itertools import combinations
+
+import numpy as np
+
+
+def deletes(key, max_distance):
+    """
+    Get every string obtained by deleting up to max_distance characters
+
+    Args:
+        key: Normalized word
+        max_distance: Maximum number of deleted characters
+
+    Returns:
+        Set of strings, including key itself
+    """
+    variants = {key}
+    for count in range(1, min(max_distance, len(key)) + 1):
+        for positions in combinations(range(len(key)), count):
+            variants.add("".join(char for i, char in enumerate(key) if i not in positions))
+    return variants
+
+
+def edit_distance(source, target, substitution_cost=None, limit=None):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions)
+
+    Args:
+        source: Observed string
+        target: Candidate string
+        substitution_cost: Callable (target char, source char) -> cost in
+            (0, 1], or None for unit costs
+        limit: Stop early and return a value above limit once the distance
+            is known to exceed it, or None
+
+    Returns:
+        Distance as a float
+    """
+    rows, cols = len(source) + 1, len(target) + 1
+    previous2 = None
+    previous = [float(j) for j in range(cols)]
+    for i in range(1, rows):
+        current = [float(i)] + [0.0] * (cols - 1)
+        for j in range(1, cols):
+            if source[i - 1] == target[j - 1]:
+                substitute = 0.0
+            elif substitution_cost is not None:
+                substitute = substitution_cost(target[j - 1], source[i - 1])
+            else:
+                substitute = 1.0
+            value = min(previous[j] + 1.0, current[j - 1] + 1.0, previous[j - 1] + substitute)
+            if (i > 1 and j > 1 and source[i - 1] == target[j - 2]
+                    and source[i - 2] == target[j - 1]):
+                value = min(value, previous2[j - 2] + 1.0)
+            current[j] = value
+        if limit is not None and min(current) > limit:
+            return limit + 1.0
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def index_checksum(index):
+    """
+    Fingerprint the keys of a PrefixIndex
+
+    A deletion table stores row numbers of the index's table, so it is only
+    valid for an index with exactly the same keys in the same order.
+
+    Returns:
+        Hex digest
+    """
+    keys = np.ascontiguousarray(index.table['key'])
+    digest = hashlib.sha1(str(keys.dtype).encode('ascii'))
+    digest.update(keys.tobytes())
+    return digest.hexdigest()
+
+
+def _metadata_path(path):
+    """Path of the JSON file describing a saved deletion table"""
+    return os.path.splitext(path)[0] + '.json'
+
+
+class ConfusionCosts:
+    def __init__(self, labels, counts, normalize=None, min_cost=0.2):
+        """
+        Substitution costs learned from the classifier's mistakes
+
+        counts[i, j] is how often (or with how much probability) a sign of
+        true class i was recognized as class j. Swapping letters the
+        classifier often mixes up then costs less than an arbitrary
+        substitution: a substitution as likely as chance costs 1 and the
+        cost falls with -log P(observed | intended), down to min_cost.
+
+        Args:
+            labels: Class labels of the matrix rows and columns
+            counts: Array of shape (classes, classes)
+            normalize: Normalization applied to labels (the lexicon's), or None
+            min_cost: Lowest substitution cost
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        self.min_cost = min_cost
+        self.costs = {}
+
+        letters = [(i, normalize(label) if normalize is not None else label) for i, label in enumerate(labels)]
+        letters = [(i, letter) for i, letter in letters if len(letter) == 1]
+        if len(letters) < 2:
+            return
+
+        # Confusions among letters only, smoothed so unseen pairs stay at chance
+        chance = 1.0 / len(letters)
+        scale = -math.log(chance)
+        for i, intended in letters:
+            row = np.array([counts[i, j] for j, _ in letters]) + chance
+            row /= row.sum()
+            for (_, observed), probability in zip(letters, row):
+                if observed != intended:
+                    cost = min(1.0, max(min_cost, -math.log(probability) / scale))
+                    if cost < 1.0:
+                        self.costs[(intended, observed)] = min(cost, self.costs.get((intended, observed), 1.0))
+
+    @classmethod
+    def load(cls, path, normalize=None, min_cost=0.2):
+        """
+        Load a matrix saved by build_confusion_matrix.py (.npz with labels and counts)
+
+        Returns:
+            ConfusionCosts
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls([str(label) for label in data['labels']], data['counts'],
+                       normalize=normalize, min_cost=min_cost)
+
+    def __call__(self, intended, observed):
+        """Cost of reading intended as observed"""
+        return self.costs.get((intended, observed), 1.0)
+
+
+class SpellCorrector:
+    def __init__(self, index, delete_table, confusion=None, max_distance=2, table_distance=None):
+        """
+        SymSpell spelling correction over a PrefixIndex lexicon
+
+        Every lexicon key's deletions (up to max_distance characters) are
+        precomputed into one table sorted by the deleted string. A query's
+        own deletions are looked up with binary searches, which yields every
+        lexicon word within max_distance edits without scanning the lexicon;
+        only those few candidates are scored, by edit distance with
+        confusion-weighted substitutions, then by frequency.
+
+        The table holds row numbers of the index's table, so both are
+        memory-mapped from disk and must be rebuilt together.
+
+        Args:
+            index: PrefixIndex of the lexicon
+            delete_table: Structured array with fields 'delete' and 'row'
+                sorted by 'delete' (see build_delete_table)
+            confusion: ConfusionCosts, or None for unit substitution costs
+            max_distance: Largest edit distance corrected
+            table_distance: Deletions per key the table was built with
+                (defaults to max_distance)
+        """
+        if table_distance is None:
+            table_distance = max_distance
+        if table_distance < max_distance:
+            raise ValueError(f"Deletion table covers {table_distance} edits, {max_distance} requested")
+
+        self.index = index
+        self.delete_table = delete_table
+        self.confusion = confusion
+        self.max_distance = max_distance
+        self.table_distance = table_distance
+
+    @staticmethod
+    def build_delete_table(index, max_distance=2):
+        """
+        Precompute the deletions of every key of a PrefixIndex
+
+        Args:
+            index: PrefixIndex of the lexicon
+            max_distance: Maximum number of deleted characters
+
+        Returns:
+            Structured array with fields 'delete' and 'row', sorted by 'delete'
+        """
+        pairs = []
+        for row, key in enumerate(index.table['key']):
+            key = str(key)
+            pairs.extend((variant, row) for variant in deletes(key, max_distance))
+        pairs.sort()
+
+        width = max([len(variant) for variant, _ in pairs] + [1])
+        table = np.zeros(len(pairs), dtype=[('delete', f'U{width}'), ('row', np.int32)])
+        if pairs:
+            table['delete'] = [variant for variant, _ in pairs]
+            table['row'] = [row for _, row in pairs]
+        return table
+
+    def _normalize(self, text):
+        return self.index.normalize(text) if self.index.normalize is not None else text
+
+    def _allowed_distance(self, key):
+        """Edits allowed for a word: none up to three letters, one up to six, then two"""
+        return min(self.max_distance, (len(key) - 1) // 3)
+
+    def candidates(self, word, k=5):
+        """
+        Get the closest lexicon words
+
+        Args:
+            word: Observed word
+            k: Number of candidates
+
+        Returns:
+            List of (word, distance) pairs, closest first, then most frequent
+        """
+        key = self._normalize(word)
+        distance = self._allowed_distance(key)
+
+        rows = set()
+        variants = self.delete_table['delete']
+        for variant in deletes(key, distance):
+            start = int(np.searchsorted(variants, variant, side='left'))
+            end = int(np.searchsorted(variants, variant, side='right'))
+            rows.update(int(row) for row in self.delete_table['row'][start:end])
+
+        table = self.index.table
+        scored = []
+        for row in rows:
+            candidate = str(table['key'][row])
+            if abs(len(candidate) - len(key)) > distance:
+                continue
+            # Sharing a deletion does not bound the distance; check it
+            if edit_distance(key, candidate, limit=distance) > distance:
+                continue
+            weighted = edit_distance(key, candidate, substitution_cost=self.confusion)
+            scored.append((weighted, int(table['rank'][row]), str(table['word'][row])))
+
+        scored.sort()
+        return [(candidate, weighted) for weighted, _, candidate in scored[:k]]
+
+    def correct(self, word):
+        """
+        Correct one word
+
+        Args:
+            word: Observed word
+
+        Returns:
+            The closest lexicon word, or word itself if it is already in the
+            lexicon or nothing is close enough
+        """
+        if word in self.index:
+            return word
+        candidates = self.candidates(word, k=1)
+        return candidates[0][0] if candidates else word
+
+    def correct_text(self, text):
+        """
+        Correct every word of a text
+
+        Args:
+            text: Space-separated words
+
+        Returns:
+            Corrected text
+        """
+        return " ".join(self.correct(word) if word else word for word in text.split(" "))
+
+    def _split_letters(self, letters):
+        """Split a run of letters after every lexicon word no longer word extends, as WordDecoder does"""
+        words = []
+        start = 0
+        for end in range(1, len(letters) + 1):
+            if self.index.is_final("".join(letters[start:end])):
+                words.append(letters[start:end])
+                start = end
+        if start < len(letters):
+            words.append(letters[start:])
+        return words
+
+    def correct_signs(self, text):
+        """
+        Correct the fingerspelled words of a sentence of signs
+
+        Letters are signed one by one and stored space-separated, so each
+        run of single letters is joined into words first; a whole-word sign
+        ends the run. A joined word is only kept if it is in the lexicon or
+        can be corrected to it, otherwise its letters stay as they were.
+
+        Args:
+            text: Space-separated signs
+
+        Returns:
+            Text with the corrected words joined
+        """
+        tokens = []
+        letters = []
+        for sign in text.split(" ") + [None]:
+            if sign is not None and len(sign) == 1:
+                letters.append(sign)
+                continue
+            for word_letters in self._split_letters(letters):
+                word = "".join(word_letters)
+                corrected = self.correct(word) if len(word_letters) > 1 else word
+                if corrected != word or word in self.index:
+                    tokens.append(corrected)
+                else:
+                    tokens.extend(word_letters)
+            letters = []
+            if sign:
+                tokens.append(sign)
+        return " ".join(tokens)
+
+    def save(self, path):
+        """
+        Save the deletion table as a .npy file that load can memory-map
+
+        A JSON file next to it records the index the table belongs to and
+        its deletion depth; it is written last, so a partly saved table is
+        never accepted.
+
+        Args:
+            path: Output path
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.save(path, self.delete_table, allow_pickle=False)
+        with open(_metadata_path(path), 'w', encoding='utf-8') as f:
+            json.dump({
+                'index_size': len(self.index),
+                'index_checksum': index_checksum(self.index),
+                'max_distance': self.table_distance
+            }, f)
+
+    @classmethod
+    def load(cls, index, path, confusion=None, max_distance=2, mmap=True):
+        """
+        Open a deletion table written by save
+
+        Args:
+            index: PrefixIndex the table was built from
+            path: Path to the .npy file
+            confusion: ConfusionCosts, or None
+            max_distance: Largest edit distance corrected (at most the table's)
+            mmap: Whether to memory-map the file instead of reading it
+
+        Returns:
+            SpellCorrector
+
+        Raises:
+            ValueError: If the table was built for another index or for
+                fewer edits than max_distance
+        """
+        with open(_metadata_path(path), 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if metadata.get('index_size') != len(index) or metadata.get('index_checksum') != index_checksum(index):
+            raise ValueError("Deletion table was built for another lexicon index")
+
+        table = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+        return cls(index, table, confusion=confusion, max_distance=max_distance,
+                   table_distance=int(metadata.get('max_distance', 0)))
+
+
+def load_spell_corrector(index, table_path=None, confusion_path=None, max_distance=2):
+    """
+    Open the prebuilt deletion table if it matches the index, otherwise build and save it
+
+    Args:
+        index: PrefixIndex of the lexicon
+        table_path: .npy file to memory-map or (re)write, or None
+        confusion_path: Confusion matrix (.npz) weighting substitutions, or None
+        max_distance: Largest edit distance corrected
+
+    Returns:
+        SpellCorrector, or None if it cannot be built
+    """
+    confusion = None
+    if confusion_path and os.path.exists(confusion_path):
+        try:
+            confusion = ConfusionCosts.load(confusion_path, normalize=index.normalize)
+            print(f"Loaded {len(confusion.costs)} confusion costs from {confusion_path}")
+        except Exception as e:
+            print(f"Error loading confusion matrix: {str(e)}")
+
+    if table_path and os.path.exists(table_path):
+        try:
+            corrector = SpellCorrector.load(index, table_path, confusion=confusion, max_distance=max_distance)
+            print(f"Loaded {len(corrector.delete_table)} spelling deletions from {table_path}")
+            return corrector
+        except (OSError, ValueError) as e:
+            print(f"Rebuilding spelling deletions: {str(e)}")
+
+    try:
+        corrector = SpellCorrector(index, SpellCorrector.build_delete_table(index, max_distance),
+                                   confusion=confusion, max_distance=max_distance)
+        print(f"Built {len(corrector.delete_table)} spelling deletions")
+    except Exception as e:
+        print(f"Error building spell corrector: {str(e)}")
+        return None
+
+    if table_path:
+        try:
+            corrector.save(table_path)
+        except OSError as e:
+            print(f"Could not save spelling deletions: {str(e)}")
+    return corrector
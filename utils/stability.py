@@ -0,0 +1,125 @@
+import numpy as np
+
+
+class StabilityEmitter:
+    def __init__(self, alpha=0.5, stable_frames=3, min_confidence=0.6, release_frames=3,
+                 idle_frames=15, hold_frames=30, active_interval=0.15, idle_interval=1.0):
+        """
+        Initialize the per-session emitter that decides when a sign is final
+
+        Every frame's class probabilities go into an exponential moving
+        average. A sign is emitted once the average's top class has stayed
+        the same, above min_confidence, for stable_frames consecutive frames.
+        The same sign is not emitted again until the hand leaves for
+        release_frames frames or another sign becomes stable, so holding a
+        pose does not repeat letters.
+
+        The emitter also suggests how often the client should send frames:
+        quickly while signing, slowly when no hand has been seen for
+        idle_frames frames or the emitted sign has been held for hold_frames.
+
+        Args:
+            alpha: Weight of the newest frame in the moving average
+            stable_frames: Consecutive stable frames (K) required to emit
+            min_confidence: Minimum averaged probability of the emitted class
+            release_frames: Frames without a hand after which a sign may repeat
+            idle_frames: Frames without a hand after which the client may slow down
+            hold_frames: Frames holding an emitted sign after which the client may slow down
+            active_interval: Suggested seconds between frames while signing
+            idle_interval: Suggested seconds between frames while idle
+        """
+        self.alpha = alpha
+        self.stable_frames = stable_frames
+        self.min_confidence = min_confidence
+        self.release_frames = release_frames
+        self.idle_frames = idle_frames
+        self.hold_frames = hold_frames
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+
+        self.average = None
+        self.labels = None
+        self.candidate = None
+        self.streak = 0
+        self.last_emitted = None
+        self.held = 0
+        self.missing = 0
+
+    def reset(self):
+        """Forget the moving average and the current candidate"""
+        self.average = None
+        self.candidate = None
+        self.streak = 0
+        self.held = 0
+
+    def update(self, probabilities, labels):
+        """
+        Add one frame's prediction
+
+        Args:
+            probabilities: Class probabilities for the frame
+            labels: Labels of the classifier that produced them
+
+        Returns:
+            Tuple: (emitted label or None, averaged confidence of the top class)
+        """
+        probabilities = np.asarray(probabilities, dtype=np.float32)
+        self.missing = 0
+
+        # Predictions from another classifier are not comparable
+        if self.labels is not labels or self.average is None or self.average.shape != probabilities.shape:
+            self.labels = labels
+            self.reset()
+            self.average = probabilities.copy()
+        else:
+            self.average *= 1.0 - self.alpha
+            self.average += self.alpha * probabilities
+
+        index = int(np.argmax(self.average))
+        confidence = float(self.average[index])
+        label = labels[index] if index < len(labels) else None
+
+        if label is None or confidence < self.min_confidence:
+            self.candidate = None
+            self.streak = 0
+            return None, confidence
+
+        if label == self.candidate:
+            self.streak += 1
+        else:
+            self.candidate = label
+            self.streak = 1
+            if label != self.last_emitted:
+                # Another sign became the candidate: the held one is released
+                self.held = 0
+
+        if self.streak < self.stable_frames:
+            return None, confidence
+
+        if label == self.last_emitted:
+            self.held += 1
+            return None, confidence
+
+        self.last_emitted = label
+        self.held = 0
+        return label, confidence
+
+    def no_hand(self):
+        """Record a frame without a hand"""
+        self.missing += 1
+        self.reset()
+        if self.missing >= self.release_frames:
+            self.last_emitted = None
+
+    def is_idle(self):
+        """Check whether the client may send frames slowly"""
+        return self.missing >= self.idle_frames or self.held >= self.hold_frames
+
+    def suggested_interval(self):
+        """
+        Get the suggested time between client frames
+
+        Returns:
+            Seconds
+        """
+        return self.idle_interval if self.is_idle() else self.active_interval
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+# Prefer the standalone runtime so workers never have to import TensorFlow
+try:
+    from tflite_runtime.interpreter import Interpreter
+except ImportError:
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        except ImportError:
+            Interpreter = None
+
+
+class TFLiteInterpreterPool:
+    def __init__(self, model_path="Model/model.tflite", num_threads=1):
+        """
+        Initialize a pool of TFLite interpreters
+
+        Interpreters are not thread-safe, so every thread that calls predict
+        gets its own interpreter, created on first use and reused afterwards.
+        Each interpreter allocates its tensors once; inputs are written
+        straight into the interpreter's input buffer. Fully quantized (int8
+        or uint8) models are supported: inputs are quantized and outputs
+        dequantized with the tensors' own scale and zero point.
+
+        Args:
+            model_path: Path to the .tflite model
+            num_threads: Number of CPU threads each interpreter may use
+        """
+        if Interpreter is None:
+            raise ImportError("No TFLite interpreter available (install tflite-runtime or tensorflow)")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"TFLite model not found at {model_path}")
+
+        self.model_path = model_path
+        self.num_threads = num_threads
+
+        self._local = threading.local()
+        self._interpreters = []
+        self._lock = threading.Lock()
+
+        # Create the first interpreter eagerly to validate the model
+        interpreter = self._get_interpreter()
+        input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
+        self.input_shape = tuple(int(dim) for dim in input_details['shape'][1:])
+        self.input_dtype = input_details['dtype']
+        self.num_classes = int(output_details['shape'][-1])
+
+        # (scale, zero_point) is (0.0, 0) for float tensors
+        self.input_quantization = input_details['quantization']
+        self.output_quantization = output_details['quantization']
+        self.quantized_input = np.issubdtype(self.input_dtype, np.integer)
+        self.quantized_output = np.issubdtype(output_details['dtype'], np.integer)
+
+        # Latency statistics
+        self.total_calls = 0
+        self.total_samples = 0
+        self.total_time = 0.0
+        self.last_latency = 0.0
+
+    def _get_interpreter(self):
+        """Get the calling thread's interpreter, creating it on first use"""
+        interpreter = getattr(self._local, 'interpreter', None)
+        if interpreter is None:
+            interpreter = Interpreter(model_path=self.model_path, num_threads=self.num_threads)
+            interpreter.allocate_tensors()
+            self._local.interpreter = interpreter
+            self._local.input_index = interpreter.get_input_details()[0]['index']
+            self._local.output_index = interpreter.get_output_details()[0]['index']
+            with self._lock:
+                self._interpreters.append(interpreter)
+        return interpreter
+
+    def predict(self, batch):
+        """
+        Run the model on a batch
+
+        Args:
+            batch: Array of shape (n,) + input_shape
+
+        Returns:
+            Model outputs as a float32 array with n rows
+        """
+        start = time.perf_counter()
+
+        interpreter = self._get_interpreter()
+        input_index = self._local.input_index
+        output_index = self._local.output_index
+
+        if self.quantized_input:
+            batch = self.quantize_input(batch)
+
+        outputs = np.empty((len(batch), self.num_classes), dtype=np.float32)
+        for i, sample in enumerate(batch):
+            # Write into the interpreter's own buffer; the view must be
+            # released before invoke()
+            interpreter.tensor(input_index)()[0] = sample
+            interpreter.invoke()
+            outputs[i] = interpreter.tensor(output_index)()[0]
+
+        if self.quantized_output:
+            scale, zero_point = self.output_quantization
+            outputs -= zero_point
+            outputs *= scale
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.total_calls += 1
+            self.total_samples += len(batch)
+            self.total_time += latency
+            self.last_latency = latency
+
+        return outputs
+
+    def quantize_input(self, batch):
+        """
+        Quantize a float batch to the model's integer input type
+
+        Args:
+            batch: Float array of shape (n,) + input_shape
+
+        Returns:
+            Integer array in the model's input dtype
+        """
+        scale, zero_point = self.input_quantization
+        info = np.iinfo(self.input_dtype)
+        quantized = np.rint(np.asarray(batch, dtype=np.float32) / scale) + zero_point
+        return np.clip(quantized, info.min, info.max).astype(self.input_dtype)
+
+    def get_stats(self):
+        """
+        Get per-call latency statistics
+
+        Returns:
+            Dictionary with call count, sample count, latencies in milliseconds
+            and the number of live interpreters
+        """
+        with self._lock:
+            calls = self.total_calls
+            return {
+                'calls': calls,
+                'samples': self.total_samples,
+                'average_latency_ms': self.total_time / calls * 1000.0 if calls else 0.0,
+                'last_latency_ms': self.last_latency * 1000.0,
+                'interpreters': len(self._interpreters),
+                'num_threads': self.num_threads
+            }
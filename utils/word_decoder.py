@@ -0,0 +1,266 @@
+import heapq
+import math
+
+from utils.prediction_result import PredictionResult
+
+# Word boundary symbols of the character model
+_WORD_START = '^'
+_WORD_END = '$'
+
+
+class CharNgramModel:
+    def __init__(self, words, order=3):
+        """
+        Character n-gram model of how words are spelled
+
+        Counts come from (word, weight) pairs and are smoothed with
+        Witten-Bell interpolation, so unseen continuations keep a small
+        probability backed off from shorter contexts.
+
+        Args:
+            words: Iterable of (word, weight) pairs
+            order: Length of the n-grams (context length + 1)
+        """
+        self.order = max(1, order)
+        # counts[context][char] for contexts of length 0 .. order-1
+        self.counts = {}
+        self.totals = {}
+        self.vocabulary = set()
+
+        for word, weight in words:
+            if not word or weight <= 0:
+                continue
+            padded = _WORD_START * (self.order - 1) + word + _WORD_END
+            for i in range(self.order - 1, len(padded)):
+                char = padded[i]
+                self.vocabulary.add(char)
+                for length in range(self.order):
+                    context = padded[i - length:i]
+                    followers = self.counts.setdefault(context, {})
+                    followers[char] = followers.get(char, 0.0) + weight
+                    self.totals[context] = self.totals.get(context, 0.0) + weight
+
+        self._cache = {}
+
+    @classmethod
+    def from_index(cls, index, order=3):
+        """
+        Train on the words of a PrefixIndex, weighted by log frequency
+
+        Args:
+            index: PrefixIndex whose normalized keys are used
+            order: Length of the n-grams
+
+        Returns:
+            CharNgramModel
+        """
+        table = index.table
+        words = ((str(key), math.log1p(int(frequency))) for key, frequency in zip(table['key'], table['frequency']))
+        return cls(words, order=order)
+
+    def _probability(self, context, char):
+        """Witten-Bell interpolated probability of char after context"""
+        if not context:
+            # Add-one over the vocabulary (plus one unseen character)
+            followers = self.counts.get('', {})
+            return (followers.get(char, 0.0) + 1.0) / (self.totals.get('', 0.0) + len(self.vocabulary) + 1)
+
+        lower = self._probability(context[1:], char)
+        followers = self.counts.get(context)
+        if not followers:
+            return lower
+        total = self.totals[context]
+        distinct = len(followers)
+        return (followers.get(char, 0.0) + distinct * lower) / (total + distinct)
+
+    def log_prob(self, prefix, char):
+        """
+        Get the log probability of the next character of a word
+
+        Args:
+            prefix: Characters of the word so far
+            char: Next character, or None for the end of the word
+
+        Returns:
+            Natural log probability
+        """
+        padded = _WORD_START * (self.order - 1) + prefix
+        context = padded[len(padded) - (self.order - 1):] if self.order > 1 else ''
+        key = (context, _WORD_END if char is None else char)
+        value = self._cache.get(key)
+        if value is None:
+            value = math.log(self._probability(*key))
+            self._cache[key] = value
+        return value
+
+
+class DecoderState:
+    def __init__(self):
+        """Beam of one session's word in progress"""
+        # Hypotheses: (score, text, normalized key)
+        self.beam = [(0.0, "", "")]
+        self.steps = 0
+
+    def reset(self):
+        """Start a new word"""
+        self.beam = [(0.0, "", "")]
+        self.steps = 0
+
+
+class WordDecoder:
+    def __init__(self, index, char_model, beam_width=8, candidates=4, lm_weight=0.5,
+                 oov_penalty=4.0, min_probability=1e-3):
+        """
+        Streaming beam-search decoder turning emitted letter signs into words
+
+        Every emitted sign brings its full class probability vector rather
+        than only the top label, so a letter the classifier ranked second can
+        still win when it spells a lexicon word. Each step extends every
+        hypothesis with the most probable letters and keeps the beam_width
+        best, scored by the classifier's log probability, the character
+        n-gram model and a penalty for leaving the lexicon. A step costs at
+        most beam_width * candidates prefix lookups, independent of the
+        lexicon's size.
+
+        A word is finished when the best hypothesis is a lexicon word that
+        no other lexicon word extends, when end_word is called (e.g. the hand
+        left the frame), or when a whole-word sign is emitted.
+
+        Args:
+            index: PrefixIndex of the lexicon
+            char_model: CharNgramModel, or None to score with the classifier only
+            beam_width: Hypotheses kept per step
+            candidates: Letters tried per hypothesis per step
+            lm_weight: Weight of the character model's log probability
+            oov_penalty: Cost of every letter that leaves the lexicon
+            min_probability: Letters less probable than this are not tried
+        """
+        self.index = index
+        self.char_model = char_model
+        self.beam_width = max(1, beam_width)
+        self.candidates = max(1, candidates)
+        self.lm_weight = lm_weight
+        self.oov_penalty = oov_penalty
+        self.min_probability = min_probability
+
+    def create_state(self):
+        """Create the decoding state of one session"""
+        return DecoderState()
+
+    def _normalize(self, text):
+        """Normalize text the way the lexicon keys are"""
+        return self.index.normalize(text) if self.index.normalize is not None else text
+
+    def _in_lexicon(self, key):
+        """Check whether some lexicon word starts with key"""
+        start, end = self.index.prefix_range(key)
+        return end > start
+
+    def _char_score(self, key, char):
+        if self.char_model is None or not self.lm_weight:
+            return 0.0
+        return self.lm_weight * self.char_model.log_prob(key, char)
+
+    def _finish(self, state):
+        """Pick the best complete hypothesis, reset the state and return its word"""
+        best = None
+        for score, text, key in state.beam:
+            if not text:
+                continue
+            score += self._char_score(key, None)
+            if key not in self.index:
+                score -= self.oov_penalty
+            if best is None or score > best[0]:
+                best = (score, text, key)
+        state.reset()
+        if best is None:
+            return None
+        return self.index.get(best[2], best[1])
+
+    def step(self, state, probabilities, labels):
+        """
+        Consume one emitted sign
+
+        Args:
+            state: DecoderState of the session
+            probabilities: Class probabilities the sign was emitted from
+            labels: Class labels
+
+        Returns:
+            List of finished words (usually empty)
+        """
+        prediction = PredictionResult(probabilities, labels)
+        label = prediction.label
+        if label is None:
+            return []
+
+        # Whole-word signs end the current word and pass through
+        if len(label) > 1:
+            return self.add_word(state, label)
+
+        letters = []
+        for i in prediction.top_k(self.candidates):
+            probability = float(prediction.probabilities[i])
+            if i >= len(labels) or len(labels[i]) != 1 or (letters and probability < self.min_probability):
+                continue
+            letters.append((labels[i], self._normalize(labels[i]), math.log(max(probability, 1e-12))))
+
+        expanded = []
+        for score, text, key in state.beam:
+            for letter, letter_key, log_probability in letters:
+                new_key = key + letter_key
+                new_score = score + log_probability + self._char_score(key, letter_key)
+                if not self._in_lexicon(new_key):
+                    new_score -= self.oov_penalty
+                expanded.append((new_score, text + letter, new_key))
+
+        state.beam = heapq.nlargest(self.beam_width, expanded, key=lambda hypothesis: hypothesis[0])
+        state.steps += 1
+
+        if state.beam and self.index.is_final(state.beam[0][2]):
+            return [self._finish(state)]
+        return []
+
+    def add_word(self, state, word):
+        """
+        Consume a whole-word sign
+
+        Args:
+            state: DecoderState of the session
+            word: Recognized word or phrase
+
+        Returns:
+            List of finished words: the word in progress, if any, then this one
+        """
+        words = []
+        pending = self.end_word(state)
+        if pending:
+            words.append(pending)
+        words.append(word)
+        return words
+
+    def end_word(self, state):
+        """
+        Finish the word in progress at a boundary (e.g. a pause)
+
+        Args:
+            state: DecoderState of the session
+
+        Returns:
+            The best word, or None if nothing was decoded
+        """
+        if not state.steps:
+            return None
+        return self._finish(state)
+
+    def partial(self, state):
+        """
+        Get the best hypothesis of the word in progress
+
+        Args:
+            state: DecoderState of the session
+
+        Returns:
+            Text (empty if nothing was decoded yet)
+        """
+        return state.beam[0][1] if state.beam else ""